@@ -1,28 +1,82 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_file, send_from_directory, stream_with_context
 import os
 import sys
 import importlib.util
-import json
+import mimetypes
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Pfad zum Basis-Verzeichnis (wo sich app.py befindet)
 BASE_DIR = Path(__file__).resolve().parent
+# Shortcut-Datei (über COFIFO_SHORTCUTS_FILE änderbar, z. B. für benchmark.py)
+SHORTCUTS_FILE = Path(os.environ.get('COFIFO_SHORTCUTS_FILE', BASE_DIR / "shortcuts.json"))
+
+# Gemeinsamer Shortcut-Speicher für CLI und Web-Backend
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+import search_index
+import shortcut_store
 
 # Erstelle Flask-App 
 app = Flask(__name__, static_folder='static', static_url_path='')
 
+# Grenzen für Hintergrund-Builds
+MAX_CONCURRENT_BUILDS = int(os.environ.get('COFIFO_MAX_CONCURRENT_BUILDS', 2))
+MAX_QUEUED_BUILDS = int(os.environ.get('COFIFO_MAX_QUEUED_BUILDS', 20))
+MAX_FINISHED_JOBS = 100
+
+# Maximale Anzahl gleichzeitig aktiver Watch-Modi
+MAX_WATCHES = int(os.environ.get('COFIFO_MAX_WATCHES', 10))
+
+# Komprimierte HTTP-Übertragung (Content-Encoding: gzip)
+GZIP_LEVEL = 6
+GZIP_MIN_SIZE = 1024
+# Nach so vielen unkomprimierten Bytes wird der Kompressor geleert, damit
+# gestreamte Antworten beim Client ankommen, während sie erzeugt werden
+GZIP_FLUSH_BYTES = 256 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+COMPRESSED_MIMETYPES = {'gzip': 'application/gzip', 'xz': 'application/x-xz'}
+
+# Prometheus-Metriken (/api/metrics): Obergrenzen der Histogramm-Buckets in Sekunden
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_BUILD_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Verzeichnis-Listings für /api/browse
+BROWSE_PAGE_SIZE = 500
+BROWSE_CACHE_SIZE = 256
+BROWSE_SORT_KEYS = {
+    'type': lambda entry: (entry['type'] != 'directory', entry['name'].lower()),
+    'name': lambda entry: entry['name'].lower(),
+    'size': lambda entry: (entry['size'] is None, entry['size'] or 0),
+    'mtime': lambda entry: entry['mtime'] or 0
+}
+
+# Volltextsuche (/api/search): Aktualisierung der Indizes höchstens alle n Sekunden
+SEARCH_REFRESH_INTERVAL = float(os.environ.get('COFIFO_SEARCH_REFRESH_INTERVAL', 30))
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 500
+SEARCH_MIN_QUERY_LENGTH = 2
+
 # Importiere das combine_files.py Skript als Modul, falls es existiert
 try:
     spec = importlib.util.spec_from_file_location("combine_files", 
                                                 BASE_DIR / "combine_files.py")
     combine_files = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(combine_files)
+    # CLI und Web-Backend verwenden dieselbe Shortcut-Datei
+    combine_files.SHORTCUTS_FILE = str(SHORTCUTS_FILE)
 except Exception as e:
     print(f"Warnung: Konnte combine_files.py nicht importieren: {e}")
     
     # Dummy-Funktionen als Fallback
     class DummyCombineFiles:
-        def add_shortcut(self, name, paths):
+        def add_shortcut(self, name, paths, include=None, exclude=None, gitignore=True, git=False):
             return {"error": "combine_files.py konnte nicht geladen werden"}
         
         def remove_shortcut(self, name):
@@ -31,30 +85,279 @@ except Exception as e:
         def list_shortcuts(self):
             return {"error": "combine_files.py konnte nicht geladen werden"}
         
-        def use_shortcut(self, name, output_file, include_tree=False):
+        def use_shortcut(self, name, output_file, include_tree=False, jobs=1, incremental=False,
+                         tree_depth=None, tree_max_entries=None, max_file_size=None, skip_binary=False,
+                         token_budget=None, exact_tokens=False, compression=None, dedupe=False,
+                         reduce=None, since=None, output_format="text"):
             return {"error": "combine_files.py konnte nicht geladen werden"}
     
     combine_files = DummyCombineFiles()
 
+# Hilfsfunktion zum Lesen ganzzahliger Felder aus einer Anfrage
+def get_int_field(data, key, default=None, minimum=1):
+    """Liest ein optionales ganzzahliges Feld und löst bei ungültigen Werten einen ValueError aus."""
+    value = data.get(key, default)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Ungültige Anfrage: {key} muss eine ganze Zahl sein")
+    if value < minimum:
+        raise ValueError(f"Ungültige Anfrage: {key} muss mindestens {minimum} sein")
+    return value
+
+def get_compression_field(data):
+    """Liest das optionale Feld compression und löst bei ungültigen Werten einen ValueError aus."""
+    compression = data.get('compression')
+    methods = getattr(combine_files, 'COMPRESSION_METHODS', ())
+    if compression is not None and compression not in methods:
+        raise ValueError(f"Ungültige Anfrage: compression muss eines von {', '.join(methods)} sein")
+    return compression
+
+def get_reduce_field(data):
+    """Liest das optionale Feld reduce (Liste von Reduzierern oder 'all') und löst bei ungültigen Werten einen ValueError aus."""
+    value = data.get('reduce')
+    if not value:
+        return None
+    reducers = getattr(combine_files, 'reducers', None)
+    if reducers is None:
+        raise ValueError("Ungültige Anfrage: reduce wird nicht unterstützt")
+    if isinstance(value, list):
+        value = ",".join(str(name) for name in value)
+    try:
+        return reducers.parse_reducers(str(value))
+    except ValueError:
+        raise ValueError(f"Ungültige Anfrage: reduce muss aus {', '.join(reducers.REDUCERS)} oder 'all' bestehen")
+
+def get_since_field(data):
+    """Liest das optionale Feld since (Git-Revision) und löst bei ungültigen Werten einen ValueError aus."""
+    since = data.get('since')
+    if not since:
+        return None
+    if not isinstance(since, str) or since.startswith('-'):
+        raise ValueError("Ungültige Anfrage: since muss eine Git-Revision sein (z. B. main oder HEAD~3)")
+    return since
+
+def get_format_field(data):
+    """Liest das optionale Feld format (text oder pack) und löst bei ungültigen Werten einen ValueError aus."""
+    output_format = data.get('format') or 'text'
+    formats = getattr(combine_files, 'OUTPUT_FORMATS', ('text',))
+    if output_format not in formats:
+        raise ValueError(f"Ungültige Anfrage: format muss eines von {', '.join(formats)} sein")
+    if output_format == 'pack' and (data.get('incremental') or data.get('compression')):
+        raise ValueError("Ungültige Anfrage: format pack kann nicht mit incremental oder compression kombiniert werden")
+    return output_format
+
+def get_paths_field(data):
+    """Liest das Feld paths und löst bei fehlenden oder nicht auflösbaren Pfaden einen ValueError aus.
+
+    Gültig sind vorhandene Dateien und Verzeichnisse sowie Archive und
+    Git-Revisionen (siehe sources); einzelne Einträge eines Archivs oder
+    einer Revision können nicht als Pfad aufgenommen werden."""
+    paths = data.get('paths')
+    if not isinstance(paths, list) or not all(isinstance(path, str) and path for path in paths):
+        raise ValueError("Ungültige Anfrage: paths muss eine Liste von Pfaden sein")
+    sources = getattr(combine_files, 'sources', None)
+    for path in paths:
+        if os.path.exists(path):
+            continue
+        try:
+            source = sources.open_source(path) if sources is not None else None
+        except ValueError as e:
+            raise ValueError(f"Ungültiger Pfad: {e}")
+        if source is None:
+            raise ValueError(f"Ungültiger Pfad: {path} existiert nicht oder ist ein Eintrag eines Archivs bzw. einer Git-Revision")
+    return paths
+
+def accepts_gzip():
+    """Prüft, ob der Client gzip-komprimierte Antworten annimmt (Accept-Encoding)."""
+    return request.accept_encodings['gzip'] > 0
+
+def gzip_chunks(chunks):
+    """Komprimiert eine Folge von Byte-Blöcken beim Streamen im gzip-Format."""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= GZIP_FLUSH_BYTES:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if data:
+            yield data
+    yield compressor.flush()
+
+def streamed_response(chunks, filename, mimetype, compress):
+    """Erstellt eine gestreamte Download-Antwort, auf Wunsch gzip-komprimiert."""
+    headers = {
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        # Verhindert, dass ein vorgeschalteter Proxy die Antwort puffert
+        'X-Accel-Buffering': 'no',
+        'Vary': 'Accept-Encoding'
+    }
+    if compress:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
 # Hilfsfunktion zum Laden der Shortcuts
 def load_shortcuts():
-    """Lädt die Shortcuts aus der JSON-Datei."""
-    shortcuts_file = BASE_DIR / "shortcuts.json"
-    if shortcuts_file.exists():
-        with open(shortcuts_file, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    return {}
+    """Lädt die Shortcuts aus der JSON-Datei (zwischengespeichert, siehe shortcut_store)."""
+    return shortcut_store.load_shortcuts(SHORTCUTS_FILE)
 
 # Stelle sicher, dass shortcuts.json existiert
 def ensure_shortcuts_file():
-    shortcuts_file = BASE_DIR / "shortcuts.json"
-    if not shortcuts_file.exists():
-        with open(shortcuts_file, 'w', encoding='utf-8') as file:
-            json.dump({}, file)
+    if not SHORTCUTS_FILE.exists():
+        shortcut_store.save_shortcuts(SHORTCUTS_FILE, {})
 
 # Erstelle shortcuts.json, falls sie nicht existiert
 ensure_shortcuts_file()
 
+# Zähler eines Builds (siehe combine_files.new_report) -> Prometheus-Metrik
+BUILD_FILE_COUNTERS = {'found': 'files_found', 'read': 'files_read',
+                       'reused': 'reused_count', 'written': 'file_count'}
+BUILD_TOTAL_COUNTERS = {
+    'bytes_read': ('cofifo_build_bytes_read_total', 'Gelesene Bytes aller Builds.'),
+    'bytes_written': ('cofifo_build_bytes_written_total', 'Ausgegebene Bytes aller Builds (unkomprimiert).'),
+    'output_size': ('cofifo_build_output_bytes_total', 'Größe der geschriebenen Ausgabedateien in Bytes.'),
+    'read_errors': ('cofifo_build_read_errors_total', 'Dateien, die nicht gelesen werden konnten.'),
+    'decode_fallbacks': ('cofifo_build_decode_fallbacks_total',
+                         'Dateien, die über den Textmodus dekodiert werden mussten.')
+}
+
+def new_histogram(buckets):
+    """Erstellt ein leeres Histogramm: Anzahl pro Bucket, Summe und Anzahl der Werte."""
+    return {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+
+def observe(histogram, buckets, value):
+    """Trägt einen Wert in ein Histogramm ein (Aufrufer hält metrics_lock)."""
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            histogram['buckets'][index] += 1
+            break
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+# Metriken: Anfragen pro Route und Zähler aller Builds seit dem Start
+metrics_lock = threading.Lock()
+request_counts = Counter()
+request_latencies = {}
+build_counts = Counter()
+build_phase_seconds = Counter()
+build_reduced_bytes = Counter()
+build_durations = new_histogram(METRICS_BUILD_BUCKETS)
+
+def record_build(report, failed=False):
+    """Übernimmt die Zähler eines abgeschlossenen Builds in die Metriken."""
+    with metrics_lock:
+        build_counts['builds'] += 1
+        if failed:
+            build_counts['failed'] += 1
+        if not isinstance(report, dict) or 'timings' not in report:
+            # Fallback ohne combine_files oder Build ohne Protokoll
+            return
+        build_phase_seconds.update(report['timings'])
+        for state, key in BUILD_FILE_COUNTERS.items():
+            build_counts['files_' + state] += report[key]
+        build_counts['files_skipped'] += sum(report['skipped_counts'].values())
+        for key in BUILD_TOTAL_COUNTERS:
+            build_counts[key] += report[key]
+        build_reduced_bytes.update(report.get('reduced_bytes', {}))
+        if 'total' in report['timings']:
+            observe(build_durations, METRICS_BUILD_BUCKETS, report['timings']['total'])
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Erfasst Anzahl und Dauer der Anfragen pro Route.
+
+    Bei gestreamten Antworten wird die Dauer bis zum Beginn der Antwort gemessen."""
+    start = g.get('request_start')
+    if start is not None:
+        # Route statt Pfad, damit IDs und Dateinamen keine neuen Zeitreihen erzeugen
+        route = request.url_rule.rule if request.url_rule is not None else 'unbekannt'
+        with metrics_lock:
+            request_counts[(route, request.method, str(response.status_code))] += 1
+            histogram = request_latencies.setdefault((route, request.method),
+                                                     new_histogram(METRICS_LATENCY_BUCKETS))
+            observe(histogram, METRICS_LATENCY_BUCKETS, time.perf_counter() - start)
+    return response
+
+def escape_label_value(value):
+    """Maskiert Backslash, Anführungszeichen und Zeilenumbrüche in einem Label-Wert."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels):
+    """Formatiert Labels im Prometheus-Textformat ({name="wert",...})."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items()) + '}'
+
+def histogram_lines(name, labels, histogram, buckets):
+    """Gibt die Zeilen eines Histogramms (_bucket, _sum, _count) zurück."""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(buckets, histogram['buckets']):
+        cumulative += count
+        lines.append(f"{name}_bucket{format_labels(dict(labels, le=repr(float(bound))))} {cumulative}")
+    lines.append(f"{name}_bucket{format_labels(dict(labels, le='+Inf'))} {histogram['count']}")
+    lines.append(f"{name}_sum{format_labels(labels)} {histogram['sum']!r}")
+    lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+    return lines
+
+def render_metrics():
+    """Erzeugt alle Metriken im Prometheus-Textformat."""
+    lines = []
+
+    def metric(name, kind, help_text, samples=()):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{format_labels(labels)} {value!r}")
+
+    with jobs_lock:
+        job_statuses = Counter(job['status'] for job in build_jobs.values())
+    with watches_lock:
+        running_watches = sum(1 for watch in active_watches.values() if watch['status'] == 'running')
+
+    with metrics_lock:
+        metric('cofifo_http_requests_total', 'counter', 'Anzahl der HTTP-Anfragen pro Route und Status.',
+               [({'route': route, 'method': method, 'status': status}, count)
+                for (route, method, status), count in sorted(request_counts.items())])
+        metric('cofifo_http_request_duration_seconds', 'histogram', 'Dauer der HTTP-Anfragen pro Route.')
+        for (route, method), histogram in sorted(request_latencies.items()):
+            lines.extend(histogram_lines('cofifo_http_request_duration_seconds',
+                                         {'route': route, 'method': method},
+                                         histogram, METRICS_LATENCY_BUCKETS))
+
+        metric('cofifo_builds_total', 'counter', 'Anzahl der Builds.', [({}, build_counts['builds'])])
+        metric('cofifo_builds_failed_total', 'counter', 'Anzahl der fehlgeschlagenen Builds.',
+               [({}, build_counts['failed'])])
+        metric('cofifo_build_duration_seconds', 'histogram', 'Gesamtdauer der Builds.')
+        lines.extend(histogram_lines('cofifo_build_duration_seconds', {}, build_durations,
+                                     METRICS_BUILD_BUCKETS))
+        metric('cofifo_build_phase_seconds_total', 'counter',
+               'Dauer der Build-Phasen (Lesen summiert über alle Threads).',
+               [({'phase': phase}, float(build_phase_seconds[phase]))
+                for phase in getattr(combine_files, 'STATS_PHASES', ())])
+        metric('cofifo_build_files_total', 'counter', 'Dateien aller Builds nach Zustand.',
+               [({'state': state}, build_counts['files_' + state])
+                for state in list(BUILD_FILE_COUNTERS) + ['skipped']])
+        for key, (name, help_text) in BUILD_TOTAL_COUNTERS.items():
+            metric(name, 'counter', help_text, [({}, build_counts[key])])
+        metric('cofifo_build_reduced_bytes_total', 'counter', 'Durch Reduzierer eingesparte Bytes.',
+               [({'reducer': name}, saved) for name, saved in sorted(build_reduced_bytes.items())])
+
+    metric('cofifo_build_jobs', 'gauge', 'Hintergrund-Builds nach Status.',
+           [({'status': status}, job_statuses[status])
+            for status in ('queued', 'running', 'done', 'failed', 'cancelled')])
+    metric('cofifo_watches_running', 'gauge', 'Aktive Watch-Modi.', [({}, running_watches)])
+    return '\n'.join(lines) + '\n'
+
 @app.route('/')
 def index():
     """Serviert die Startseite."""
@@ -87,22 +390,69 @@ def api_add_shortcut():
     if not data or 'name' not in data or 'paths' not in data:
         return jsonify({'error': 'Ungültige Anfrage: Name und Pfade erforderlich'}), 400
     
+    if not hasattr(combine_files, 'make_shortcut'):
+        return jsonify({'error': 'combine_files.py konnte nicht geladen werden'}), 500
+    
     name = data['name']
-    paths = data['paths']
+    # Gleiches Speicherformat wie --add (mit Filtern als Objekt, sonst als Liste von Pfaden)
+    shortcut = combine_files.make_shortcut(data['paths'], data.get('include'), data.get('exclude'),
+                                           data.get('gitignore', True), bool(data.get('git', False)))
+    
+    def add(shortcuts):
+        shortcuts[name] = shortcut
     
     try:
-        # Lade aktuelle Shortcuts
-        shortcuts = load_shortcuts()
-        # Füge neuen Shortcut hinzu
-        shortcuts[name] = paths
-        # Speichere Shortcuts
-        with open(BASE_DIR / "shortcuts.json", 'w', encoding='utf-8') as file:
-            json.dump(shortcuts, file, indent=4)
+        # Füge den Shortcut unter Sperre hinzu und speichere atomar
+        shortcut_store.update_shortcuts(SHORTCUTS_FILE, add)
         
         return jsonify({'success': True, 'message': f"Shortcut '{name}' wurde hinzugefügt."})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/add_to_shortcut', methods=['POST'])
+def api_add_to_shortcut():
+    """API-Endpunkt zum Hinzufügen von Pfaden (z. B. Suchtreffern) zu einem bestehenden Shortcut.
+
+    Bereits enthaltene Pfade werden nicht doppelt aufgenommen, Filter des
+    Shortcuts bleiben erhalten. Jeder Pfad muss existieren (siehe
+    get_paths_field), sonst wird nichts hinzugefügt."""
+    data = request.json
+    
+    if not data or 'name' not in data or 'paths' not in data:
+        return jsonify({'error': 'Ungültige Anfrage: Name und Pfade erforderlich'}), 400
+    try:
+        new_paths = get_paths_field(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    name = data['name']
+    added = []
+    
+    def add(shortcuts):
+        if name not in shortcuts:
+            return False
+        shortcut = shortcuts[name]
+        paths = shortcut.get('paths', []) if isinstance(shortcut, dict) else shortcut
+        for path in new_paths:
+            if path not in paths and path not in added:
+                added.append(path)
+        if isinstance(shortcut, dict):
+            shortcut['paths'] = paths + added
+        else:
+            shortcuts[name] = paths + added
+    
+    try:
+        if shortcut_store.update_shortcuts(SHORTCUTS_FILE, add) is False:
+            return jsonify({'error': f"Shortcut '{name}' existiert nicht."}), 404
+        
+        return jsonify({
+            'success': True,
+            'added': len(added),
+            'message': f"{len(added)} Pfade wurden zum Shortcut '{name}' hinzugefügt."
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/remove_shortcut', methods=['DELETE'])
 def api_remove_shortcut():
     """API-Endpunkt zum Entfernen eines Shortcuts."""
@@ -113,36 +463,296 @@ def api_remove_shortcut():
     
     name = data['name']
     
-    try:
-        # Lade aktuelle Shortcuts
-        shortcuts = load_shortcuts()
-        
+    def remove(shortcuts):
         # Prüfe, ob Shortcut existiert
         if name not in shortcuts:
-            return jsonify({'error': f"Shortcut '{name}' existiert nicht."}), 404
-        
-        # Entferne Shortcut
+            return False
         del shortcuts[name]
-        
-        # Speichere Shortcuts
-        with open(BASE_DIR / "shortcuts.json", 'w', encoding='utf-8') as file:
-            json.dump(shortcuts, file, indent=4)
+    
+    try:
+        # Entferne den Shortcut unter Sperre und speichere atomar
+        if shortcut_store.update_shortcuts(SHORTCUTS_FILE, remove) is False:
+            return jsonify({'error': f"Shortcut '{name}' existiert nicht."}), 404
         
         return jsonify({'success': True, 'message': f"Shortcut '{name}' wurde entfernt."})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def stream_shortcut(shortcut, output_file, **options):
+    """Erstellt eine gestreamte Antwort mit der kombinierten Ausgabe eines Shortcuts."""
+    if not hasattr(combine_files, 'iter_bundle'):
+        return jsonify({'error': 'combine_files.py konnte nicht geladen werden'}), 500
+    
+    paths = combine_files.shortcut_paths(shortcut)
+    filter_options = combine_files.shortcut_filter_options(shortcut)
+    report = combine_files.new_report()
+    chunks = combine_files.iter_bundle(paths, filter_options, report=report, **options)
+    return streamed_response(recorded_chunks(chunks, report), os.path.basename(output_file),
+                             'text/plain', accepts_gzip())
+
+def recorded_chunks(chunks, report):
+    """Reicht die Blöcke eines gestreamten Builds durch und erfasst ihn danach in den Metriken."""
+    start = time.perf_counter()
+    for chunk in chunks:
+        report['bytes_written'] += len(chunk)
+        yield chunk
+    combine_files.add_timing(report, 'total', time.perf_counter() - start)
+    record_build(report)
+
+# Hintergrund-Builds: begrenzter Worker-Pool und Job-Verwaltung
+build_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BUILDS)
+jobs_lock = threading.Lock()
+build_jobs = {}
+
+def job_snapshot(job):
+    """Gibt den aktuellen Stand eines Jobs als JSON-fähiges Dictionary zurück."""
+    report = job['report']
+    return {
+        'id': job['id'],
+        'name': job['name'],
+        'output_file': job['output_file'],
+        'status': job['status'],
+        'error': job['error'],
+        'files_done': report['file_count'],
+        'files_total': report['files_found'] if report['walk_complete'] else None,
+        'files_found': report['files_found'],
+        'bytes_written': report['bytes_written'],
+        'duplicate_count': report['duplicate_count'],
+        'duplicate_bytes_saved': report['duplicate_bytes_saved'],
+        'created': job['created'],
+        'started': job['started'],
+        'finished': job['finished']
+    }
+
+def prune_finished_jobs():
+    """Entfernt die ältesten abgeschlossenen Jobs, wenn zu viele gespeichert sind."""
+    finished = [job for job in build_jobs.values()
+                if job['status'] in ('done', 'failed', 'cancelled')]
+    finished.sort(key=lambda job: job['finished'] or 0)
+    for job in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+        del build_jobs[job['id']]
+
+def run_build_job(job, paths, filter_options, incremental, options):
+    """Führt einen Build im Worker-Pool aus und aktualisiert den Job-Status."""
+    with jobs_lock:
+        if job['cancel_event'].is_set():
+            return
+        job['status'] = 'running'
+        job['started'] = time.time()
+    try:
+        completed = combine_files.write_bundle(paths, job['output_file'], filter_options, incremental,
+                                               report=job['report'], cancel_event=job['cancel_event'],
+                                               **options)
+        status, error = ('done' if completed else 'cancelled'), None
+    except Exception as e:
+        status, error = 'failed', str(e)
+    if status != 'cancelled':
+        record_build(job['report'], failed=status == 'failed')
+    with jobs_lock:
+        job['status'] = status
+        job['error'] = error
+        job['finished'] = time.time()
+        prune_finished_jobs()
+
+def submit_build_job(name, shortcut, output_file, incremental, options):
+    """Reiht einen Build als Job ein. Gibt den Job oder None zurück, wenn die Warteschlange voll ist."""
+    with jobs_lock:
+        active = sum(1 for job in build_jobs.values() if job['status'] in ('queued', 'running'))
+        if active >= MAX_CONCURRENT_BUILDS + MAX_QUEUED_BUILDS:
+            return None
+        job = {
+            'id': uuid.uuid4().hex,
+            'name': name,
+            'output_file': os.path.abspath(output_file),
+            'status': 'queued',
+            'error': None,
+            'report': combine_files.new_report(),
+            'cancel_event': threading.Event(),
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+            'future': None
+        }
+        build_jobs[job['id']] = job
+    paths = combine_files.shortcut_paths(shortcut)
+    filter_options = combine_files.shortcut_filter_options(shortcut)
+    job['future'] = build_executor.submit(run_build_job, job, paths, filter_options, incremental, options)
+    return job
+
+@app.route('/api/jobs', methods=['GET'])
+def api_list_jobs():
+    """API-Endpunkt zum Auflisten aller Build-Jobs."""
+    with jobs_lock:
+        return jsonify([job_snapshot(job) for job in build_jobs.values()])
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_get_job(job_id):
+    """API-Endpunkt zum Abfragen des Fortschritts eines Build-Jobs."""
+    with jobs_lock:
+        job = build_jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': f"Job '{job_id}' existiert nicht."}), 404
+        return jsonify(job_snapshot(job))
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def api_cancel_job(job_id):
+    """API-Endpunkt zum Abbrechen eines Build-Jobs."""
+    with jobs_lock:
+        job = build_jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': f"Job '{job_id}' existiert nicht."}), 404
+        if job['status'] in ('queued', 'running'):
+            job['cancel_event'].set()
+            if job['status'] == 'queued' or job['future'].cancel():
+                job['status'] = 'cancelled'
+                job['finished'] = time.time()
+        return jsonify(job_snapshot(job))
+
+# Watch-Modus: hält Ausgabedateien im Hintergrund aktuell
+watches_lock = threading.Lock()
+active_watches = {}
+
+def watch_snapshot(watch):
+    """Gibt den aktuellen Stand eines Watch-Modus als JSON-fähiges Dictionary zurück."""
+    return {key: watch[key] for key in
+            ('id', 'name', 'output_file', 'status', 'error', 'builds', 'last_build',
+             'files', 'files_reread')}
+
+def run_watch(watch, paths, filter_options, options):
+    """Führt combine_files.watch_paths in einem eigenen Thread aus."""
+    def on_build(report, changed):
+        record_build(report)
+        with watches_lock:
+            watch['builds'] += 1
+            watch['last_build'] = time.time()
+            watch['files'] = report['file_count']
+            watch['files_reread'] = report['file_count'] - report['reused_count']
+    
+    try:
+        combine_files.watch_paths(paths, watch['output_file'], filter_options,
+                                  stop_event=watch['stop_event'], on_build=on_build, **options)
+        status, error = 'stopped', None
+    except Exception as e:
+        status, error = 'failed', str(e)
+    with watches_lock:
+        watch['status'] = status
+        watch['error'] = error
+
+@app.route('/api/watches', methods=['GET'])
+def api_list_watches():
+    """API-Endpunkt zum Auflisten aller Watch-Modi."""
+    with watches_lock:
+        return jsonify([watch_snapshot(watch) for watch in active_watches.values()])
+
+@app.route('/api/watches', methods=['POST'])
+def api_start_watch():
+    """API-Endpunkt zum Starten eines Watch-Modus für einen Shortcut."""
+    data = request.json
+    
+    if not data or 'name' not in data or 'output_file' not in data:
+        return jsonify({'error': 'Ungültige Anfrage: Name und Ausgabedatei erforderlich'}), 400
+    if not hasattr(combine_files, 'watch_paths'):
+        return jsonify({'error': 'combine_files.py konnte nicht geladen werden'}), 500
+    
+    name = data['name']
+    try:
+        options = {
+            'include_tree': data.get('include_tree', False),
+            'jobs': get_int_field(data, 'jobs', 1),
+            'tree_depth': get_int_field(data, 'tree_depth'),
+            'tree_max_entries': get_int_field(data, 'tree_max_entries'),
+            'max_file_size': get_int_field(data, 'max_file_size'),
+            'skip_binary': data.get('skip_binary', False),
+            'compression': get_compression_field(data),
+            'dedupe': data.get('dedupe', False),
+            'reduce': get_reduce_field(data),
+            'since': get_since_field(data)
+        }
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    shortcuts = load_shortcuts()
+    if name not in shortcuts:
+        return jsonify({'error': f"Shortcut '{name}' existiert nicht."}), 404
+    
+    output_file = os.path.abspath(data['output_file'])
+    with watches_lock:
+        running = [watch for watch in active_watches.values() if watch['status'] == 'running']
+        if any(watch['output_file'] == output_file for watch in running):
+            return jsonify({'error': f"'{output_file}' wird bereits überwacht."}), 409
+        if len(running) >= MAX_WATCHES:
+            return jsonify({'error': 'Zu viele aktive Watch-Modi.'}), 429
+        watch = {
+            'id': uuid.uuid4().hex,
+            'name': name,
+            'output_file': output_file,
+            'status': 'running',
+            'error': None,
+            'builds': 0,
+            'last_build': None,
+            'files': 0,
+            'files_reread': 0,
+            'stop_event': threading.Event()
+        }
+        active_watches[watch['id']] = watch
+    
+    paths = combine_files.shortcut_paths(shortcuts[name])
+    filter_options = combine_files.shortcut_filter_options(shortcuts[name])
+    threading.Thread(target=run_watch, args=(watch, paths, filter_options, options), daemon=True).start()
+    return jsonify({'success': True, 'watch_id': watch['id']}), 201
+
+@app.route('/api/watches/<watch_id>', methods=['DELETE'])
+def api_stop_watch(watch_id):
+    """API-Endpunkt zum Beenden eines Watch-Modus."""
+    with watches_lock:
+        watch = active_watches.pop(watch_id, None)
+    if watch is None:
+        return jsonify({'error': f"Watch '{watch_id}' existiert nicht."}), 404
+    watch['stop_event'].set()
+    return jsonify({'success': True, 'message': f"Watch-Modus für '{watch['name']}' wurde beendet."})
+
 @app.route('/api/use_shortcut', methods=['POST'])
 def api_use_shortcut():
-    """API-Endpunkt zum Verwenden eines Shortcuts."""
+    """API-Endpunkt zum Verwenden eines Shortcuts.
+
+    Mit 'stream': true wird die kombinierte Ausgabe direkt als Antwort
+    gestreamt, während die Dateien gelesen werden. Auf dem Server wird dabei
+    keine Ausgabedatei geschrieben; 'output_file' ist dann nur der Dateiname
+    für den Download.
+
+    Mit 'background': true wird der Build als Job in einen begrenzten
+    Worker-Pool eingereiht; der Fortschritt ist unter /api/jobs/<id> abrufbar.
+
+    Mit 'format': 'pack' wird eine Pack-Datei mit Offset-Tabelle geschrieben
+    (siehe bundle_pack.py); nicht mit 'stream' kombinierbar."""
     data = request.json
+    stream = bool(data.get('stream', False)) if data else False
     
-    if not data or 'name' not in data or 'output_file' not in data:
+    if not data or 'name' not in data or ('output_file' not in data and not stream):
         return jsonify({'error': 'Ungültige Anfrage: Name und Ausgabedatei erforderlich'}), 400
     
     name = data['name']
-    output_file = data['output_file']
+    output_file = data.get('output_file', 'output.txt')
     include_tree = data.get('include_tree', False)
+    incremental = data.get('incremental', False)
+    skip_binary = data.get('skip_binary', False)
+    exact_tokens = data.get('exact_tokens', False)
+    dedupe = data.get('dedupe', False)
+    
+    try:
+        jobs = get_int_field(data, 'jobs', 1)
+        tree_depth = get_int_field(data, 'tree_depth')
+        tree_max_entries = get_int_field(data, 'tree_max_entries')
+        max_file_size = get_int_field(data, 'max_file_size')
+        token_budget = get_int_field(data, 'token_budget')
+        compression = get_compression_field(data)
+        reduce = get_reduce_field(data)
+        since = get_since_field(data)
+        output_format = get_format_field(data)
+        if stream and output_format != 'text':
+            raise ValueError("Ungültige Anfrage: stream ist nur im Textformat möglich")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     try:
         # Lade Shortcuts
@@ -153,10 +763,48 @@ def api_use_shortcut():
             return jsonify({'error': f"Shortcut '{name}' existiert nicht."}), 404
         
         paths = shortcuts[name]
+        if isinstance(paths, dict):
+            paths = paths.get('paths', [])
+        
+        if stream:
+            return stream_shortcut(shortcuts[name], output_file, include_tree=include_tree, jobs=jobs,
+                                   tree_depth=tree_depth, tree_max_entries=tree_max_entries,
+                                   max_file_size=max_file_size, skip_binary=skip_binary,
+                                   token_budget=token_budget, exact_tokens=exact_tokens, dedupe=dedupe,
+                                   reduce=reduce, since=since)
+        
+        if data.get('background', False):
+            if not hasattr(combine_files, 'write_bundle'):
+                return jsonify({'error': 'combine_files.py konnte nicht geladen werden'}), 500
+            job = submit_build_job(name, shortcuts[name], output_file, incremental, {
+                'include_tree': include_tree, 'jobs': jobs,
+                'tree_depth': tree_depth, 'tree_max_entries': tree_max_entries,
+                'max_file_size': max_file_size, 'skip_binary': skip_binary,
+                'token_budget': token_budget, 'exact_tokens': exact_tokens,
+                'compression': compression, 'dedupe': dedupe, 'reduce': reduce,
+                'since': since, 'output_format': output_format
+            })
+            if job is None:
+                return jsonify({'error': 'Zu viele Builds in der Warteschlange. Bitte später erneut versuchen.'}), 429
+            return jsonify({
+                'success': True,
+                'job_id': job['id'],
+                'status_url': f"/api/jobs/{job['id']}"
+            }), 202
         
         # Erstelle Ausgabedatei
         if hasattr(combine_files, 'use_shortcut'):
-            combine_files.use_shortcut(name, output_file, include_tree)
+            try:
+                report = combine_files.use_shortcut(name, output_file, include_tree, jobs, incremental,
+                                                    tree_depth=tree_depth, tree_max_entries=tree_max_entries,
+                                                    max_file_size=max_file_size, skip_binary=skip_binary,
+                                                    token_budget=token_budget, exact_tokens=exact_tokens,
+                                                    compression=compression, dedupe=dedupe, reduce=reduce,
+                                                    since=since, output_format=output_format)
+            except Exception:
+                record_build(None, failed=True)
+                raise
+            record_build(report)
         else:
             # Fallback-Implementierung, falls combine_files.py nicht verfügbar ist
             with open(output_file, 'w', encoding='utf-8') as file:
@@ -184,10 +832,162 @@ def api_use_shortcut():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/use_shortcuts', methods=['POST'])
+def api_use_shortcuts():
+    """API-Endpunkt zum gemeinsamen Verwenden mehrerer Shortcuts (Batch-Build).
+
+    Erwartet 'output_dir' und optional 'names' (ohne Angabe: alle Shortcuts).
+    Verzeichnisse werden für alle Shortcuts nur einmal durchlaufen und jede
+    Datei nur einmal gelesen; mit 'jobs' werden so viele Ausgaben parallel
+    geschrieben. Jede Ausgabe wird als <Name>.txt (mit 'format': 'pack' als
+    <Name>.pack) in output_dir gespeichert."""
+    data = request.json
+    
+    if not data or 'output_dir' not in data:
+        return jsonify({'error': 'Ungültige Anfrage: Ausgabeverzeichnis erforderlich'}), 400
+    if not hasattr(combine_files, 'write_bundles'):
+        return jsonify({'error': 'combine_files.py konnte nicht geladen werden'}), 500
+    
+    try:
+        jobs = get_int_field(data, 'jobs', 1)
+        options = {
+            'include_tree': data.get('include_tree', False),
+            'tree_depth': get_int_field(data, 'tree_depth'),
+            'tree_max_entries': get_int_field(data, 'tree_max_entries'),
+            'max_file_size': get_int_field(data, 'max_file_size'),
+            'skip_binary': data.get('skip_binary', False),
+            'token_budget': get_int_field(data, 'token_budget'),
+            'exact_tokens': data.get('exact_tokens', False),
+            'compression': get_compression_field(data),
+            'dedupe': data.get('dedupe', False),
+            'reduce': get_reduce_field(data),
+            'since': get_since_field(data),
+            'output_format': get_format_field(data)
+        }
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    shortcuts = load_shortcuts()
+    names = data.get('names') or list(shortcuts)
+    missing = [name for name in names if name not in shortcuts]
+    if missing:
+        return jsonify({'error': f"Shortcuts existieren nicht: {', '.join(missing)}"}), 404
+    
+    output_dir = os.path.abspath(data['output_dir'])
+    builds = [(combine_files.shortcut_paths(shortcuts[name]),
+               combine_files.batch_output_file(output_dir, name, options['compression'],
+                                               options['output_format']),
+               combine_files.shortcut_filter_options(shortcuts[name]))
+              for name in names]
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        reports = combine_files.write_bundles(builds, jobs, data.get('incremental', False), **options)
+    except Exception as e:
+        record_build(None, failed=True)
+        return jsonify({'error': str(e)}), 500
+    for report in reports:
+        record_build(report)
+    
+    return jsonify({
+        'success': True,
+        'results': [{
+            'name': name,
+            'output_file': output_file,
+            'files': report['file_count'],
+            'files_reread': report['file_count'] - report['reused_count'],
+            'bytes_written': report['bytes_written'],
+            'duplicate_bytes_saved': report['duplicate_bytes_saved']
+        } for name, (_, output_file, _), report in zip(names, builds, reports)]
+    })
+
+# Zwischengespeicherte Verzeichnis-Listings: Pfad -> (Änderungszeit, Beginn des
+# Einlesens, Einträge, {(Sortierung, absteigend): sortierte Einträge})
+browse_lock = threading.Lock()
+browse_cache = {}
+
+def scan_browse_directory(path):
+    """Liest ein Verzeichnis mit os.scandir ein (Name, Typ, Größe, Änderungszeit in einem Durchlauf)."""
+    entries = []
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            # Ignoriere versteckte Dateien/Ordner
+            if entry.name.startswith('.'):
+                continue
+            try:
+                is_dir = entry.is_dir()
+                stat = entry.stat()
+                size = None if is_dir else stat.st_size
+                mtime = stat.st_mtime
+            except OSError:
+                # Z. B. defekte symbolische Links
+                is_dir, size, mtime = False, None, None
+            entries.append({
+                'name': entry.name,
+                'path': entry.path,
+                'type': "directory" if is_dir else "file",
+                'size': size,
+                'mtime': mtime
+            })
+    return tuple(entries)
+
+def list_directory(path, mtime_ns):
+    """Gibt die Einträge eines Verzeichnisses zurück (siehe scan_browse_directory).
+
+    Das Ergebnis wird nach Pfad zwischengespeichert und nur wiederverwendet,
+    wenn die Änderungszeit des Verzeichnisses (mtime_ns) gleich geblieben ist
+    und vor dem Beginn des Einlesens liegt (wie bei
+    combine_files.DirectoryCache). Wegen der groben Auflösung der
+    Änderungszeit bliebe sie bei einer Änderung im selben Zeitschritt wie das
+    Einlesen sonst unverändert. Größen von Dateien, die sich ohne Änderung des
+    Verzeichnisses ändern, werden erst beim nächsten Einlesen aktualisiert."""
+    with browse_lock:
+        cached = browse_cache.pop(path, None)
+        if cached is not None and cached[0] == mtime_ns and mtime_ns < cached[1]:
+            browse_cache[path] = cached
+            return cached
+    started_ns = time.time_ns()
+    cached = (mtime_ns, started_ns, scan_browse_directory(path), {})
+    with browse_lock:
+        browse_cache[path] = cached
+        while len(browse_cache) > BROWSE_CACHE_SIZE:
+            del browse_cache[next(iter(browse_cache))]
+    return cached
+
+def clear_browse_cache():
+    """Verwirft alle zwischengespeicherten Verzeichnis-Listings."""
+    with browse_lock:
+        browse_cache.clear()
+
+def sorted_directory(path, mtime_ns, sort, descending):
+    """Gibt die sortierten Einträge eines Verzeichnisses zurück (zwischengespeichert wie list_directory)."""
+    _, _, entries, sorted_entries = list_directory(path, mtime_ns)
+    key = (sort, descending)
+    with browse_lock:
+        result = sorted_entries.get(key)
+    if result is None:
+        result = tuple(sorted(entries, key=BROWSE_SORT_KEYS[sort], reverse=descending))
+        with browse_lock:
+            sorted_entries[key] = result
+    return result
+
 @app.route('/api/browse', methods=['GET'])
 def api_browse():
-    """API-Endpunkt zum Durchsuchen von Verzeichnissen."""
+    """API-Endpunkt zum Durchsuchen von Verzeichnissen.
+
+    Unterstützt Sortierung (sort=type|name|size|mtime, order=asc|desc) und
+    Seiten (offset, limit). Wiederholte Aufrufe für ein unverändertes
+    Verzeichnis werden aus dem Zwischenspeicher beantwortet."""
     path = request.args.get('path', os.getcwd())
+    sort = request.args.get('sort', 'type')
+    descending = request.args.get('order', 'asc') == 'desc'
+    
+    if sort not in BROWSE_SORT_KEYS:
+        return jsonify({'error': f"Ungültige Sortierung '{sort}'."}), 400
+    try:
+        offset = get_int_field(request.args, 'offset', 0, minimum=0)
+        limit = get_int_field(request.args, 'limit', BROWSE_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Entferne die Sicherheitseinschränkung, die das Browsen auf base_path beschränkt
     # base_path = os.path.abspath(os.getcwd())
@@ -195,28 +995,24 @@ def api_browse():
     # if not requested_path.startswith(base_path) and path != '/':
     #     path = base_path
     
-    if not os.path.exists(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
         return jsonify({'error': f"Pfad '{path}' existiert nicht."}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
     
     try:
         if os.path.isdir(path):
             # Zeige Inhalt des Verzeichnisses
-            entries = []
-            for entry in os.listdir(path):
-                # Ignoriere versteckte Dateien/Ordner
-                if entry.startswith('.'):
-                    continue
-                
-                full_path = os.path.join(path, entry)
-                entry_type = "directory" if os.path.isdir(full_path) else "file"
-                entries.append({
-                    'name': entry,
-                    'path': full_path,
-                    'type': entry_type
-                })
+            entries = sorted_directory(path, stat.st_mtime_ns, sort, descending)
             return jsonify({
                 'path': path,
-                'entries': entries
+                'entries': list(entries[offset:offset + limit]),
+                'total': len(entries),
+                'offset': offset,
+                'limit': limit,
+                'has_more': offset + limit < len(entries)
             })
         else:
             # Zeige Informationen zur Datei
@@ -224,7 +1020,7 @@ def api_browse():
                 'path': path,
                 'name': os.path.basename(path),
                 'type': "file",
-                'size': os.path.getsize(path)
+                'size': stat.st_size
             })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -233,13 +1029,171 @@ def api_browse():
 
     
 
+# Suchindizes pro Shortcut, aufgebaut und aktualisiert in einem Hintergrund-Thread
+search_executor = ThreadPoolExecutor(max_workers=1)
+search_lock = threading.Lock()
+search_indexes = {}
+
+def read_search_text(full_path, stat=None):
+    """Liest eine Datei für die Suche als Text.
+
+    Gibt None für Dateien zurück, die auch beim Kombinieren übersprungen
+    werden (Binär- und Lockdateien), sowie für nicht lesbare Dateien.
+    Einträge von Archiven und Git-Revisionen werden über sources gelesen."""
+    size = stat.st_size if stat is not None else None
+    if combine_files.classify_file(full_path, size, head=b"") is not None:
+        return None
+    source = combine_files.sources.source_for(full_path)
+    try:
+        if source is not None:
+            data = source.read(full_path)
+        else:
+            with open(full_path, 'rb') as file:
+                data = file.read()
+    except OSError:
+        return None
+    if combine_files.classify_file(full_path, head=data) is not None:
+        return None
+    return data.decode('utf-8', errors='replace')
+
+def open_shortcut_sources(shortcut):
+    """Öffnet die Archive und Git-Revisionen eines Shortcuts, damit ihre Einträge gelesen werden können.
+
+    Außerhalb eines Builds kann eine Quelle inzwischen geschlossen worden
+    sein (siehe sources.keep_open); ungültige Pfade werden übergangen."""
+    for path in combine_files.shortcut_paths(shortcut):
+        try:
+            combine_files.sources.open_source(path)
+        except ValueError:
+            pass
+
+def refresh_search_index(name, index, shortcut):
+    """Aktualisiert den Suchindex eines Shortcuts (läuft im search_executor)."""
+    try:
+        paths = combine_files.shortcut_paths(shortcut)
+        filter_options = combine_files.shortcut_filter_options(shortcut)
+        with combine_files.sources.keep_open():
+            index.refresh(combine_files.iter_file_paths(paths, filter_options=filter_options),
+                          combine_files.stat_file, read_search_text)
+    except Exception as e:
+        print(f"Warnung: Suchindex für Shortcut '{name}' konnte nicht aktualisiert werden: {e}")
+    finally:
+        index.refreshing = False
+
+def get_search_index(name, shortcut):
+    """Gibt den Suchindex eines Shortcuts zurück.
+
+    Ein neuer oder veralteter Index (älter als SEARCH_REFRESH_INTERVAL) wird
+    im Hintergrund aufgebaut bzw. anhand der Änderungszeiten aktualisiert;
+    bis dahin wird mit dem bisherigen Stand gesucht. Ändert sich der
+    Shortcut, wird der Index neu aufgebaut."""
+    with search_lock:
+        cached = search_indexes.get(name)
+        if cached is None or cached[0] != shortcut:
+            cached = search_indexes[name] = (shortcut, search_index.SearchIndex())
+        index = cached[1]
+        stale = (index.refreshed_at is None
+                 or time.time() - index.refreshed_at > SEARCH_REFRESH_INTERVAL)
+        if stale and not index.refreshing:
+            index.refreshing = True
+            search_executor.submit(refresh_search_index, name, index, shortcut)
+    return index
+
+@app.route('/api/search', methods=['GET'])
+def api_search():
+    """API-Endpunkt für die Volltextsuche in den Dateien eines oder aller Shortcuts.
+
+    Parameter: q (Suchbegriff, ohne Beachtung der Groß-/Kleinschreibung),
+    shortcut (optional, sonst alle Shortcuts) und limit. Liefert pro Datei
+    die Anzahl der passenden Zeilen und einige Zeilen als Ausschnitte;
+    Dateien, deren Pfad den Suchbegriff enthält, folgen ohne Ausschnitte.
+    Enthält q kein Wort aus mindestens zwei Buchstaben oder Ziffern, werden
+    nur die Pfade durchsucht. Solange ein Index aufgebaut wird, ist 'indexing' gesetzt und die
+    Treffer sind unvollständig."""
+    if not hasattr(combine_files, 'iter_file_paths'):
+        return jsonify({'error': 'combine_files.py konnte nicht geladen werden'}), 500
+    query = request.args.get('q', '')
+    if len(query.strip()) < SEARCH_MIN_QUERY_LENGTH:
+        return jsonify({'error': f"Ungültige Anfrage: q muss mindestens {SEARCH_MIN_QUERY_LENGTH} Zeichen lang sein"}), 400
+    try:
+        limit = min(get_int_field(request.args, 'limit', SEARCH_DEFAULT_LIMIT), SEARCH_MAX_LIMIT)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    shortcuts = load_shortcuts()
+    name = request.args.get('shortcut')
+    if name and name not in shortcuts:
+        return jsonify({'error': f"Shortcut '{name}' existiert nicht."}), 404
+    with search_lock:
+        # Indizes gelöschter Shortcuts freigeben
+        for removed in [removed for removed in search_indexes if removed not in shortcuts]:
+            del search_indexes[removed]
+    
+    start = time.perf_counter()
+    results, truncated, indexing, indexed_files = [], False, False, 0
+    seen = set()
+    for shortcut_name in [name] if name else list(shortcuts):
+        index = get_search_index(shortcut_name, shortcuts[shortcut_name])
+        indexing = indexing or index.refreshed_at is None
+        indexed_files += index.file_count
+        if len(results) >= limit:
+            truncated = True
+            continue
+        with combine_files.sources.keep_open():
+            open_shortcut_sources(shortcuts[shortcut_name])
+            matches, more = index.search(query, read_search_text, limit - len(results))
+        truncated = truncated or more
+        for match in matches:
+            if match['path'] not in seen:
+                seen.add(match['path'])
+                results.append(dict(match, shortcut=shortcut_name))
+    
+    return jsonify({
+        'query': query,
+        'results': results,
+        'truncated': truncated,
+        'indexing': indexing,
+        'indexed_files': indexed_files,
+        'took_ms': round((time.perf_counter() - start) * 1000, 2)
+    })
+
+def iter_file_chunks(path):
+    """Liest eine Datei blockweise für eine gestreamte Antwort."""
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(DOWNLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
 @app.route('/api/download/<path:filename>', methods=['GET'])
 def download_file(filename):
-    """API-Endpunkt zum Herunterladen einer Datei."""
+    """API-Endpunkt zum Herunterladen einer Datei.
+
+    Nimmt der Client gzip an, werden Textdateien beim Senden komprimiert.
+    Bereits komprimierte Dateien (.gz, .xz) und kleine Dateien werden
+    unverändert gesendet."""
     try:
-        return send_file(filename, as_attachment=True)
+        # Relative Pfade wie bei send_file relativ zum Anwendungsverzeichnis auflösen
+        path = os.path.join(app.root_path, filename)
+        size = os.path.getsize(path)
+        mimetype, encoding = mimetypes.guess_type(path)
+        if encoding is not None:
+            # Bereits komprimierte Ausgabe als solche kennzeichnen statt als Text
+            return send_file(path, as_attachment=True,
+                             mimetype=COMPRESSED_MIMETYPES.get(encoding, 'application/octet-stream'))
+        if size < GZIP_MIN_SIZE or not accepts_gzip():
+            return send_file(path, as_attachment=True)
+        return streamed_response(iter_file_chunks(path), os.path.basename(path),
+                                 mimetype or 'application/octet-stream', compress=True)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def api_metrics():
+    """Metriken im Prometheus-Textformat: Anfragen und Latenzen pro Route sowie
+    Phasen, Dateien, Bytes und Fehler aller Builds seit dem Start."""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+"""
+CofifoAIWO - Benchmarks
+
+Erzeugt einen synthetischen Verzeichnisbaum und misst die wichtigsten Pfade
+(Verzeichnisstruktur, Lesen, Schreiben der Ausgabe, Web-API). Die Ergebnisse
+werden als JSON gespeichert und können mit einer gespeicherten Baseline
+verglichen werden, um Verschlechterungen zu erkennen.
+
+Beispiele:
+  python benchmark.py --files 10k --output baseline.json
+  python benchmark.py --files 10k --baseline baseline.json --threshold 1.2
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import hashlib
+import platform
+import statistics
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import combine_files
+
+# Format der Ergebnisdatei
+RESULTS_VERSION = 1
+
+# Standardwerte für den synthetischen Baum
+DEFAULT_PARAMS = {
+    "files": 1000,
+    "depth": 4,
+    "fanout": 6,
+    "size_median": 2048,
+    "size_sigma": 1.0,
+    "max_size": 1024 ** 2,
+    "binary_ratio": 0.05,
+    "ignored_ratio": 0.1,
+    "seed": 42,
+}
+
+# Benchmarks in der Reihenfolge der Ausführung
+BENCHMARKS = ("generate_tree_structure", "get_files_from_paths", "use_shortcut",
+              "api_browse", "api_use_shortcut")
+
+# Dateiendungen für Text- und Binärdateien im synthetischen Baum
+TEXT_EXTENSIONS = (".py", ".js", ".md", ".txt", ".json", ".html", ".css")
+BINARY_EXTENSIONS = (".png", ".bin", ".pyc")
+
+# Name der Datei, die einen fertig erzeugten Baum kennzeichnet
+TREE_MARKER = ".cofifo-benchmark.json"
+
+def parse_count(value):
+    """Wandelt eine Anzahl wie '1000', '10k' oder '1M' in eine ganze Zahl um."""
+    units = {"K": 1000, "M": 1000 ** 2}
+    value = value.strip().upper()
+    factor = 1
+    if value and value[-1] in units:
+        factor = units[value[-1]]
+        value = value[:-1]
+    return int(float(value) * factor)
+
+def get_option(args, option, convert, default):
+    """Liest den Wert einer Option aus einer Argumentliste oder beendet das Programm bei Fehlern."""
+    if option not in args:
+        return default
+    index = args.index(option)
+    try:
+        return convert(args[index + 1])
+    except (IndexError, ValueError):
+        print(f"Fehler: Ungültiger Wert für {option}.")
+        sys.exit(1)
+
+def random_size(rng, params):
+    """Zieht eine Dateigröße aus einer Log-Normalverteilung um size_median."""
+    size = rng.lognormvariate(math.log(params["size_median"]), params["size_sigma"])
+    return max(1, min(int(size), params["max_size"]))
+
+def text_content(rng, size):
+    """Erzeugt Quelltext-ähnlichen Inhalt mit ungefähr size Bytes."""
+    words = ("def", "return", "import", "value", "self", "data", "path", "for", "in", "if",
+             "else", "class", "print", "result", "index", "None", "True", "False", "# Kommentar")
+    lines = []
+    length = 0
+    while length < size:
+        line = " " * (4 * rng.randint(0, 3)) + " ".join(rng.choice(words) for _ in range(rng.randint(2, 10)))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size] + "\n"
+
+def directory_paths(root, depth, fanout, rng):
+    """Erzeugt die Liste der Verzeichnisse eines Baums mit höchstens depth Ebenen."""
+    directories = [root]
+    level = [root]
+    for current_depth in range(1, depth):
+        next_level = []
+        for directory in level:
+            for index in range(rng.randint(1, fanout)):
+                next_level.append(os.path.join(directory, f"dir{current_depth}_{index}"))
+        directories.extend(next_level)
+        level = next_level
+    return directories
+
+def generate_tree(root, params):
+    """Erzeugt einen synthetischen Verzeichnisbaum nach params (siehe DEFAULT_PARAMS).
+
+    Ein Anteil binary_ratio der Dateien sind Binärdateien, ein Anteil
+    ignored_ratio liegt in ignorierten Verzeichnissen (node_modules,
+    __pycache__ usw.). Gleiche Parameter ergeben denselben Baum."""
+    rng = random.Random(params["seed"])
+    directories = directory_paths(root, params["depth"], params["fanout"], rng)
+    ignored_dirs = sorted(combine_files.IGNORED_DIRS - {".git"})
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+
+    for index in range(params["files"]):
+        directory = rng.choice(directories)
+        if rng.random() < params["ignored_ratio"]:
+            directory = os.path.join(directory, rng.choice(ignored_dirs))
+            os.makedirs(directory, exist_ok=True)
+        size = random_size(rng, params)
+        if rng.random() < params["binary_ratio"]:
+            name = f"file{index}{rng.choice(BINARY_EXTENSIONS)}"
+            with open(os.path.join(directory, name), 'wb') as file:
+                file.write(b"\x00" + rng.randbytes(size - 1) if size > 1 else b"\x00")
+        else:
+            name = f"file{index}{rng.choice(TEXT_EXTENSIONS)}"
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as file:
+                file.write(text_content(rng, size))
+
+    with open(os.path.join(root, TREE_MARKER), 'w', encoding='utf-8') as file:
+        json.dump(params, file)
+
+def prepare_tree(work_dir, params):
+    """Gibt den Pfad eines Baums für params zurück und erzeugt ihn nur, wenn er noch nicht existiert."""
+    key = hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    root = os.path.join(work_dir, f"tree-{params['files']}-{key}")
+    marker = os.path.join(root, TREE_MARKER)
+    if os.path.exists(marker):
+        return root, False
+    if os.path.exists(root):
+        # Unvollständig erzeugter Baum aus einem abgebrochenen Lauf
+        shutil.rmtree(root)
+    generate_tree(root, params)
+    return root, True
+
+def measure(function, repeat):
+    """Führt function repeat-mal aus und gibt die Laufzeiten in Sekunden zurück."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+def summarize(runs, **extra):
+    """Fasst die Laufzeiten eines Benchmarks zusammen."""
+    return dict({
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+    }, **extra)
+
+def load_app(shortcuts_file):
+    """Importiert die Flask-App mit einer eigenen Shortcut-Datei oder gibt None zurück, wenn Flask fehlt.
+
+    Die Shortcut-Datei wird vor dem Import über COFIFO_SHORTCUTS_FILE gesetzt,
+    damit app.py beim Import keine shortcuts.json im Projektverzeichnis anlegt."""
+    os.environ['COFIFO_SHORTCUTS_FILE'] = shortcuts_file
+    try:
+        import app
+    except ImportError as e:
+        print(f"Warnung: Web-Benchmarks werden übersprungen ({e}).")
+        return None
+    return app
+
+def run_benchmarks(root, work_dir, repeat=3, jobs=1, only=None):
+    """Führt die Benchmarks auf dem Baum root aus und gibt die Ergebnisse zurück."""
+    only = only or BENCHMARKS
+    shortcuts_file = os.path.join(work_dir, "shortcuts.json")
+    output_file = os.path.join(work_dir, "output.txt")
+    combine_files.SHORTCUTS_FILE = shortcuts_file
+    with redirect_stdout(io.StringIO()):
+        combine_files.add_shortcut("benchmark", [root])
+
+    results = {}
+    # Nur zählen, ohne die Inhalte zu lesen (bei 1M Dateien nicht im Speicher zu halten)
+    file_count = sum(1 for _ in combine_files.iter_file_paths([root]))
+
+    def timed(name, function, **extra):
+        if name in only:
+            print(f"  {name} ...", end=" ", flush=True)
+            results[name] = summarize(measure(function, repeat), **extra)
+            print(f"{results[name]['median']:.3f} s (Median)")
+
+    timed("generate_tree_structure", lambda: combine_files.generate_tree_structure(root))
+    timed("get_files_from_paths", lambda: combine_files.get_files_from_paths([root], jobs=jobs),
+          files=file_count)
+
+    def use_shortcut():
+        with redirect_stdout(io.StringIO()):
+            combine_files.use_shortcut("benchmark", output_file, jobs=jobs)
+    timed("use_shortcut", use_shortcut, files=file_count)
+    if "use_shortcut" in results:
+        size = os.path.getsize(output_file)
+        results["use_shortcut"]["bytes"] = size
+        results["use_shortcut"]["mb_per_s"] = size / 1024 ** 2 / results["use_shortcut"]["median"]
+
+    if not {"api_browse", "api_use_shortcut"} & set(only):
+        return results
+    app = load_app(shortcuts_file)
+    if app is None:
+        return results
+    client = app.app.test_client()
+
+    def browse():
+        # Ohne Zwischenspeicher messen, sonst wird nur der Cache-Treffer gemessen
+        app.clear_browse_cache()
+        response = client.get('/api/browse', query_string={'path': root})
+        assert response.status_code == 200, response.get_data(as_text=True)
+    timed("api_browse", browse)
+
+    def api_use_shortcut():
+        with redirect_stdout(io.StringIO()):
+            response = client.post('/api/use_shortcut', json={
+                'name': 'benchmark', 'output_file': output_file, 'jobs': jobs})
+        assert response.status_code == 200, response.get_data(as_text=True)
+    timed("api_use_shortcut", api_use_shortcut, files=file_count)
+    return results
+
+def compare_results(results, baseline, threshold):
+    """Vergleicht die Mediane mit einer Baseline und gibt die Namen verschlechterter Benchmarks zurück."""
+    if baseline.get("params") != results["params"]:
+        print("Warnung: Die Baseline wurde mit anderen Parametern erstellt.")
+    regressions = []
+    print(f"\n{'Benchmark':<26} {'Baseline':>10} {'Aktuell':>10} {'Faktor':>8}")
+    for name, result in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            print(f"{name:<26} {'-':>10} {result['median']:>9.3f}s {'neu':>8}")
+            continue
+        ratio = result["median"] / previous["median"] if previous["median"] else float("inf")
+        marker = " !" if ratio > threshold else ""
+        print(f"{name:<26} {previous['median']:>9.3f}s {result['median']:>9.3f}s {ratio:>7.2f}x{marker}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+def show_help():
+    """Zeigt die Hilfe für das Benchmark-Skript an."""
+    print("Verwendung: python benchmark.py [optionen]")
+    print("\nBaum:")
+    print("  --files <anzahl>        Anzahl der Dateien, z. B. 1000, 10k, 1M (Standard: 1000).")
+    print("  --depth <n>             Maximale Verzeichnistiefe (Standard: 4).")
+    print("  --fanout <n>            Maximale Anzahl Unterverzeichnisse pro Verzeichnis (Standard: 6).")
+    print("  --size-median <größe>   Median der Dateigröße, z. B. 2K (Standard: 2K).")
+    print("  --size-sigma <wert>     Streuung der Log-Normalverteilung der Größen (Standard: 1.0).")
+    print("  --max-size <größe>      Maximale Dateigröße (Standard: 1M).")
+    print("  --binary-ratio <wert>   Anteil der Binärdateien (Standard: 0.05).")
+    print("  --ignored-ratio <wert>  Anteil der Dateien in ignorierten Verzeichnissen (Standard: 0.1).")
+    print("  --seed <n>              Startwert des Zufallsgenerators (Standard: 42).")
+    print("  --work-dir <pfad>       Verzeichnis für Bäume und Ausgaben (Standard: Temp-Verzeichnis).")
+    print("\nMessung:")
+    print("  --repeat <n>            Wiederholungen pro Benchmark (Standard: 3).")
+    print("  --jobs <n>              Threads zum Lesen der Dateien (Standard: 1).")
+    print("  --only <a,b,...>        Nur diese Benchmarks: " + ", ".join(BENCHMARKS))
+    print("  --output <datei>        Speichert die Ergebnisse als JSON.")
+    print("  --baseline <datei>      Vergleicht mit gespeicherten Ergebnissen.")
+    print("  --threshold <faktor>    Ab diesem Faktor gilt ein Benchmark als verschlechtert (Standard: 1.2).")
+
+def main(args=None):
+    """Hauptfunktion des Benchmark-Skripts."""
+    args = sys.argv[1:] if args is None else list(args)
+    if "--help" in args:
+        show_help()
+        return 0
+
+    params = {
+        "files": get_option(args, "--files", parse_count, DEFAULT_PARAMS["files"]),
+        "depth": get_option(args, "--depth", int, DEFAULT_PARAMS["depth"]),
+        "fanout": get_option(args, "--fanout", int, DEFAULT_PARAMS["fanout"]),
+        "size_median": get_option(args, "--size-median", combine_files.parse_size, DEFAULT_PARAMS["size_median"]),
+        "size_sigma": get_option(args, "--size-sigma", float, DEFAULT_PARAMS["size_sigma"]),
+        "max_size": get_option(args, "--max-size", combine_files.parse_size, DEFAULT_PARAMS["max_size"]),
+        "binary_ratio": get_option(args, "--binary-ratio", float, DEFAULT_PARAMS["binary_ratio"]),
+        "ignored_ratio": get_option(args, "--ignored-ratio", float, DEFAULT_PARAMS["ignored_ratio"]),
+        "seed": get_option(args, "--seed", int, DEFAULT_PARAMS["seed"]),
+    }
+    repeat = get_option(args, "--repeat", int, 3)
+    jobs = get_option(args, "--jobs", int, 1)
+    threshold = get_option(args, "--threshold", float, 1.2)
+    only = get_option(args, "--only", lambda value: value.split(","), None)
+    if only and not set(only) <= set(BENCHMARKS):
+        print(f"Fehler: Unbekannte Benchmarks: {', '.join(sorted(set(only) - set(BENCHMARKS)))}.")
+        return 1
+    work_dir = get_option(args, "--work-dir", str,
+                          os.path.join(tempfile.gettempdir(), "cofifo-benchmark"))
+    os.makedirs(work_dir, exist_ok=True)
+
+    print(f"Bereite Baum mit {params['files']} Dateien vor ...")
+    start = time.perf_counter()
+    root, created = prepare_tree(work_dir, params)
+    print(f"{'Erzeugt' if created else 'Wiederverwendet'}: {root} ({time.perf_counter() - start:.1f} s)")
+
+    print("Führe Benchmarks aus:")
+    results = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "repeat": repeat,
+        "jobs": jobs,
+        "results": run_benchmarks(root, work_dir, repeat, jobs, only),
+    }
+
+    output = get_option(args, "--output", str, None)
+    if output:
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"Ergebnisse gespeichert in {output}")
+
+    baseline_file = get_option(args, "--baseline", str, None)
+    if baseline_file:
+        with open(baseline_file, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare_results(results, baseline, threshold)
+        if regressions:
+            print(f"\nVerschlechtert (> {threshold:.2f}x): {', '.join(regressions)}")
+            return 1
+        print("\nKeine Verschlechterung gegenüber der Baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
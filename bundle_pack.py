@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+CofifoAIWO - Pack-Format
+
+Binäres Ausgabeformat mit Offset-Tabelle, aus dem einzelne Dateien gelesen
+werden können, ohne die übrige Ausgabe zu laden oder zu parsen
+(combine_files.py --use <name> <ausgabe.pack> --format pack).
+
+Aufbau einer Pack-Datei:
+
+    Kopf (HEADER_SIZE Bytes): Magic, Version, Position und Länge der Tabelle
+    Daten: die Inhalte der Dateien (und ggf. die Verzeichnisstruktur) ohne Trennzeichen
+    Tabelle (JSON, UTF-8): {"tree": [Offset, Länge] oder null,
+                            "files": [[Pfad, Offset, Länge, SHA-256], ...]}
+
+Offsets sind absolut. Identische Inhalte werden nur einmal gespeichert;
+mehrere Einträge der Tabelle verweisen dann auf denselben Bereich. Die
+Tabelle steht hinter den Daten, damit die Ausgabe in einem Durchlauf
+geschrieben werden kann; der Kopf wird zuletzt geschrieben.
+
+Lesen mit PackReader (über mmap, nur die angefragten Bereiche werden
+vom Betriebssystem geladen):
+
+    with bundle_pack.PackReader("ausgabe.pack") as pack:
+        text = pack.read_text("src/main.py")
+        for path, data in pack.iter_prefix("src/"):
+            ...
+
+Das Modul hat keine Abhängigkeiten zu den übrigen Modulen und kann von
+anderen Diensten direkt verwendet werden.
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+from bisect import bisect_left
+
+MAGIC = b"COFIFOPK"
+VERSION = 1
+
+# Magic, Version, reserviert, Position der Tabelle, Länge der Tabelle
+HEADER_FORMAT = "<8sIIQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+class PackWriter:
+    """Schreibt eine Pack-Datei in ein zum Schreiben geöffnetes, seekbares Dateiobjekt.
+
+    add speichert den Inhalt einer Datei, add_tree die Verzeichnisstruktur;
+    close schreibt Tabelle und Kopf. Die Datei selbst schließt der Aufrufer."""
+
+    def __init__(self, file):
+        self._file = file
+        self._file.write(b"\x00" * HEADER_SIZE)
+        self._offset = HEADER_SIZE
+        self._entries = []
+        self._tree = None
+        # SHA-256 -> (Offset, Länge) bereits gespeicherter Inhalte
+        self._contents = {}
+        self.saved_bytes = 0
+
+    def _write(self, data):
+        offset = self._offset
+        self._file.write(data)
+        self._offset += len(data)
+        return offset
+
+    def add(self, path, data, sha256=None):
+        """Speichert den Inhalt (Bytes) einer Datei unter dem relativen Pfad path.
+
+        Gibt die Anzahl der geschriebenen Bytes zurück (0 bei einem Inhalt,
+        der bereits gespeichert ist)."""
+        sha256 = sha256 or hashlib.sha256(data).hexdigest()
+        stored = self._contents.get(sha256)
+        if stored is None:
+            stored = self._contents[sha256] = (self._write(data), len(data))
+            written = len(data)
+        else:
+            self.saved_bytes += len(data)
+            written = 0
+        self._entries.append([path, stored[0], stored[1], sha256])
+        return written
+
+    def add_tree(self, data):
+        """Speichert die Verzeichnisstruktur (Bytes)."""
+        self._tree = [self._write(data), len(data)]
+        return len(data)
+
+    @property
+    def file_count(self):
+        return len(self._entries)
+
+    def close(self):
+        """Schreibt die Tabelle und den Kopf."""
+        table = json.dumps({"tree": self._tree, "files": self._entries},
+                           ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        table_offset = self._write(table)
+        self._file.seek(0)
+        self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, table_offset, len(table)))
+        self._file.seek(0, 2)
+
+class PackReader:
+    """Liest Dateien aus einer Pack-Datei über mmap.
+
+    Beim Öffnen werden nur Kopf und Tabelle gelesen; get und iter_prefix
+    lesen nur die Bereiche der angefragten Dateien. Bei mehreren Einträgen mit
+    demselben Pfad (gleiche relative Pfade aus verschiedenen Verzeichnissen)
+    liefert get den ersten."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load_table()
+        except Exception:
+            self._map.close()
+            raise
+
+    def _load_table(self):
+        if len(self._map) < HEADER_SIZE:
+            raise ValueError(f"{self.path} ist keine Pack-Datei (zu kurz)")
+        magic, version, _, table_offset, table_length = struct.unpack_from(HEADER_FORMAT, self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} ist keine Pack-Datei")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: Nicht unterstützte Version {version} des Pack-Formats")
+        if table_offset + table_length > len(self._map):
+            raise ValueError(f"{self.path} ist unvollständig")
+        table = json.loads(self._map[table_offset:table_offset + table_length].decode("utf-8"))
+        self.tree_entry = table.get("tree")
+        # Einträge in der Reihenfolge der Ausgabe: (Pfad, Offset, Länge, SHA-256)
+        self.entries = [tuple(entry) for entry in table["files"]]
+        self._paths = {}
+        for position, entry in enumerate(self.entries):
+            self._paths.setdefault(entry[0], position)
+        # Sortierte Pfade für die Suche nach Präfixen
+        self._sorted = sorted((entry[0], position) for position, entry in enumerate(self.entries))
+        self._sorted_paths = [path for path, _ in self._sorted]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return path in self._paths
+
+    def close(self):
+        self._map.close()
+
+    def paths(self):
+        """Gibt die Pfade aller Dateien in der Reihenfolge der Ausgabe zurück."""
+        return [entry[0] for entry in self.entries]
+
+    def entry(self, path):
+        """Gibt den Eintrag (Pfad, Offset, Länge, SHA-256) zu path zurück; KeyError, falls er fehlt."""
+        return self.entries[self._paths[path]]
+
+    def _slice(self, offset, length):
+        return self._map[offset:offset + length]
+
+    def get(self, path):
+        """Gibt den Inhalt von path als Bytes zurück; KeyError, falls die Datei fehlt."""
+        _, offset, length, _ = self.entry(path)
+        return self._slice(offset, length)
+
+    def read_text(self, path):
+        """Gibt den Inhalt von path als Text zurück."""
+        return self.get(path).decode("utf-8")
+
+    @property
+    def tree(self):
+        """Die Verzeichnisstruktur als Text oder None, falls sie nicht enthalten ist."""
+        if self.tree_entry is None:
+            return None
+        return self._slice(*self.tree_entry).decode("utf-8")
+
+    def iter_prefix(self, prefix):
+        """Liefert (Pfad, Inhalt als Bytes) für alle Dateien, deren Pfad mit prefix beginnt (nach Pfad sortiert)."""
+        for index in range(bisect_left(self._sorted_paths, prefix), len(self._sorted)):
+            path, position = self._sorted[index]
+            if not path.startswith(prefix):
+                break
+            _, offset, length, _ = self.entries[position]
+            yield path, self._slice(offset, length)
+
+    def verify(self, path):
+        """Prüft den SHA-256 des Inhalts von path."""
+        _, offset, length, sha256 = self.entry(path)
+        return hashlib.sha256(self._slice(offset, length)).hexdigest() == sha256
+
+def open_pack(path):
+    """Öffnet eine Pack-Datei zum Lesen (siehe PackReader)."""
+    return PackReader(path)
+
+def is_pack(path):
+    """Prüft anhand des Kopfes, ob path eine Pack-Datei ist."""
+    try:
+        with open(path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
@@ -7,12 +7,17 @@ Dieses Skript stellt eine interaktive Kommandozeile für CofifoAIWO bereit.
 
 import os
 import sys
-import subprocess
 from pathlib import Path
 
 # Pfad zum Basisverzeichnis
 BASE_DIR = Path(__file__).resolve().parent
-COMBINE_FILES_PY = BASE_DIR / "combine_files.py"
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+# combine_files wird im selben Prozess (oder im Daemon) ausgeführt statt
+# pro Befehl einen neuen Interpreter zu starten
+import daemon
+from daemon import run_command
 
 def print_header():
     """Druckt einen Kopf für die CLI."""
@@ -36,7 +41,7 @@ def print_commands():
 
 def list_shortcuts():
     """Listet alle verfügbaren Shortcuts auf."""
-    subprocess.run([sys.executable, COMBINE_FILES_PY, "--list"])
+    run_command(["--list"])
 
 def add_shortcut():
     """Fügt einen neuen Shortcut hinzu."""
@@ -51,8 +56,7 @@ def add_shortcut():
         paths.append(path)
     
     if paths:
-        command = [sys.executable, COMBINE_FILES_PY, "--add", name] + paths
-        subprocess.run(command)
+        run_command(["--add", name] + paths)
     else:
         print("Keine Pfade angegeben. Shortcut wurde nicht erstellt.")
 
@@ -65,11 +69,11 @@ def use_shortcut():
     output_file = input("Name der Ausgabedatei: ")
     include_tree = input("Verzeichnisstruktur einbeziehen (j/n)? ").lower() in ["j", "ja"]
     
-    command = [sys.executable, COMBINE_FILES_PY, "--use", name, output_file]
+    command = ["--use", name, output_file]
     if include_tree:
         command.append("--tree")
     
-    subprocess.run(command)
+    run_command(command)
 
 def remove_shortcut():
     """Entfernt einen Shortcut."""
@@ -80,13 +84,13 @@ def remove_shortcut():
     confirm = input(f"Möchtest du den Shortcut '{name}' wirklich entfernen (j/n)? ").lower()
     
     if confirm in ["j", "ja"]:
-        subprocess.run([sys.executable, COMBINE_FILES_PY, "--remove", name])
+        run_command(["--remove", name])
     else:
         print("Löschvorgang abgebrochen.")
 
 def show_help():
     """Zeigt die Hilfe an."""
-    subprocess.run([sys.executable, COMBINE_FILES_PY, "--help"])
+    run_command(["--help"])
 
 def start_web_interface():
     """Startet das Web-Interface."""
@@ -101,7 +105,8 @@ def start_web_interface():
     print("Drücke Strg+C, um zu beenden.")
     
     try:
-        subprocess.run([sys.executable, app_py])
+        import app
+        app.app.run(port=5000)
     except KeyboardInterrupt:
         print("\nWeb-Interface beendet.")
 
@@ -109,9 +114,19 @@ def main():
     """Hauptfunktion."""
     # Überprüfe, ob Kommandozeilenargumente übergeben wurden
     if len(sys.argv) > 1:
-        # Wenn Argumente vorhanden sind, leite sie direkt an combine_files.py weiter
-        subprocess.run([sys.executable, COMBINE_FILES_PY] + sys.argv[1:])
-        return
+        args = sys.argv[1:]
+        if args[0] == "--daemon":
+            sys.exit(0 if daemon.serve() else 1)
+        if args[0] == daemon.STOP_COMMAND:
+            if daemon.forward_command(args) is None:
+                print("Es läuft kein Daemon.")
+            return
+        # Wenn ein Daemon läuft, übernimmt er den Befehl; sonst wird er
+        # direkt mit combine_files ausgeführt
+        exit_code = daemon.forward_command(args)
+        if exit_code is None:
+            exit_code = run_command(args)
+        sys.exit(exit_code)
     
     print_header()
     
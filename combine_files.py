@@ -9,46 +9,192 @@ benötigt wird.
 """
 
 import os
+import re
 import sys
+import gzip
+import codecs
 import json
+import lzma
+import time
+import hashlib
+import threading
+from collections import Counter, deque
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+import bundle_pack
+import reducers
+import shortcut_store
+import sources
+
 # Konstante für die Shortcut-Datei
 SHORTCUTS_FILE = "shortcuts.json"
 
 # Verzeichnisse, die ignoriert werden sollen
 IGNORED_DIRS = {"dist", "node_modules", ".git", "__pycache__", "venv"}
 
+# Name der Ignore-Dateien, die beim Durchlauf berücksichtigt werden
+GITIGNORE_FILE = ".gitignore"
+
+# Maximale Anzahl gleichzeitig gelesener Dateien pro Thread im Parallelmodus
+READ_AHEAD_PER_JOB = 4
+
+# Anzahl der Bytes, die zur Erkennung von Binärdateien gelesen werden
+SNIFF_SIZE = 8192
+
+# Ab dieser Größe werden Dateien nicht in den Speicher gelesen, sondern nach
+# der Prüfung der Kodierung direkt (im Kernel) in die Ausgabedatei kopiert
+ZERO_COPY_MIN_SIZE = 1024 * 1024
+# Blockgröße beim Prüfen und Kopieren großer Dateien
+COPY_BLOCK_SIZE = 1024 * 1024
+# Puffergröße der Ausgabedatei
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Dateiendungen, die ohne Lesen als Binärdateien gelten
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tif", ".tiff", ".psd",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".jar", ".war", ".whl",
+    ".exe", ".dll", ".so", ".dylib", ".o", ".a", ".lib", ".bin", ".class", ".pyc", ".pyo",
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt",
+    ".mp3", ".mp4", ".wav", ".ogg", ".flac", ".avi", ".mov", ".mkv", ".webm",
+    ".ttf", ".otf", ".woff", ".woff2", ".eot",
+    ".sqlite", ".sqlite3", ".db", ".iso", ".img", ".dmg",
+}
+
+# Dateinamen von Lockdateien, deren Inhalt für KI-Workflows nicht relevant ist
+LOCK_FILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "Cargo.lock", "poetry.lock",
+    "Pipfile.lock", "composer.lock", "Gemfile.lock", "go.sum",
+}
+
+# Signaturen (Magic Numbers) bekannter Binärformate
+BINARY_SIGNATURES = (
+    b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"%PDF", b"PK\x03\x04", b"\x1f\x8b",
+    b"BZh", b"\xfd7zXZ", b"7z\xbc\xaf", b"Rar!", b"\x7fELF", b"MZ", b"\xca\xfe\xba\xbe",
+    b"\xcf\xfa\xed\xfe", b"SQLite format 3", b"OggS", b"ID3", b"RIFF", b"wOFF", b"wOF2",
+)
+
+# Gründe für übersprungene Dateien
+SKIP_BINARY = "Binärdatei"
+SKIP_TOO_LARGE = "zu groß"
+SKIP_LOCK_FILE = "Lockdatei"
+
+# Grobe Schätzung für Token-Budgets: durchschnittliche Bytes pro Token
+BYTES_PER_TOKEN = 4
+
+# Maximale Anzahl ausgelassener Dateien, die in der Zusammenfassung genannt werden
+MAX_DROPPED_LISTED = 20
+
+# Watch-Modus: Abfrageintervalle und Wartezeit nach der letzten Änderung (Sekunden)
+WATCH_EVENT_INTERVAL = 0.1
+WATCH_POLL_INTERVAL = 1.0
+WATCH_DEBOUNCE = 0.3
+
+# Manifest für inkrementelle Builds (liegt neben der Ausgabedatei)
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+# Aufgeteilte Ausgabe: Übersicht der Teildateien (liegt neben den Teildateien)
+SHARD_INDEX_SUFFIX = ".index.json"
+SHARD_INDEX_VERSION = 1
+
+# Phasen eines Builds für --stats und /api/metrics (Name in new_report -> Bezeichnung)
+STATS_PHASES = {
+    "walk": "Durchlauf",
+    "read": "Lesen",
+    "decode": "Dekodier-Umwege",
+    "reduce": "Reduzieren",
+    "write": "Schreiben",
+    "manifest": "Manifest",
+    "total": "Gesamt",
+}
+
+# Schützt die Zähler im Protokoll (siehe add_stats)
+_stats_lock = threading.Lock()
+
+# Komprimierte Ausgabe: Dateiendung -> Verfahren (oder explizit mit --compress)
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".xz": "xz"}
+COMPRESSION_METHODS = ("gzip", "xz")
+GZIP_LEVEL = 6
+XZ_PRESET = 6
+
+# Ausgabeformate: Text mit "=== Datei: ... ===" oder Pack mit Offset-Tabelle (siehe bundle_pack)
+OUTPUT_FORMATS = ("text", "pack")
+
+# Höchstzahl der Verzeichnisse, deren Einträge der DirectoryCache vorhält
+MAX_CACHED_DIRECTORIES = 100000
+
 def load_shortcuts():
-    """Lädt die Shortcuts aus der JSON-Datei."""
-    if os.path.exists(SHORTCUTS_FILE):
-        with open(SHORTCUTS_FILE, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    return {}
+    """Lädt die Shortcuts aus der JSON-Datei (zwischengespeichert, siehe shortcut_store)."""
+    return shortcut_store.load_shortcuts(SHORTCUTS_FILE)
 
 def save_shortcuts(shortcuts):
     """Speichert die Shortcuts in der JSON-Datei."""
-    with open(SHORTCUTS_FILE, 'w', encoding='utf-8') as file:
-        json.dump(shortcuts, file, indent=4)
+    shortcut_store.save_shortcuts(SHORTCUTS_FILE, shortcuts)
+
+def shortcut_paths(shortcut):
+    """Gibt die Pfade eines Shortcuts zurück.
 
-def add_shortcut(name, paths):
+    Shortcuts ohne Filter werden als Liste von Pfaden gespeichert, Shortcuts
+    mit Filtern als Objekt mit den Schlüsseln paths, include, exclude, gitignore
+    und git."""
+    if isinstance(shortcut, dict):
+        return shortcut.get("paths", [])
+    return shortcut
+
+def shortcut_filter_options(shortcut):
+    """Gibt die Filteroptionen eines Shortcuts zurück (include, exclude, gitignore, git).
+
+    Mit git werden Verzeichnisse aus dem Git-Index gelesen statt durchlaufen
+    (siehe scan_git_directory)."""
+    if not isinstance(shortcut, dict):
+        shortcut = {}
+    return {
+        "include": shortcut.get("include", []),
+        "exclude": shortcut.get("exclude", []),
+        "gitignore": shortcut.get("gitignore", True),
+        "git": shortcut.get("git", False),
+    }
+
+def make_shortcut(paths, include=None, exclude=None, gitignore=True, git=False):
+    """Erstellt den gespeicherten Wert eines Shortcuts (mit Filtern als Objekt, sonst als Liste)."""
+    if include or exclude or not gitignore or git:
+        shortcut = {
+            "paths": paths,
+            "include": include or [],
+            "exclude": exclude or [],
+            "gitignore": gitignore,
+        }
+        if git:
+            shortcut["git"] = True
+        return shortcut
+    return paths
+
+def add_shortcut(name, paths, include=None, exclude=None, gitignore=True, git=False):
     """Fügt einen neuen Shortcut hinzu."""
-    shortcuts = load_shortcuts()
-    if name in shortcuts:
-        print(f"Warnung: Shortcut '{name}' existiert bereits und wird überschrieben.")
-    shortcuts[name] = paths
-    save_shortcuts(shortcuts)
+    existed = []
+
+    def add(shortcuts):
+        existed.append(name in shortcuts)
+        shortcuts[name] = make_shortcut(paths, include, exclude, gitignore, git)
+
+    shortcut_store.update_shortcuts(SHORTCUTS_FILE, add)
+    if existed[0]:
+        print(f"Warnung: Shortcut '{name}' existiert bereits und wurde überschrieben.")
     print(f"Shortcut '{name}' wurde hinzugefügt.")
 
 def remove_shortcut(name):
     """Entfernt einen Shortcut."""
-    shortcuts = load_shortcuts()
-    if name in shortcuts:
+    def remove(shortcuts):
+        if name not in shortcuts:
+            return False
         del shortcuts[name]
-        save_shortcuts(shortcuts)
-        print(f"Shortcut '{name}' wurde entfernt.")
-    else:
+
+    if shortcut_store.update_shortcuts(SHORTCUTS_FILE, remove) is False:
         print(f"Fehler: Shortcut '{name}' existiert nicht.")
+    else:
+        print(f"Shortcut '{name}' wurde entfernt.")
 
 def list_shortcuts():
     """Listet alle verfügbaren Shortcuts auf."""
@@ -57,84 +203,1986 @@ def list_shortcuts():
         print("Keine Shortcuts verfügbar.")
     else:
         print("Verfügbare Shortcuts:")
-        for name, paths in shortcuts.items():
-            print(f"- {name}: {', '.join(paths)}")
+        for name, shortcut in shortcuts.items():
+            print(f"- {name}: {', '.join(shortcut_paths(shortcut))}")
+            options = shortcut_filter_options(shortcut)
+            if options["include"]:
+                print(f"    include: {', '.join(options['include'])}")
+            if options["exclude"]:
+                print(f"    exclude: {', '.join(options['exclude'])}")
+            if not options["gitignore"]:
+                print("    .gitignore wird nicht berücksichtigt")
+            if options["git"]:
+                print("    Dateien aus dem Git-Index (git ls-files)")
 
-def generate_tree_structure(path, prefix=""):
-    """Generiert die Verzeichnisstruktur im 'tree'-Format und ignoriert bestimmte Verzeichnisse."""
+def compile_pattern(pattern):
+    """Übersetzt ein Muster im .gitignore-Format in eine Regel (Regex, negiert, nur Verzeichnisse).
+
+    Gibt None für leere Zeilen und Kommentare zurück. Muster ohne '/' gelten
+    für Namen in jeder Tiefe, Muster mit '/' relativ zum Basisverzeichnis."""
+    pattern = pattern.rstrip("\n").rstrip()
+    if not pattern or pattern.startswith("#"):
+        return None
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    if pattern.startswith("\\"):
+        pattern = pattern[1:]
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    if not pattern:
+        return None
+
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                content = pattern[i + 1:end]
+                if content.startswith("!"):
+                    content = "^" + content[1:]
+                regex += f"[{content}]"
+                i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    return re.compile(f"{prefix}{regex}"), negate, dir_only
+
+def compile_patterns(patterns):
+    """Übersetzt eine Liste von Mustern in Regeln für PathFilter."""
+    rules = []
+    for pattern in patterns:
+        rule = compile_pattern(pattern)
+        if rule is not None:
+            rules.append(rule)
+    return rules
+
+def match_rules(rules, relative_path, is_dir, excluded=False):
+    """Wendet Regeln auf einen relativen Pfad an; die letzte passende Regel entscheidet."""
+    for regex, negate, dir_only in rules:
+        if dir_only and not is_dir:
+            continue
+        if regex.fullmatch(relative_path):
+            excluded = not negate
+    return excluded
+
+class PathFilter:
+    """Filtert Dateien und Verzeichnisse unterhalb eines Basisverzeichnisses.
+
+    Berücksichtigt die include- und exclude-Muster eines Shortcuts sowie
+    .gitignore-Dateien, die während des Durchlaufs gefunden werden. Alle Muster
+    werden einmal kompiliert; ausgeschlossene Verzeichnisse werden nicht betreten.
+    read_text ersetzt das Lesen der .gitignore-Dateien von der Festplatte
+    (z. B. für Archive, siehe sources)."""
+
+    def __init__(self, root, include=None, exclude=None, gitignore=True, read_text=None):
+        self.root = os.path.normpath(root)
+        self.include = compile_patterns(include or [])
+        self.exclude = compile_patterns(exclude or [])
+        self.gitignore = gitignore
+        self.read_text = read_text
+        # Regeln aus .gitignore-Dateien je Verzeichnis, vom Wurzel- zum Unterverzeichnis
+        self.active_rules = {self.root: []}
+
+    def enter_directory(self, dirpath, filenames):
+        """Liest eine vorhandene .gitignore-Datei ein, bevor die Einträge von dirpath geprüft werden."""
+        dirpath = os.path.normpath(dirpath)
+        inherited = self.active_rules.get(os.path.dirname(dirpath), [])
+        rules = inherited
+        if self.gitignore and GITIGNORE_FILE in filenames:
+            try:
+                gitignore_path = os.path.join(dirpath, GITIGNORE_FILE)
+                if self.read_text is not None:
+                    own_rules = compile_patterns(self.read_text(gitignore_path).splitlines())
+                else:
+                    with open(gitignore_path, 'r', encoding='utf-8') as file:
+                        own_rules = compile_patterns(file.readlines())
+            except (OSError, UnicodeDecodeError):
+                own_rules = []
+            if own_rules:
+                rules = inherited + [(dirpath, own_rules)]
+        self.active_rules[dirpath] = rules
+
+    def _relative(self, base, full_path):
+        relative_path = full_path[len(base) + 1:]
+        return relative_path.replace(os.sep, "/") if os.sep != "/" else relative_path
+
+    def is_excluded(self, full_path, is_dir):
+        """Prüft, ob ein Eintrag durch .gitignore oder exclude-Muster ausgeschlossen ist."""
+        full_path = os.path.normpath(full_path)
+        excluded = False
+        for base, rules in self.active_rules.get(os.path.dirname(full_path), []):
+            excluded = match_rules(rules, self._relative(base, full_path), is_dir, excluded)
+        if self.exclude:
+            excluded = match_rules(self.exclude, self._relative(self.root, full_path), is_dir, excluded)
+        if not excluded and not is_dir and self.include:
+            excluded = not self.is_included(self._relative(self.root, full_path))
+        return excluded
+
+    def is_included(self, relative_path):
+        """Prüft eine Datei gegen die include-Muster; die letzte passende Regel entscheidet.
+
+        Eine Regel passt auf die Datei selbst oder auf eines ihrer übergeordneten
+        Verzeichnisse, sodass auch Verzeichnismuster wie 'src/' oder 'src' alle
+        Dateien darin aufnehmen."""
+        directories = []
+        directory = relative_path.rpartition("/")[0]
+        while directory:
+            directories.append(directory)
+            directory = directory.rpartition("/")[0]
+        included = False
+        for regex, negate, dir_only in self.include:
+            if ((not dir_only and regex.fullmatch(relative_path))
+                    or any(regex.fullmatch(directory) for directory in directories)):
+                included = not negate
+        return included
+
+def make_path_filter(path, filter_options=None, read_text=None):
+    """Erstellt einen PathFilter für ein Verzeichnis aus den Filteroptionen eines Shortcuts."""
+    filter_options = filter_options or {}
+    return PathFilter(path, filter_options.get("include"), filter_options.get("exclude"),
+                      filter_options.get("gitignore", True), read_text)
+
+def uses_git(filter_options):
+    """Prüft, ob Verzeichnisse aus dem Git-Index gelesen werden (git oder since in filter_options)."""
+    return bool(filter_options and (filter_options.get("git") or filter_options.get("since")))
+
+def with_since(filter_options, since):
+    """Ergänzt die Filteroptionen um since: nur seit dieser Git-Revision geänderte Dateien."""
+    return dict(filter_options or {}, since=since) if since else filter_options
+
+def read_directory(path):
+    """Liest die Einträge eines Verzeichnisses mit os.scandir als Tupel
+    (Name, vollständiger Pfad, ist Verzeichnis, ist symbolischer Link) ein.
+
+    Die Typinformationen der DirEntry-Objekte werden wiederverwendet, sodass
+    pro Eintrag kein zusätzlicher stat-Aufruf nötig ist. Gibt None zurück,
+    wenn das Verzeichnis nicht lesbar ist."""
+    listing = []
+    try:
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                listing.append((entry.name, entry.path, is_dir, is_dir and entry.is_symlink()))
+    except OSError:
+        return None
+    return listing
+
+class DirectoryCache:
+    """Hält die Einträge eingelesener Verzeichnisse über mehrere Builds hinweg vor
+    (für langlebige Prozesse wie den Daemon, siehe enable_directory_cache).
+
+    Ein Verzeichnis wird erneut eingelesen, wenn sich seine Änderungszeit oder
+    Inode geändert hat oder es zuletzt nicht sicher vor dem Einlesen geändert
+    wurde (wie bei is_unchanged). Das Anlegen, Löschen und Umbenennen von
+    Einträgen ändert die Änderungszeit des Verzeichnisses; Änderungen an
+    Dateiinhalten betreffen die Einträge nicht. Es werden höchstens
+    max_directories Verzeichnisse vorgehalten (die am längsten nicht
+    verwendeten werden verworfen)."""
+
+    def __init__(self, max_directories=MAX_CACHED_DIRECTORIES):
+        self.max_directories = max_directories
+        # absoluter Pfad -> (Änderungszeit, Inode, Beginn des Einlesens, [(Name, ist Verzeichnis, ist Link)])
+        self._listings = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def list_directory(self, path):
+        """Wie read_directory, liest unveränderte Verzeichnisse aber nicht erneut ein."""
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            with self._lock:
+                self._listings.pop(key, None)
+            return None
+        with self._lock:
+            cached = self._listings.pop(key, None)
+            if (cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_ino
+                    and stat.st_mtime_ns < cached[2]):
+                self._listings[key] = cached
+                self.hits += 1
+                return [(name, os.path.join(path, name), is_dir, is_symlink)
+                        for name, is_dir, is_symlink in cached[3]]
+            self.misses += 1
+        started_ns = time.time_ns()
+        listing = read_directory(path)
+        if listing is None:
+            return None
+        entries = [(name, is_dir, is_symlink) for name, _, is_dir, is_symlink in listing]
+        with self._lock:
+            self._listings[key] = (stat.st_mtime_ns, stat.st_ino, started_ns, entries)
+            while len(self._listings) > self.max_directories:
+                del self._listings[next(iter(self._listings))]
+        return listing
+
+    def walk(self, top):
+        """Durchläuft ein Verzeichnis wie os.walk (von oben nach unten, dirnames änderbar)."""
+        return walk_listings(self.list_directory, top)
+
+    def directories(self):
+        """Gibt die absoluten Pfade aller vorgehaltenen Verzeichnisse zurück."""
+        with self._lock:
+            return list(self._listings)
+
+    def clear(self):
+        with self._lock:
+            self._listings.clear()
+
+# Verzeichnis-Zwischenspeicher des Prozesses (None: Verzeichnisse werden bei jedem Build eingelesen)
+directory_cache = None
+
+def enable_directory_cache(max_directories=MAX_CACHED_DIRECTORIES):
+    """Hält Verzeichniseinträge ab jetzt zwischen den Builds dieses Prozesses vor
+    (siehe DirectoryCache) und gibt den Zwischenspeicher zurück."""
+    global directory_cache
+    if directory_cache is None:
+        directory_cache = DirectoryCache(max_directories)
+    return directory_cache
+
+def default_list_directory():
+    """Gibt die Funktion zum Einlesen eines Verzeichnisses zurück (mit directory_cache, falls aktiviert)."""
+    return directory_cache.list_directory if directory_cache is not None else read_directory
+
+def default_walk():
+    """Gibt die Funktion zum Durchlaufen eines Verzeichnisses zurück (mit directory_cache, falls aktiviert)."""
+    return directory_cache.walk if directory_cache is not None else os.walk
+
+def walk_listings(list_directory, top):
+    """Durchläuft ein Verzeichnis wie os.walk mit list_directory statt os.scandir."""
+    listing = list_directory(top)
+    if listing is None:
+        return
+    dirnames = [name for name, _, is_dir, _ in listing if is_dir]
+    filenames = [name for name, _, is_dir, _ in listing if not is_dir]
+    symlinks = {name for name, _, is_dir, is_symlink in listing if is_symlink}
+    yield top, dirnames, filenames
+    for name in dirnames:
+        if name not in symlinks:
+            yield from walk_listings(list_directory, os.path.join(top, name))
+
+def scan_directory(path, path_filter=None, list_directory=None):
+    """Liest ein Verzeichnis rekursiv ein und gibt eine Liste von Tupeln zurück:
+    (Name, vollständiger Pfad, Unterverzeichniseinträge oder None bei Dateien).
+
+    Ignorierte und durch path_filter ausgeschlossene Verzeichnisse werden nicht
+    betreten, symbolische Links auf Verzeichnisse werden wie bei os.walk nicht
+    verfolgt. list_directory ersetzt read_directory (z. B. SharedCache.list_directory)."""
+    list_directory = list_directory or default_list_directory()
+    listing = list_directory(path)
+    if listing is None:
+        # Nicht lesbare Verzeichnisse werden wie bei os.walk übersprungen
+        return []
+    dir_entries = [entry for entry in listing if entry[0] not in IGNORED_DIRS]
+    if path_filter is not None:
+        path_filter.enter_directory(path, {name for name, _, _, _ in dir_entries})
+
+    entries = []
+    for name, full_path, is_dir, is_symlink in dir_entries:
+        if path_filter is not None and path_filter.is_excluded(full_path, is_dir):
+            continue
+        if not is_dir:
+            entries.append((name, full_path, None))
+        elif is_symlink:
+            entries.append((name, full_path, []))
+        else:
+            entries.append((name, full_path, scan_directory(full_path, path_filter, list_directory)))
+    return entries
+
+def count_entries(entries):
+    """Zählt alle Einträge eines eingelesenen Verzeichnisses rekursiv."""
+    return sum(1 + (count_entries(children) if children else 0) for _, _, children in entries)
+
+def render_tree(entries, prefix="", max_depth=None, max_entries=None, depth=1):
+    """Erzeugt die Zeilen der Verzeichnisstruktur aus einem mit scan_directory eingelesenen Verzeichnis.
+
+    max_depth begrenzt die Tiefe, max_entries die Anzahl der Einträge pro
+    Verzeichnis. Ausgelassene Einträge werden zu einer Zeile
+    '… N weitere Einträge' zusammengefasst."""
     tree = []
-    if os.path.isdir(path):
-        entries = os.listdir(path)
-        entries = [e for e in entries if e not in IGNORED_DIRS]  # Ignoriere bestimmte Verzeichnisse
-        for i, entry in enumerate(entries):
-            full_path = os.path.join(path, entry)
-            if i == len(entries) - 1:
-                tree.append(f"{prefix}└── {entry}")
-                if os.path.isdir(full_path) and entry not in IGNORED_DIRS:
-                    tree.extend(generate_tree_structure(full_path, prefix + "    "))
+    shown = entries if max_entries is None else entries[:max_entries]
+    hidden = len(entries) - len(shown)
+    for i, (name, _, children) in enumerate(shown):
+        is_last = i == len(shown) - 1 and not hidden
+        tree.append(f"{prefix}{'└── ' if is_last else '├── '}{name}")
+        if children:
+            child_prefix = prefix + ("    " if is_last else "│   ")
+            if max_depth is not None and depth >= max_depth:
+                tree.append(f"{child_prefix}└── … {count_entries(children)} weitere Einträge")
             else:
-                tree.append(f"{prefix}├── {entry}")
-                if os.path.isdir(full_path) and entry not in IGNORED_DIRS:
-                    tree.extend(generate_tree_structure(full_path, prefix + "│   "))
+                tree.extend(render_tree(children, child_prefix, max_depth, max_entries, depth + 1))
+    if hidden:
+        tree.append(f"{prefix}└── … {hidden} weitere Einträge")
     return tree
 
-def use_shortcut(name, output_file, include_tree=False):
-    """Verwendet einen Shortcut, um Dateien zu kombinieren."""
+def generate_tree_structure(path, prefix="", max_depth=None, max_entries=None, filter_options=None):
+    """Generiert die Verzeichnisstruktur im 'tree'-Format und ignoriert bestimmte Verzeichnisse."""
+    if not os.path.isdir(path):
+        return []
+    entries = scan_directory(path, make_path_filter(path, filter_options))
+    return render_tree(entries, prefix, max_depth, max_entries)
+
+def scan_git_directory(path, filter_options=None, list_directory=None):
+    """Liest ein Verzeichnis in einem Git-Arbeitsverzeichnis aus dem Git-Index ein
+    (siehe sources.list_git_files) und gibt es wie scan_directory zurück.
+
+    Das ist bei großen Repositorys deutlich schneller als os.walk, da
+    ignorierte Verzeichnisse gar nicht erst betreten werden. Mit since in
+    filter_options enthält es nur die seit dieser Revision geänderten Dateien.
+    .gitignore wertet git selbst aus (versionierte Dateien bleiben immer
+    enthalten), IGNORED_DIRS und include-/exclude-Muster gelten wie beim
+    Durchlaufen. Liegt path nicht in einem Git-Repository, wird es mit einer
+    Warnung wie gewohnt mit scan_directory eingelesen; mit since (z. B. bei
+    einer unbekannten Revision) wird es mit einer Warnung ausgelassen."""
+    since = filter_options.get("since")
+    try:
+        names = sources.list_git_files(path, since)
+    except ValueError as e:
+        print(f"Warnung: {e}")
+        if since:
+            print(f"Warnung: {path} wird ausgelassen, da die Änderungen seit {since} nicht bestimmt werden können.")
+            return []
+        print(f"Warnung: {path} wird ohne Git-Index durchlaufen.")
+        return scan_directory(path, make_path_filter(path, filter_options), list_directory)
+
+    tree = {}
+    for name in names:
+        parts = name.split("/")
+        node = tree
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = None
+    path_filter = make_path_filter(path, dict(filter_options, gitignore=False))
+
+    def build(dirpath, node):
+        path_filter.enter_directory(dirpath, ())
+        entries = []
+        for name, children in node.items():
+            full_path = os.path.join(dirpath, name)
+            if children is None:
+                if not path_filter.is_excluded(full_path, False):
+                    entries.append((name, full_path, None))
+            elif name not in IGNORED_DIRS and not path_filter.is_excluded(full_path, True):
+                entries.append((name, full_path, build(full_path, children)))
+        return entries
+    return build(os.path.normpath(path), tree)
+
+def iter_scanned_files(entries, start):
+    """Liefert Tupel (relativer Pfad, vollständiger Pfad) aus einem eingelesenen Verzeichnis.
+
+    Die Reihenfolge entspricht os.walk: zuerst die Dateien eines Verzeichnisses,
+    danach die Unterverzeichnisse. Versteckte Dateien werden übersprungen."""
+    subdirectories = []
+    for name, full_path, children in entries:
+        if children is None:
+            if not name.startswith('.'):
+                yield os.path.relpath(full_path, start=start), full_path
+        else:
+            subdirectories.append(children)
+    for children in subdirectories:
+        yield from iter_scanned_files(children, start)
+
+class SharedCache:
+    """Gemeinsamer Zwischenspeicher für den Batch-Build mehrerer Shortcuts (siehe write_bundles).
+
+    Jedes Verzeichnis wird nur einmal eingelesen (list_directory, walk) und
+    jede Datei nur einmal gelesen (load), auch wenn mehrere Ausgaben sie
+    enthalten und gleichzeitig in verschiedenen Threads erzeugt werden.
+    Gelesene Inhalte werden freigegeben, sobald alle eingeplanten Ausgaben
+    (plan) sie abgeholt oder mit release darauf verzichtet haben."""
+
+    def __init__(self):
+        self._listings = {}
+        self._contents = {}
+        self._uses = Counter()
+        self._lock = threading.Lock()
+
+    def list_directory(self, path):
+        """Wie read_directory, liest jedes Verzeichnis aber nur einmal."""
+        try:
+            return self._listings[path]
+        except KeyError:
+            listing = self._listings[path] = default_list_directory()(path)
+            return listing
+
+    def walk(self, top):
+        """Durchläuft ein Verzeichnis wie os.walk (von oben nach unten, dirnames änderbar)."""
+        return walk_listings(self.list_directory, top)
+
+    def plan(self, full_paths):
+        """Merkt vor, dass eine Ausgabe die angegebenen Dateien lesen wird."""
+        with self._lock:
+            self._uses.update(os.path.abspath(path) for path in full_paths)
+
+    def load(self, key, load_file, *args):
+        """Gibt das Ergebnis von load_file(*args) für key zurück; gelesen wird nur beim ersten Aufruf."""
+        with self._lock:
+            future = self._contents.get(key)
+            owner = future is None
+            if owner:
+                future = self._contents[key] = Future()
+        if owner:
+            try:
+                future.set_result(load_file(*args))
+            except Exception as e:
+                future.set_exception(e)
+        try:
+            return future.result()
+        finally:
+            self.release(key)
+
+    def release(self, key):
+        """Meldet, dass eine eingeplante Ausgabe die Datei key abgeholt hat oder nicht liest
+        (z. B. unverändert übernommen oder wegen des Token-Budgets ausgelassen)."""
+        with self._lock:
+            self._uses[key] -= 1
+            if self._uses[key] <= 0:
+                self._contents.pop(key, None)
+                del self._uses[key]
+
+def manifest_path_for(output_file):
+    """Gibt den Pfad des Manifests zu einer Ausgabedatei zurück."""
+    return output_file + MANIFEST_SUFFIX
+
+# Zwischenspeicher für gelesene Manifeste: Pfad -> (Dateikennung, Manifest).
+# Lohnt sich in langlebigen Prozessen (Watch-Modus, Web-Backend, Daemon).
+_manifest_cache = {}
+
+def load_manifest(output_file, options=None):
+    """Lädt das Manifest eines früheren Builds.
+
+    Das Manifest wird nur verwendet, wenn die Ausgabedatei seit dem Build
+    nicht verändert wurde, da unveränderte Abschnitte aus ihr übernommen werden,
+    und wenn der Build mit denselben Optionen (options) erstellt wurde."""
+    path = os.path.abspath(manifest_path_for(output_file))
+    try:
+        manifest_stat = os.stat(path)
+        signature = (manifest_stat.st_mtime_ns, manifest_stat.st_size, manifest_stat.st_ino)
+        cached = _manifest_cache.get(path)
+        if cached is not None and cached[0] == signature:
+            manifest = cached[1]
+        else:
+            with open(path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+            _manifest_cache[path] = (signature, manifest)
+        output_stat = os.stat(output_file)
+    except (OSError, ValueError):
+        return None
+    if (manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("output_size") != output_stat.st_size
+            or manifest.get("output_mtime_ns") != output_stat.st_mtime_ns
+            or manifest.get("options") != (options or {})):
+        return None
+    return manifest
+
+def save_manifest(output_file, files, started_ns, options=None):
+    """Speichert das Manifest eines Builds neben der Ausgabedatei."""
+    output_stat = os.stat(output_file)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "options": options or {},
+        "started_ns": started_ns,
+        "output_size": output_stat.st_size,
+        "output_mtime_ns": output_stat.st_mtime_ns,
+        "files": files,
+    }
+    path = os.path.abspath(manifest_path_for(output_file))
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file)
+    manifest_stat = os.stat(path)
+    _manifest_cache[path] = ((manifest_stat.st_mtime_ns, manifest_stat.st_size, manifest_stat.st_ino),
+                             manifest)
+
+def is_unchanged(entry, stat, started_ns):
+    """Prüft, ob eine Datei laut Manifest-Eintrag seit dem letzten Build unverändert ist.
+
+    Dateien, die während des letzten Builds geändert wurden (mtime nicht vor
+    dem Start des Builds), gelten als geändert, da die Zeitauflösung des
+    Dateisystems eine Änderung sonst verdecken könnte."""
+    return (entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["inode"] == stat.st_ino
+            and stat.st_mtime_ns < started_ns)
+
+def classify_file(file_path, size=None, max_file_size=None, head=None):
+    """Prüft vor dem Lesen, ob eine Datei übersprungen werden soll.
+
+    Gibt den Grund (SKIP_BINARY, SKIP_TOO_LARGE, SKIP_LOCK_FILE) oder None
+    zurück. Es werden höchstens SNIFF_SIZE Bytes vom Anfang der Datei gelesen;
+    ist head angegeben (der bereits gelesene Anfang), wird nichts gelesen."""
+    name = os.path.basename(file_path)
+    if name in LOCK_FILES:
+        return SKIP_LOCK_FILE
+    if os.path.splitext(name)[1].lower() in BINARY_EXTENSIONS:
+        return SKIP_BINARY
+    if max_file_size is not None and size is not None and size > max_file_size:
+        return SKIP_TOO_LARGE
+    if head is None:
+        try:
+            with open(file_path, 'rb') as file:
+                head = file.read(SNIFF_SIZE)
+        except OSError:
+            # Lesefehler werden von read_file_content gemeldet
+            return None
+    head = head[:SNIFF_SIZE]
+    if b"\x00" in head or head.startswith(BINARY_SIGNATURES):
+        return SKIP_BINARY
+    return None
+
+def stat_file(file_path):
+    """Wie os.stat, auch für Einträge von Archiven und Git-Revisionen (siehe sources)."""
+    source = sources.source_for(file_path)
+    return source.stat(file_path) if source is not None else os.stat(file_path)
+
+def load_source_file(source, file_path, size=None, max_file_size=None, report=None):
+    """Liest einen Eintrag eines Archivs oder einer Git-Revision (siehe sources).
+
+    Es gelten dieselben Regeln wie für Dateien (classify_file); der Anfang
+    wird jedoch erst nach dem vollständigen Lesen geprüft, da jeder Eintrag
+    nur einmal gelesen werden soll. Gibt (Inhalt als Bytes, Grund) zurück."""
+    reason = classify_file(file_path, size, max_file_size, head=b"")
+    if reason is None:
+        try:
+            data = source.read(file_path)
+        except OSError as e:
+            add_stats(report, read_errors=1)
+            return f"Fehler beim Lesen der Datei {file_path}: {str(e)}".encode('utf-8'), None
+        reason = classify_file(file_path, head=data)
+    if reason is not None:
+        return skip_placeholder(reason, size).encode('utf-8'), reason
+    add_stats(report, files_read=1, bytes_read=len(data))
+    return decode_file_bytes(file_path, data, report), None
+
+def skip_placeholder(reason, size):
+    """Gibt den einzeiligen Platzhalter für eine übersprungene Datei zurück."""
+    size_text = f", {size} Bytes" if size is not None else ""
+    return f"[Datei übersprungen: {reason}{size_text}]"
+
+def make_section_reader(previous_files, started_ns, max_file_size=None, changed_files=None,
+                        zero_copy_min_size=None, with_hash=True, shared=None, report=None):
+    """Erstellt eine Lesefunktion für iter_file_contents, die unveränderte Dateien nicht liest.
+
+    Die Lesefunktion liefert ein Tupel (Manifest-Schlüssel, stat, Inhalt als Bytes, Grund).
+    Ist der Inhalt None, kann der Abschnitt aus der vorherigen Ausgabedatei übernommen werden.
+    Ist ein Grund gesetzt, wurde die Datei nicht gelesen und der Inhalt ist ein Platzhalter.
+
+    Ist changed_files angegeben (z. B. vom Watch-Modus), gelten alle anderen
+    Dateien aus dem Manifest ohne stat-Aufruf als unverändert; stat ist dann None.
+
+    Mit zero_copy_min_size wird für Dateien ab dieser Größe statt der Bytes
+    eine FileSection geliefert, sofern sie unverändert übernommen werden können
+    (mit SHA-256 nur bei with_hash, der Hash wird nur für das Manifest benötigt).
+
+    Mit shared (SharedCache) wird jede Datei nur einmal für alle Ausgaben gelesen.
+
+    Gelesene Dateien und Bytes sowie die Dauer des Lesens (summiert über alle
+    Threads) werden in report (siehe new_report) gezählt."""
+    def load_file(full_path, stat, source=None):
+        size = stat.st_size if stat is not None else None
+        if source is not None:
+            return load_source_file(source, full_path, size, max_file_size, report)
+        if stat is None:
+            # Die Datei ist nicht lesbar, read_file_bytes meldet den Fehler
+            data = read_file_bytes(full_path, report)
+            add_stats(report, files_read=1, bytes_read=len(data))
+            return data, None
+        reason = classify_file(full_path, size, max_file_size, head=b"")
+        if reason is not None:
+            return skip_placeholder(reason, size).encode('utf-8'), reason
+        try:
+            file = open(full_path, 'rb')
+        except OSError:
+            data = read_file_bytes(full_path, report)
+            add_stats(report, files_read=1, bytes_read=len(data))
+            return data, None
+        # Anfang prüfen und Inhalt lesen über denselben Dateizugriff
+        with file:
+            try:
+                head = file.read(SNIFF_SIZE)
+            except OSError:
+                head = b""
+            reason = classify_file(full_path, head=head)
+            if reason is not None:
+                return skip_placeholder(reason, size).encode('utf-8'), reason
+            data = None
+            if zero_copy_min_size is not None and size >= zero_copy_min_size:
+                data = scan_file_section(full_path, with_hash, file)
+            if data is None:
+                try:
+                    file.seek(len(head))
+                    rest = file.read()
+                    data = decode_file_bytes(full_path, head + rest if rest else head, report)
+                except OSError:
+                    data = read_file_bytes(full_path, report)
+        add_stats(report, files_read=1, bytes_read=len(data))
+        return data, None
+
+    def read_section(full_path):
+        start = time.perf_counter()
+        try:
+            return read_file_section(full_path)
+        finally:
+            add_timing(report, "read", time.perf_counter() - start)
+
+    def read_file_section(full_path):
+        key = os.path.abspath(full_path)
+        entry = previous_files.get(key)
+        source = sources.source_for(full_path)
+        # Einträge von Archiven werden immer geprüft: Änderungen melden nur das Archiv selbst
+        if (changed_files is not None and entry is not None and key not in changed_files
+                and source is None):
+            if shared is not None:
+                shared.release(key)
+            return key, None, None, entry.get("skipped")
+        try:
+            stat = source.stat(full_path) if source is not None else os.stat(full_path)
+        except OSError:
+            stat = None
+        if stat is not None and entry is not None and is_unchanged(entry, stat, started_ns):
+            if shared is not None:
+                shared.release(key)
+            return key, stat, None, entry.get("skipped")
+        if shared is not None:
+            data, reason = shared.load(key, load_file, full_path, stat, source)
+        else:
+            data, reason = load_file(full_path, stat, source)
+        return key, stat, data, reason
+    return read_section
+
+def estimate_tokens(size):
+    """Schätzt die Anzahl der Tokens anhand der Größe in Bytes."""
+    return (size + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+def load_tokenizer():
+    """Lädt einen exakten Tokenizer (tiktoken), falls installiert.
+
+    Gibt eine Funktion zurück, die die Tokens eines Textes zählt, oder None."""
+    try:
+        import tiktoken
+    except ImportError:
+        print("Warnung: tiktoken ist nicht installiert, Tokens werden anhand der Dateigröße geschätzt.")
+        return None
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+def select_files_for_budget(file_paths, explicit_files, token_budget):
+    """Wählt Dateien aus, deren geschätzte Tokens zusammen in das Budget passen.
+
+    Explizit angegebene Dateien haben Vorrang, danach kleinere und zuletzt
+    geänderte Dateien. Gibt die ausgewählten Dateien in der ursprünglichen
+    Reihenfolge und die ausgelassenen Dateien als Tupel
+    (relativer Pfad, geschätzte Tokens) zurück. Es wird keine Datei gelesen."""
+    candidates = []
+    for index, (relative_path, full_path) in enumerate(file_paths):
+        try:
+            stat = stat_file(full_path)
+            size, mtime = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size, mtime = 0, 0
+        tokens = estimate_tokens(size) + estimate_tokens(len(f"=== Datei: {relative_path} ===\n\n\n"))
+        explicit = os.path.abspath(full_path) in explicit_files
+        candidates.append((not explicit, size, -mtime, index, relative_path, full_path, tokens))
+
+    selected, dropped = [], []
+    used = 0
+    for _, _, _, index, relative_path, full_path, tokens in sorted(candidates):
+        if used + tokens <= token_budget:
+            used += tokens
+            selected.append((index, relative_path, full_path))
+        else:
+            dropped.append((relative_path, tokens))
+    selected.sort()
+    return [(relative_path, full_path) for _, relative_path, full_path in selected], dropped
+
+def print_budget_summary(token_budget, used_tokens, dropped):
+    """Gibt eine Zusammenfassung der wegen des Token-Budgets ausgelassenen Dateien aus."""
+    print(f"Token-Budget: {used_tokens} von {token_budget} Tokens genutzt.")
+    if not dropped:
+        return
+    dropped_tokens = sum(tokens for _, tokens in dropped)
+    print(f"{len(dropped)} Dateien ({dropped_tokens} Tokens) passen nicht in das Budget und wurden ausgelassen:")
+    for relative_path, tokens in dropped[:MAX_DROPPED_LISTED]:
+        print(f"  - {relative_path} (~{tokens} Tokens)")
+    if len(dropped) > MAX_DROPPED_LISTED:
+        print(f"  … und {len(dropped) - MAX_DROPPED_LISTED} weitere")
+
+def render_tree_section(paths, scanned, tree_depth=None, tree_max_entries=None):
+    """Erzeugt den Abschnitt '=== Verzeichnisstruktur ===' aus den eingelesenen Verzeichnissen."""
+    tree_text = "=== Verzeichnisstruktur ===\n"
+    for path in paths:
+        if path in scanned:
+            tree_structure = render_tree(scanned[path], max_depth=tree_depth,
+                                         max_entries=tree_max_entries)
+            tree_text += "\n".join(tree_structure) + "\n"
+        else:
+            tree_text += f"└── {os.path.basename(path)}\n"
+    return tree_text + "\n\n"
+
+def count_found_files(file_paths, report):
+    """Zählt die gefundenen Dateien und die Dauer des Durchlaufs im Protokoll mit,
+    während sie durchlaufen werden."""
+    file_paths = iter(file_paths)
+    while True:
+        start = time.perf_counter()
+        item = next(file_paths, None)
+        add_timing(report, "walk", time.perf_counter() - start)
+        if item is None:
+            break
+        report["files_found"] += 1
+        yield item
+    report["walk_complete"] = True
+
+def new_report():
+    """Erstellt ein leeres Protokoll für einen Build (siehe iter_bundle)."""
+    return {
+        "file_count": 0,
+        "files_found": 0,
+        "walk_complete": False,
+        "bytes_written": 0,
+        "reused_count": 0,
+        "skipped_counts": Counter(),
+        "token_budget": None,
+        "used_tokens": 0,
+        "dropped": [],
+        "compression": None,
+        "output_size": 0,
+        "duplicate_count": 0,
+        "duplicate_bytes_saved": 0,
+        "files_read": 0,
+        "bytes_read": 0,
+        "read_errors": 0,
+        "decode_fallbacks": 0,
+        "timings": Counter(),
+        "shards": [],
+        "reduced_bytes": Counter(),
+    }
+
+def add_stats(report, **amounts):
+    """Erhöht Zähler im Protokoll; threadsicher, da Dateien parallel gelesen werden."""
+    if report is None:
+        return
+    with _stats_lock:
+        for name, amount in amounts.items():
+            report[name] += amount
+
+def add_timing(report, phase, seconds):
+    """Addiert die Dauer einer Phase (siehe STATS_PHASES) im Protokoll."""
+    if report is None:
+        return
+    with _stats_lock:
+        report["timings"][phase] += seconds
+
+@sources.keeps_sources_open
+def iter_bundle(paths, filter_options=None, include_tree=False, jobs=1,
+                tree_depth=None, tree_max_entries=None, max_file_size=None, skip_binary=False,
+                token_budget=None, exact_tokens=False, exclude_files=None,
+                previous=None, previous_output=None, manifest_files=None, report=None,
+                changed_files=None, zero_copy=False, dedupe=False, shared=None, sections=False,
+                reduce=None, reduce_jobs=None, since=None, layout=None):
+    """Erzeugt die kombinierte Ausgabe für eine Liste von Pfaden als Folge von Byte-Blöcken.
+
+    Die Dateien werden einzeln gelesen und sofort ausgegeben, sodass der
+    Speicherbedarf unabhängig von der Größe der Verzeichnisse bleibt. Mit
+    jobs > 1 werden die Dateien parallel gelesen; die Reihenfolge der
+    Abschnitte bleibt dabei unverändert.
+
+    Mit include_tree=True wird jedes Verzeichnis nur einmal eingelesen; derselbe
+    Durchlauf liefert die Verzeichnisstruktur und die Liste der Dateien.
+    tree_depth und tree_max_entries begrenzen die dargestellte Struktur.
+
+    Binärdateien, Lockdateien und Dateien über max_file_size Bytes werden nicht
+    gelesen, sondern durch einen einzeiligen Platzhalter ersetzt, mit
+    skip_binary=True werden sie ganz ausgelassen.
+
+    Mit token_budget werden nur so viele Dateien gelesen, wie in das Budget
+    passen (siehe select_files_for_budget). Mit exact_tokens=True werden die
+    Tokens der gelesenen Dateien zusätzlich mit tiktoken gezählt.
+
+    Für inkrementelle Builds enthält previous das Manifest des letzten Builds
+    und previous_output die geöffnete vorherige Ausgabedatei; die Einträge des
+    neuen Manifests werden in manifest_files gesammelt. changed_files enthält
+    optional die seit dem letzten Build geänderten Pfade (siehe make_section_reader).
+    Zähler und ausgelassene Dateien werden in report (siehe new_report) festgehalten.
+
+    Mit zero_copy=True werden große Dateien und große übernommene Abschnitte
+    als FileSection statt als Bytes geliefert (nur für write_bundle mit
+    unkomprimierter Ausgabe).
+
+    Mit dedupe=True wird jeder Inhalt nur einmal ausgegeben; weitere Dateien
+    mit demselben SHA-256 erhalten einen kurzen Verweis auf die erste Datei.
+
+    shared (SharedCache) teilt Verzeichnisinhalte und gelesene Dateien mit
+    anderen Ausgaben desselben Batch-Builds (siehe write_bundles).
+
+    Mit sections=True wird statt einzelner Blöcke pro Abschnitt ein Tupel
+    (relativer Pfad, Liste der Blöcke) geliefert, für die Verzeichnisstruktur
+    mit dem Pfad None (siehe write_shards).
+
+    reduce ist eine Liste von Reduzierern aus reducers.py (z. B. comments,
+    whitespace), die gelesene Inhalte vor der Ausgabe verkleinern; sie laufen
+    in reduce_jobs Prozessen (siehe iter_reduced).
+
+    Mit since (Git-Revision) werden aus Verzeichnissen nur die seitdem
+    geänderten Dateien ausgegeben (siehe scan_git_directory); einzeln
+    angegebene Dateien bleiben immer enthalten.
+
+    layout (dict) hält die Liste der Dateien (Schlüssel "files", Tupel aus
+    relativem und absolutem Pfad) und die Verzeichnisstruktur ("tree") über
+    mehrere Builds fest: Ist es leer, werden beide nach dem Durchlauf darin
+    gespeichert, sonst werden sie übernommen, ohne die Pfade erneut zu
+    durchlaufen (siehe watch_paths)."""
+    report = report if report is not None else new_report()
+    filter_options = with_since(filter_options, since)
+    previous_files = previous["files"] if previous else {}
+    count_tokens = load_tokenizer() if token_budget is not None and exact_tokens else None
+    # Für die exakte Token-Zählung wird der Inhalt benötigt
+    zero_copy = zero_copy and count_tokens is None and not reduce
+    # Der Inhalts-Hash wird für das Manifest und die Deduplizierung benötigt;
+    # geteilte Inhalte enthalten ihn immer, da eine andere Ausgabe ihn braucht
+    with_hash = manifest_files is not None or dedupe or shared is not None
+    seen_contents = {}
+    read_section = make_section_reader(previous_files, previous["started_ns"] if previous else 0,
+                                       max_file_size, changed_files,
+                                       ZERO_COPY_MIN_SIZE if zero_copy else None,
+                                       with_hash=with_hash, shared=shared, report=report)
+    walk = shared.walk if shared is not None else default_walk()
+    list_directory = shared.list_directory if shared is not None else None
+    start = time.perf_counter()
+    scanned = {}
+    reuse_layout = layout is not None and "files" in layout
+    for path in paths if include_tree and not reuse_layout else ():
+        try:
+            source = sources.open_source(path)
+        except ValueError:
+            # Die Warnung gibt iter_file_paths aus
+            continue
+        if source is not None:
+            root = os.path.normpath(path)
+            scanned[path] = scan_directory(root, make_path_filter(root, filter_options, source.read_text),
+                                           source.list_directory)
+        elif os.path.isdir(path) and uses_git(filter_options):
+            scanned[path] = scan_git_directory(path, filter_options, list_directory)
+        elif os.path.isdir(path):
+            scanned[path] = scan_directory(path, make_path_filter(path, filter_options), list_directory)
+    add_timing(report, "walk", time.perf_counter() - start)
+    if reuse_layout:
+        tree_text = layout["tree"]
+    else:
+        tree_text = render_tree_section(paths, scanned, tree_depth, tree_max_entries) if include_tree else ""
+
+    all_file_paths = None
+    if reuse_layout:
+        all_file_paths = layout["files"]
+    elif layout is not None or token_budget is not None:
+        start = time.perf_counter()
+        all_file_paths = list(iter_file_paths(paths, exclude_files=exclude_files, scanned=scanned,
+                                              filter_options=filter_options, walk=walk))
+        add_timing(report, "walk", time.perf_counter() - start)
+        if layout is not None:
+            layout.update(files=all_file_paths, tree=tree_text)
+
+    # Mit Token-Budget werden die Dateien vor dem Lesen ausgewählt
+    file_paths = None
+    if token_budget is not None:
+        report["token_budget"] = token_budget
+        report["used_tokens"] = (count_tokens(tree_text) if count_tokens
+                                 else estimate_tokens(len(tree_text.encode('utf-8'))))
+        explicit_files = {os.path.abspath(path) for path in paths if os.path.isfile(path)}
+        start = time.perf_counter()
+        file_paths, report["dropped"] = select_files_for_budget(
+            all_file_paths, explicit_files, max(token_budget - report["used_tokens"], 0))
+        if shared is not None:
+            # Ausgelassene Dateien werden von dieser Ausgabe nicht gelesen
+            selected = {full_path for _, full_path in file_paths}
+            for _, full_path in all_file_paths:
+                if full_path not in selected:
+                    shared.release(os.path.abspath(full_path))
+        add_timing(report, "walk", time.perf_counter() - start)
+
+    if file_paths is None:
+        file_paths = all_file_paths if all_file_paths is not None else iter_file_paths(
+            paths, exclude_files=exclude_files, scanned=scanned, filter_options=filter_options, walk=walk)
+    file_paths = count_found_files(file_paths, report)
+
+    # Füge die Verzeichnisstruktur hinzu
+    offset = 0
+    if tree_text:
+        data = tree_text.encode('utf-8')
+        offset += len(data)
+        yield (None, [data]) if sections else data
+
+    # Füge den Inhalt der Dateien hinzu, sobald sie gelesen wurden
+    contents = iter_file_contents(paths, jobs=jobs, exclude_files=exclude_files,
+                                  read_file=read_section, scanned=scanned,
+                                  filter_options=filter_options, file_paths=file_paths)
+    if reduce:
+        contents = iter_reduced(contents, reduce, reduce_jobs, report)
+    for path, (key, stat, data, skip_reason) in contents:
+        if skip_reason is not None:
+            report["skipped_counts"][skip_reason] += 1
+            if skip_binary:
+                continue
+        header = f"=== Datei: {path} ===\n"
+        reused = data is None
+        entry = previous_files[key] if reused else None
+        if reused:
+            content_hash = entry["sha256"]
+            content_length = entry.get("content_length", entry["length"])
+        else:
+            content_hash = None
+            if with_hash:
+                content_hash = (data.sha256 if isinstance(data, FileSection)
+                                else hashlib.sha256(data).hexdigest())
+            content_length = len(data)
+
+        # Doppelte Inhalte nur einmal ausgeben, danach als Verweis
+        duplicate_of = None
+        if dedupe and skip_reason is None:
+            first_path = seen_contents.setdefault(content_hash, path)
+            reference = duplicate_reference(first_path)
+            if first_path != path and len(reference) < content_length:
+                data, duplicate_of = reference, first_path
+                report["duplicate_count"] += 1
+                report["duplicate_bytes_saved"] += content_length - len(reference)
+            elif reused and entry.get("duplicate_of"):
+                # Im letzten Build war der Abschnitt ein Verweis, der Inhalt fehlt dort
+                data = read_file_bytes(key, report)
+                add_stats(report, files_read=1, bytes_read=len(data))
+                if reduce:
+                    data = record_reduction(report, *reducers.apply_reducers(key, data, reduce))
+                reused = False
+
+        if data is None:
+            # Unveränderter Abschnitt aus der vorherigen Ausgabedatei
+            if zero_copy and entry["length"] >= ZERO_COPY_MIN_SIZE and hasattr(previous_output, 'name'):
+                data = FileSection(previous_output.name, entry["offset"], entry["length"], entry["sha256"])
+            else:
+                previous_output.seek(entry["offset"])
+                data = previous_output.read(entry["length"])
+
+        if token_budget is not None:
+            if count_tokens is not None:
+                tokens = count_tokens(header) + count_tokens(data.decode('utf-8', errors='replace')) + 1
+            else:
+                tokens = estimate_tokens(len(header.encode('utf-8')) + len(data) + 2)
+            if report["used_tokens"] + tokens > token_budget:
+                # Die exakte Zählung übersteigt die Schätzung
+                report["dropped"].append((path, tokens))
+                continue
+            report["used_tokens"] += tokens
+
+        header = header.encode('utf-8')
+        if sections:
+            yield path, [header, data, b"\n\n"]
+        else:
+            yield header
+            yield data
+            yield b"\n\n"
+        report["file_count"] += 1
+        report["reused_count"] += reused
+
+        if manifest_files is not None and (stat is not None or entry is not None):
+            if stat is not None:
+                file_info = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+            else:
+                # Ungeprüft übernommener Abschnitt (Watch-Modus): Metadaten aus dem Manifest
+                file_info = {name: entry[name] for name in ("size", "mtime_ns", "inode")}
+            manifest_files[key] = dict(
+                file_info,
+                sha256=content_hash,
+                offset=offset + len(header),
+                length=len(data),
+                content_length=content_length,
+                skipped=skip_reason,
+                duplicate_of=duplicate_of,
+            )
+        offset += len(header) + len(data) + 2
+
+def record_reduction(report, data, savings, seconds):
+    """Übernimmt das Ergebnis von reducers.apply_reducers in das Protokoll und gibt die Bytes zurück."""
+    report["reduced_bytes"].update(savings)
+    add_timing(report, "reduce", seconds)
+    return data
+
+def iter_reduced(contents, names, jobs=None, report=None):
+    """Wendet die Reduzierer names auf die Inhalte von iter_file_contents an.
+
+    Die Reduzierer sind rechenintensiv und laufen deshalb in einem
+    Prozess-Pool mit jobs Prozessen (Standard: Anzahl der CPUs, mit 1 im
+    aktuellen Prozess). Wie beim Lesen werden höchstens jobs *
+    READ_AHEAD_PER_JOB Dateien im Voraus bearbeitet; die Reihenfolge bleibt
+    erhalten. Platzhalter und übernommene Abschnitte bleiben unverändert."""
+    report = report if report is not None else new_report()
+    jobs = jobs or os.cpu_count() or 1
+
+    def reducible(data, skip_reason):
+        return data is not None and skip_reason is None and not isinstance(data, FileSection)
+
+    if jobs <= 1:
+        for path, (key, stat, data, skip_reason) in contents:
+            if reducible(data, skip_reason):
+                data = record_reduction(report, *reducers.apply_reducers(key, data, names))
+            yield path, (key, stat, data, skip_reason)
+        return
+
+    def finish(path, section, future):
+        key, stat, data, skip_reason = section
+        if future is not None:
+            data = record_reduction(report, *future.result())
+        return path, (key, stat, data, skip_reason)
+
+    max_pending = jobs * READ_AHEAD_PER_JOB
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for path, section in contents:
+            key, _, data, skip_reason = section
+            future = (executor.submit(reducers.apply_reducers, key, data, names)
+                      if reducible(data, skip_reason) else None)
+            pending.append((path, section, future))
+            if len(pending) >= max_pending:
+                yield finish(*pending.popleft())
+        while pending:
+            yield finish(*pending.popleft())
+
+def duplicate_reference(first_path):
+    """Erzeugt den Verweis, der statt eines doppelten Inhalts ausgegeben wird."""
+    return f"[Identisch mit {first_path}]".encode('utf-8')
+
+def print_report(report, output_file, incremental=False, skip_binary=False):
+    """Gibt die Zusammenfassung eines Builds aus."""
+    file_count = report["file_count"]
+    if report["shards"]:
+        print(f"Der Inhalt von {file_count} Dateien wurde in {len(report['shards'])} Teildateien "
+              f"gespeichert (Übersicht: {shard_index_path_for(output_file)}).")
+    else:
+        print(f"Der Inhalt von {file_count} Dateien wurde in {output_file} gespeichert.")
+    if report["compression"]:
+        ratio = report["bytes_written"] / report["output_size"] if report["output_size"] else 0
+        print(f"Komprimiert mit {report['compression']}: {report['output_size']} Bytes statt "
+              f"{report['bytes_written']} Bytes (Faktor {ratio:.1f}).")
+    if incremental:
+        print(f"Inkrementeller Build: {report['reused_count']} Dateien wiederverwendet, "
+              f"{file_count - report['reused_count']} Dateien neu gelesen.")
+    if report["duplicate_count"]:
+        print(f"Duplikate: {report['duplicate_count']} Dateien als Verweis ausgegeben, "
+              f"{report['duplicate_bytes_saved']} Bytes eingespart.")
+    if report["reduced_bytes"]:
+        details = ", ".join(f"{name} {saved} Bytes" for name, saved in report["reduced_bytes"].items())
+        print(f"Reduziert: {sum(report['reduced_bytes'].values())} Bytes eingespart ({details}).")
+    if report["skipped_counts"]:
+        details = ", ".join(f"{count} × {reason}"
+                            for reason, count in sorted(report["skipped_counts"].items()))
+        action = "ausgelassen" if skip_binary else "durch Platzhalter ersetzt"
+        print(f"Nicht gelesene Dateien ({action}): {details}.")
+    if report["token_budget"] is not None:
+        print_budget_summary(report["token_budget"], report["used_tokens"], report["dropped"])
+
+def print_stats(report):
+    """Gibt die Dauer der Phasen und die Zähler eines Builds aus (--stats).
+
+    Die Dauer des Lesens ist über alle Threads summiert und kann bei --jobs
+    größer als die Gesamtdauer sein."""
+    timings = report["timings"]
+    print("Statistik:")
+    print("  Phasen: " + ", ".join(f"{label} {timings[phase]:.3f} s"
+                                   for phase, label in STATS_PHASES.items()))
+    print(f"  Dateien: {report['files_found']} gefunden, {report['files_read']} gelesen, "
+          f"{report['reused_count']} wiederverwendet, "
+          f"{sum(report['skipped_counts'].values())} nicht gelesen, {report['file_count']} ausgegeben")
+    print(f"  Bytes: {report['bytes_read']} gelesen, {report['bytes_written']} ausgegeben, "
+          f"{report['output_size']} in der Ausgabedatei")
+    print(f"  Fehler: {report['read_errors']} Lesefehler, "
+          f"{report['decode_fallbacks']} Dateien über den Textmodus dekodiert")
+
+def get_shortcut(name):
+    """Gibt die Pfade und Filteroptionen eines Shortcuts zurück oder beendet das Programm."""
     shortcuts = load_shortcuts()
     if name not in shortcuts:
         print(f"Fehler: Shortcut '{name}' existiert nicht.")
         sys.exit(1)
+    return shortcut_paths(shortcuts[name]), shortcut_filter_options(shortcuts[name])
+
+def compression_for(output_file, compression=None):
+    """Bestimmt das Kompressionsverfahren (gzip, xz oder None) aus der Option oder der Dateiendung."""
+    if compression:
+        if compression not in COMPRESSION_METHODS:
+            raise ValueError(f"Unbekanntes Kompressionsverfahren: {compression}")
+        return compression
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(output_file)[1].lower())
+
+def open_compressed(file, mode, compression):
+    """Umhüllt eine geöffnete Binärdatei mit einem (De-)Kompressor.
+
+    Ohne Kompression wird die Datei selbst zurückgegeben; ansonsten wird sie
+    beim Schließen des Kompressors nicht mitgeschlossen. gzip schreibt keinen Dateinamen und keine Zeit in den Kopf, damit
+    gleiche Eingaben byte-gleiche Ausgaben ergeben."""
+    if compression == "gzip":
+        return gzip.GzipFile(filename="", mode=mode, fileobj=file, compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == "xz":
+        return lzma.LZMAFile(file, mode, preset=XZ_PRESET if "w" in mode else None)
+    return file
+
+def write_bundle(paths, output_file, filter_options=None, incremental=False,
+                 report=None, cancel_event=None, compression=None, exclude_files=None,
+                 output_format="text", **options):
+    """Schreibt die mit iter_bundle erzeugte Ausgabe über eine temporäre Datei nach output_file.
+
+    Mit incremental=True wird neben der Ausgabedatei ein Manifest gespeichert.
+    Bei erneuten Builds werden nur geänderte Dateien gelesen, die Abschnitte
+    unveränderter Dateien werden aus der vorherigen Ausgabedatei übernommen.
+
+    Endet output_file auf .gz oder .xz (oder ist compression gesetzt), wird
+    die Ausgabe beim Schreiben komprimiert. Die Offsets im Manifest beziehen
+    sich auf den unkomprimierten Inhalt.
+
+    Wird cancel_event (threading.Event) gesetzt, bricht der Build ab, die
+    temporäre Datei wird entfernt und False zurückgegeben.
+
+    exclude_files enthält weitere absolute Pfade, die nicht aufgenommen werden
+    (die eigene Ausgabedatei, ihre temporäre Datei und das Manifest immer).
+
+    Mit output_format="pack" wird stattdessen eine Pack-Datei geschrieben
+    (siehe write_pack)."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unbekanntes Ausgabeformat: {output_format}")
+    if output_format == "pack":
+        if incremental or compression_for(output_file, compression):
+            raise ValueError("Das Pack-Format kann weder inkrementell noch komprimiert erstellt werden.")
+        return write_pack(paths, output_file, filter_options, report=report, cancel_event=cancel_event,
+                          exclude_files=exclude_files, **options)
+    report = report if report is not None else new_report()
+    started_ns = time.time_ns()
+    start = time.perf_counter()
+    temp_file = output_file + ".tmp"
+    exclude_files = set(exclude_files or ()) | output_files_for(output_file)
+
+    compression = compression_for(output_file, compression)
+    report["compression"] = compression
+
+    # Optionen, die den Inhalt der Abschnitte oder das Format der Ausgabe beeinflussen
+    manifest_options = {"max_file_size": options.get("max_file_size"), "compression": compression,
+                        "dedupe": options.get("dedupe", False), "reduce": sorted(options.get("reduce") or []) or None}
+    manifest_start = time.perf_counter()
+    previous = load_manifest(output_file, manifest_options) if incremental else None
+    add_timing(report, "manifest", time.perf_counter() - manifest_start)
+    manifest_files = {} if incremental else None
+
+    previous_raw = open(output_file, 'rb') if previous else None
+    previous_output = open_compressed(previous_raw, 'rb', compression) if previous else None
+    try:
+        with open(temp_file, 'wb', buffering=WRITE_BUFFER_SIZE) as raw, \
+                open_compressed(raw, 'wb', compression) as file:
+            # Große Dateien werden ohne Umweg über Python kopiert, sofern
+            # die Ausgabe nicht komprimiert wird
+            chunks = iter_bundle(paths, filter_options, exclude_files=exclude_files,
+                                 previous=previous, previous_output=previous_output,
+                                 manifest_files=manifest_files, report=report,
+                                 zero_copy=compression is None, **options)
+            for chunk in chunks:
+                if cancel_event is not None and cancel_event.is_set():
+                    chunks.close()
+                    break
+                write_start = time.perf_counter()
+                if isinstance(chunk, FileSection):
+                    copy_file_section(chunk, file)
+                else:
+                    file.write(chunk)
+                add_timing(report, "write", time.perf_counter() - write_start)
+                report["bytes_written"] += len(chunk)
+    finally:
+        if previous_output is not None:
+            previous_output.close()
+            previous_raw.close()
+
+    if cancel_event is not None and cancel_event.is_set():
+        os.remove(temp_file)
+        return False
+
+    os.replace(temp_file, output_file)
+    report["output_size"] = os.path.getsize(output_file)
+    if incremental:
+        manifest_start = time.perf_counter()
+        save_manifest(output_file, manifest_files, started_ns, manifest_options)
+        add_timing(report, "manifest", time.perf_counter() - manifest_start)
+    add_timing(report, "total", time.perf_counter() - start)
+    return True
+
+def write_pack(paths, output_file, filter_options=None, report=None, cancel_event=None,
+               exclude_files=None, dedupe=False, **options):
+    """Schreibt die Inhalte von iter_bundle als Pack-Datei mit Offset-Tabelle (siehe bundle_pack).
+
+    Jede Datei wird ohne Kopfzeile gespeichert und kann mit
+    bundle_pack.PackReader einzeln gelesen werden. Identische Inhalte werden
+    immer nur einmal gespeichert, dedupe ist daher ohne Wirkung. Wie bei
+    write_bundle wird über eine temporäre Datei geschrieben; nach einem
+    Abbruch über cancel_event wird sie entfernt und False zurückgegeben."""
+    report = report if report is not None else new_report()
+    start = time.perf_counter()
+    temp_file = output_file + ".tmp"
+    exclude_files = set(exclude_files or ()) | output_files_for(output_file)
+
+    sections = iter_bundle(paths, filter_options, exclude_files=exclude_files, report=report,
+                           sections=True, **options)
+    cancelled = False
+    with open(temp_file, 'wb', buffering=WRITE_BUFFER_SIZE) as file:
+        pack = bundle_pack.PackWriter(file)
+        for path, chunks in sections:
+            if cancel_event is not None and cancel_event.is_set():
+                sections.close()
+                cancelled = True
+                break
+            write_start = time.perf_counter()
+            if path is None:
+                written = pack.add_tree(chunks[0])
+            else:
+                # Abschnitt: Kopfzeile, Inhalt, Trennzeilen
+                written = pack.add(path, chunks[1])
+                if not written and chunks[1]:
+                    report["duplicate_count"] += 1
+                    report["duplicate_bytes_saved"] += len(chunks[1])
+            add_timing(report, "write", time.perf_counter() - write_start)
+            report["bytes_written"] += written
+        if not cancelled:
+            pack.close()
 
-    paths = shortcuts[name]
-    file_contents = get_files_from_paths(paths)
-
-    with open(output_file, 'w', encoding='utf-8') as file:
-        if include_tree:
-            # Füge die Verzeichnisstruktur hinzu
-            file.write("=== Verzeichnisstruktur ===\n")
-            for path in paths:
-                if os.path.isdir(path):
-                    tree_structure = generate_tree_structure(path)
-                    file.write("\n".join(tree_structure) + "\n")
+    if cancelled:
+        os.remove(temp_file)
+        return False
+
+    os.replace(temp_file, output_file)
+    report["output_size"] = os.path.getsize(output_file)
+    add_timing(report, "total", time.perf_counter() - start)
+    return True
+
+def output_files_for(output_file):
+    """Gibt die absoluten Pfade aller Dateien zurück, die ein Build von output_file schreibt."""
+    return {os.path.abspath(f) for f in (output_file, output_file + ".tmp", manifest_path_for(output_file))}
+
+def write_bundles(builds, jobs=1, incremental=False, reports=None, cancel_event=None, **options):
+    """Schreibt mehrere Ausgaben in einem gemeinsamen Batch-Build.
+
+    builds ist eine Liste von Tupeln (Pfade, Ausgabedatei, Filteroptionen).
+    Zuerst werden alle Shortcuts gemeinsam geplant: Jedes Verzeichnis wird nur
+    einmal eingelesen und für jede Datei gezählt, wie viele Ausgaben sie
+    enthalten. Danach werden bis zu jobs Ausgaben parallel geschrieben; jede
+    Datei wird dabei nur einmal gelesen (siehe SharedCache). Die Ausgaben
+    schließen sich gegenseitig aus, falls sie in einem der Verzeichnisse liegen.
+
+    Gibt die Protokolle der Builds (siehe new_report) in der Reihenfolge von
+    builds zurück; die übrigen Optionen entsprechen write_bundle."""
+    shared = SharedCache()
+    exclude_files = set()
+    for _, output_file, _ in builds:
+        exclude_files |= output_files_for(output_file)
+    reports = reports if reports is not None else [new_report() for _ in builds]
+    # Archive und Git-Revisionen bleiben von der Planung bis zum letzten Build geöffnet
+    with sources.keep_open():
+        for paths, _, filter_options in builds:
+            shared.plan(full_path for _, full_path in iter_file_paths(
+                paths, exclude_files=exclude_files, filter_options=with_since(filter_options, options.get("since")),
+                walk=shared.walk))
+
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            futures = [executor.submit(write_bundle, paths, output_file, filter_options, incremental,
+                                       report=report, cancel_event=cancel_event,
+                                       exclude_files=exclude_files, shared=shared, **options)
+                       for (paths, output_file, filter_options), report in zip(builds, reports)]
+            for future in futures:
+                future.result()
+    return reports
+
+def shard_file_for(output_file, number):
+    """Gibt den Pfad der Teildatei number zurück (ausgabe.txt -> ausgabe.001.txt,
+    ausgabe.txt.gz -> ausgabe.001.txt.gz)."""
+    base, compression_extension = os.path.splitext(output_file)
+    if compression_extension.lower() not in COMPRESSION_EXTENSIONS:
+        base, compression_extension = output_file, ""
+    base, extension = os.path.splitext(base)
+    return f"{base}.{number:03d}{extension}{compression_extension}"
+
+def shard_index_path_for(output_file):
+    """Gibt den Pfad der Übersicht einer aufgeteilten Ausgabe zurück."""
+    return output_file + SHARD_INDEX_SUFFIX
+
+def load_shard_index(output_file):
+    """Lädt die Übersicht einer früher aufgeteilten Ausgabe oder gibt None zurück."""
+    try:
+        with open(shard_index_path_for(output_file), 'r', encoding='utf-8') as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != SHARD_INDEX_VERSION:
+        return None
+    return index
+
+def iter_shards(sections, shard_size=None, shard_tokens=None):
+    """Fasst die Abschnitte von iter_bundle (mit sections=True) zu Teilen zusammen.
+
+    Liefert Tupel (Abschnitte, Bytes, geschätzte Tokens). Ein Teil wird
+    abgeschlossen, bevor der nächste Abschnitt shard_size bzw. shard_tokens
+    überschreiten würde; ein Abschnitt wird nie geteilt."""
+    current, current_size, current_tokens = [], 0, 0
+    for path, chunks in sections:
+        size = sum(len(chunk) for chunk in chunks)
+        tokens = estimate_tokens(size)
+        if current and ((shard_size and current_size + size > shard_size)
+                        or (shard_tokens and current_tokens + tokens > shard_tokens)):
+            yield current, current_size, current_tokens
+            current, current_size, current_tokens = [], 0, 0
+        current.append((path, chunks))
+        current_size += size
+        current_tokens += tokens
+    if current:
+        yield current, current_size, current_tokens
+
+def write_shard(sections, temp_file, compression, report):
+    """Schreibt die Abschnitte eines Teils in temp_file (im Thread-Pool von write_shards)."""
+    start = time.perf_counter()
+    with open(temp_file, 'wb', buffering=WRITE_BUFFER_SIZE) as raw, \
+            open_compressed(raw, 'wb', compression) as file:
+        for _, chunks in sections:
+            for chunk in chunks:
+                if isinstance(chunk, FileSection):
+                    copy_file_section(chunk, file)
                 else:
-                    file.write(f"└── {os.path.basename(path)}\n")
-            file.write("\n\n")
+                    file.write(chunk)
+                add_stats(report, bytes_written=len(chunk))
+    add_timing(report, "write", time.perf_counter() - start)
+
+def write_shards(paths, output_file, filter_options=None, shard_size=None, shard_tokens=None,
+                 jobs=1, report=None, cancel_event=None, compression=None, exclude_files=None, **options):
+    """Schreibt die Ausgabe von iter_bundle aufgeteilt in nummerierte Teildateien.
+
+    Jede Teildatei enthält höchstens shard_size Bytes bzw. shard_tokens
+    geschätzte Tokens (unkomprimiert gezählt). Abschnitte werden nie geteilt;
+    ein einzelner größerer Abschnitt erhält eine eigene Teildatei. Fertig
+    zusammengestellte Teile werden mit jobs Threads parallel geschrieben (und
+    ggf. komprimiert), während die nächsten Dateien gelesen werden; dabei
+    liegen höchstens jobs + 1 Teile im Speicher (große Dateien nur als Verweis).
 
-        # Füge den Inhalt der Dateien hinzu
-        for path, content in file_contents:
-            file.write(f"=== Datei: {path} ===\n")
-            file.write(content)
-            file.write("\n\n")
+    Neben den Teildateien wird output_file + ".index.json" gespeichert, das für
+    jede Teildatei Größe, geschätzte Tokens und die enthaltenen Dateien
+    auflistet. Nicht mehr benötigte Teildateien eines früheren Builds werden
+    entfernt. Gibt wie write_bundle True oder nach einem Abbruch False zurück."""
+    if not shard_size and not shard_tokens:
+        raise ValueError("Für eine aufgeteilte Ausgabe ist shard_size oder shard_tokens erforderlich.")
+    report = report if report is not None else new_report()
+    start = time.perf_counter()
+    compression = compression_for(output_file, compression)
+    report["compression"] = compression
+    index_file = shard_index_path_for(output_file)
+    directory = os.path.dirname(output_file)
 
-    print(f"Der Inhalt von {len(file_contents)} Dateien wurde in {output_file} gespeichert.")
+    previous = load_shard_index(output_file)
+    previous_files = {os.path.abspath(os.path.join(directory, shard["file"]))
+                      for shard in previous["shards"]} if previous else set()
+    # Die eigenen Teildateien werden nie aufgenommen; neue Teile kommen während
+    # des Durchlaufs hinzu, iter_file_paths prüft dieselbe Menge
+    exclude_files = set(exclude_files or ()) | previous_files | {
+        os.path.abspath(f) for f in (index_file, index_file + ".tmp")}
 
-def read_file_content(file_path):
-    """Liest den Inhalt einer Datei und gibt ihn als String zurück."""
+    sections = iter_bundle(paths, filter_options, jobs=jobs, exclude_files=exclude_files, report=report,
+                           zero_copy=compression is None, sections=True, **options)
+    shards = []
+    completed = False
     try:
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            pending = deque()
+            for shard_sections, size, tokens in iter_shards(sections, shard_size, shard_tokens):
+                if cancel_event is not None and cancel_event.is_set():
+                    sections.close()
+                    break
+                shard_file = shard_file_for(output_file, len(shards) + 1)
+                temp_file = shard_file + ".tmp"
+                exclude_files.update(os.path.abspath(f) for f in (shard_file, temp_file))
+                entry = {
+                    "file": os.path.basename(shard_file),
+                    "bytes": size,
+                    "tokens": tokens,
+                    "files": [path for path, _ in shard_sections if path is not None],
+                }
+                if shard_sections[0][0] is None:
+                    entry["tree"] = True
+                if (shard_size and size > shard_size) or (shard_tokens and tokens > shard_tokens):
+                    entry["oversized"] = True
+                shards.append((shard_file, temp_file, entry))
+                pending.append(executor.submit(write_shard, shard_sections, temp_file, compression, report))
+                # Höchstens jobs fertige Teile warten auf das Schreiben
+                while len(pending) > max(jobs, 1):
+                    pending.popleft().result()
+            while pending:
+                pending.popleft().result()
+        completed = cancel_event is None or not cancel_event.is_set()
+    finally:
+        if not completed:
+            for _, temp_file, _ in shards:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+    if not completed:
+        return False
+
+    for shard_file, temp_file, _ in shards:
+        os.replace(temp_file, shard_file)
+    new_files = {os.path.abspath(shard_file) for shard_file, _, _ in shards}
+    for stale_file in previous_files - new_files:
+        if os.path.exists(stale_file):
+            os.remove(stale_file)
+
+    index = {
+        "version": SHARD_INDEX_VERSION,
+        "shard_size": shard_size,
+        "shard_tokens": shard_tokens,
+        "compression": compression,
+        "shards": [entry for _, _, entry in shards],
+    }
+    with open(index_file + ".tmp", 'w', encoding='utf-8') as file:
+        json.dump(index, file, indent=2)
+    os.replace(index_file + ".tmp", index_file)
+
+    report["shards"] = [shard_file for shard_file, _, _ in shards]
+    report["output_size"] = sum(os.path.getsize(shard_file) for shard_file in report["shards"])
+    add_timing(report, "total", time.perf_counter() - start)
+    return True
+
+def is_walked_file(root, full_path, filter_options=None):
+    """Prüft, ob iter_file_paths die Datei full_path beim Durchlaufen des Verzeichnisses root liefert.
+
+    Statt root zu durchlaufen, werden nur die übergeordneten Verzeichnisse
+    der Datei geprüft (und deren .gitignore-Dateien gelesen)."""
+    root = os.path.normpath(root)
+    parts = os.path.relpath(os.path.abspath(full_path), os.path.abspath(root)).split(os.sep)
+    if parts[0] == os.pardir or parts[-1].startswith('.'):
+        return False
+    path_filter = make_path_filter(root, filter_options)
+
+    def enter_directory(dirpath):
+        gitignore = os.path.isfile(os.path.join(dirpath, GITIGNORE_FILE))
+        path_filter.enter_directory(dirpath, [GITIGNORE_FILE] if gitignore else [])
+
+    dirpath = root
+    for name in parts[:-1]:
+        enter_directory(dirpath)
+        dirpath = os.path.join(dirpath, name)
+        if name in IGNORED_DIRS or path_filter.is_excluded(dirpath, True):
+            return False
+    enter_directory(dirpath)
+    return not path_filter.is_excluded(os.path.join(dirpath, parts[-1]), False)
+
+def update_layout(layout, changed, paths, filter_options=None, include_tree=False):
+    """Überträgt geänderte, neue und gelöschte Dateien auf die Dateiliste eines
+    früheren Builds (siehe iter_bundle, layout), ohne die Pfade zu durchlaufen.
+
+    Gibt False zurück, wenn die Pfade erneut durchlaufen werden müssen: bei
+    Ereignissen für Verzeichnisse (in changed mit abschließendem Trennzeichen),
+    geänderten .gitignore-Dateien, Archiven, Git-Revisionen und dem Git-Index
+    als Quelle sowie bei neuen (nicht ausgeschlossenen) oder gelöschten
+    Dateien, wenn die Verzeichnisstruktur ausgegeben wird. Neue Dateien
+    werden hinter der letzten Datei desselben Verzeichnisses eingefügt."""
+    if any(path.endswith(os.sep) or os.path.basename(path) == GITIGNORE_FILE for path in changed):
+        return False
+    files = layout["files"]
+    listed = {os.path.abspath(full_path) for _, full_path in files}
+    deleted, created = set(), []
+    for path in changed:
+        exists = os.path.isfile(path)
+        if path in listed:
+            if not exists:
+                deleted.add(path)
+        elif exists:
+            created.append(path)
+        elif os.path.isdir(path):
+            return False
+    added = []
+    for path in sorted(created):
+        roots = [root for root in paths if os.path.isdir(root)
+                 and path.startswith(os.path.join(os.path.abspath(root), ""))]
+        if len(roots) != 1:
+            # Z. B. eine einzeln angegebene Datei, die neu angelegt wurde, oder verschachtelte Pfade
+            return False
+        root = roots[0]
+        try:
+            if sources.open_source(root) is not None:
+                return False
+        except ValueError:
+            return False
+        if uses_git(filter_options):
+            return False
+        if is_walked_file(root, path, filter_options):
+            full_path = os.path.join(root, os.path.relpath(path, os.path.abspath(root)))
+            added.append((os.path.relpath(full_path, start=os.path.dirname(root)), full_path))
+    if not deleted and not added:
+        # Nur geänderte Inhalte oder ausgeschlossene Dateien; die Liste bleibt gleich
+        return True
+    if include_tree or uses_git(filter_options):
+        return False
+
+    files[:] = [item for item in files if os.path.abspath(item[1]) not in deleted]
+    for relative_path, full_path in added:
+        directory = os.path.dirname(os.path.abspath(full_path))
+        positions = [index for index, (_, listed_path) in enumerate(files)
+                     if os.path.dirname(os.path.abspath(listed_path)) == directory]
+        if not positions:
+            # Erste Datei eines Verzeichnisses: Position nur durch Durchlaufen bestimmbar
+            return False
+        files.insert(positions[-1] + 1, (relative_path, full_path))
+    return True
+
+def make_polling_source(paths, filter_options, exclude_files):
+    """Erkennt Änderungen durch Vergleich der Änderungszeiten aller Dateien (Fallback ohne watchdog).
+
+    Jede Abfrage ist ein vollständiger Durchlauf: Alle Dateien werden mit
+    stat geprüft, da eine geänderte Datei die Änderungszeit ihres
+    Verzeichnisses nicht ändert. Neu eingelesen werden dabei nur
+    Verzeichnisse, deren Änderungszeit sich geändert hat (siehe DirectoryCache);
+    ihre .gitignore-Dateien werden ebenfalls geprüft.
+
+    Gibt eine Funktion zurück, die die seit dem letzten Aufruf geänderten,
+    neuen und gelöschten Dateien liefert, sowie eine Funktion zum Beenden."""
+    listings = DirectoryCache()
+
+    def snapshot():
+        index = {}
+        for _, full_path in iter_file_paths(paths, exclude_files=exclude_files,
+                                            filter_options=filter_options, walk=listings.walk):
+            try:
+                stat = stat_file(full_path)
+            except OSError:
+                continue
+            index[os.path.abspath(full_path)] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        # .gitignore-Dateien liefert iter_file_paths nicht (versteckt), ihre
+        # Änderungen bestimmen aber, welche Dateien aufgenommen werden
+        for directory in listings.directories():
+            gitignore_path = os.path.join(directory, GITIGNORE_FILE)
+            try:
+                stat = os.stat(gitignore_path)
+            except OSError:
+                continue
+            index[gitignore_path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return index
+
+    state = {"index": snapshot()}
+
+    def drain():
+        index, new_index = state["index"], snapshot()
+        state["index"] = new_index
+        return {path for path in index.keys() | new_index.keys() if index.get(path) != new_index.get(path)}
+
+    return drain, lambda: None
+
+def make_watchdog_source(paths, exclude_files):
+    """Erkennt Änderungen über Dateisystem-Ereignisse (inotify, FSEvents, ...) mit watchdog.
+
+    Neue, gelöschte und verschobene Verzeichnisse werden mit abschließendem
+    Trennzeichen gemeldet. Gibt None zurück, wenn watchdog nicht installiert ist."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    lock = threading.Lock()
+    changed = set()
+    watched_files = {os.path.abspath(path) for path in paths if os.path.isfile(path)}
+    watched_dirs = tuple(os.path.join(os.path.abspath(path), "") for path in paths if os.path.isdir(path))
+
+    def is_watched(path):
+        return path in watched_files or path.startswith(watched_dirs)
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Änderungen eines Verzeichnisses selbst folgen aus den Ereignissen seiner Einträge
+            if event.event_type in ("opened", "closed_no_write") or (
+                    event.is_directory and event.event_type == "modified"):
+                return
+            with lock:
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    path = os.path.abspath(path) if path else ""
+                    if path and path not in exclude_files and is_watched(path):
+                        # Verzeichnisse mit abschließendem Trennzeichen (siehe update_layout)
+                        changed.add(os.path.join(path, "") if event.is_directory else path)
+
+    observer = Observer()
+    handler = Handler()
+    for path in paths:
+        if os.path.isdir(path):
+            observer.schedule(handler, path, recursive=True)
+        elif os.path.isfile(path):
+            observer.schedule(handler, os.path.dirname(os.path.abspath(path)), recursive=False)
+    observer.start()
+
+    def drain():
+        with lock:
+            result = set(changed)
+            changed.clear()
+        return result
+
+    def close():
+        observer.stop()
+        observer.join()
+
+    return drain, close
+
+def iter_changes(drain, stop_event, interval, debounce):
+    """Liefert Mengen geänderter Pfade, sobald eine Folge von Änderungen abgeschlossen ist.
+
+    Nach der ersten Änderung wird gewartet, bis für debounce Sekunden keine
+    weiteren Änderungen eintreffen."""
+    while not stop_event.wait(interval):
+        changed = drain()
+        if not changed:
+            continue
+        while not stop_event.wait(debounce):
+            more = drain()
+            if not more:
+                break
+            changed |= more
+        yield changed
+
+def watch_paths(paths, output_file, filter_options=None, stop_event=None, on_build=None, **options):
+    """Hält die Ausgabedatei aktuell, bis stop_event gesetzt wird.
+
+    Nach einem ersten inkrementellen Build werden die Pfade überwacht (mit
+    watchdog, sonst durch Abfragen der Änderungszeiten; diese Abfrage prüft
+    bei jedem Durchgang alle Dateien, siehe make_polling_source). Nach jeder
+    Folge von Änderungen werden nur die geänderten Dateien neu gelesen; alle
+    anderen Abschnitte werden ohne erneute Prüfung aus der vorherigen Ausgabe
+    übernommen. Dateiliste und Verzeichnisstruktur des letzten Builds werden
+    weiterverwendet und nur um neue und gelöschte Dateien ergänzt; durchlaufen
+    werden die Pfade erst wieder, wenn update_layout das verlangt (z. B. bei
+    neuen oder gelöschten Verzeichnissen).
+    on_build(report, changed) wird nach jedem Build aufgerufen."""
+    stop_event = stop_event or threading.Event()
+    exclude_files = {os.path.abspath(f) for f in
+                     (output_file, output_file + ".tmp", manifest_path_for(output_file))}
+
+    # Die Überwachung beginnt vor dem ersten Build, damit keine Änderung verloren geht
+    source = make_watchdog_source(paths, exclude_files)
+    interval = WATCH_EVENT_INTERVAL
+    if source is None:
+        source = make_polling_source(paths, filter_options, exclude_files)
+        interval = WATCH_POLL_INTERVAL
+    drain, close = source
+
+    try:
+        report = new_report()
+        layout = {}
+        write_bundle(paths, output_file, filter_options, incremental=True, report=report,
+                     layout=layout, **options)
+        if on_build is not None:
+            on_build(report, None)
+        for changed in iter_changes(drain, stop_event, interval, WATCH_DEBOUNCE):
+            if not update_layout(layout, changed, paths, with_since(filter_options, options.get("since")),
+                                 options.get("include_tree", False)):
+                layout.clear()
+            report = new_report()
+            write_bundle(paths, output_file, filter_options, incremental=True, report=report,
+                         changed_files={path for path in changed if not path.endswith(os.sep)},
+                         layout=layout, **options)
+            if on_build is not None:
+                on_build(report, changed)
+    finally:
+        close()
+
+def watch_shortcut(name, output_file, stats=False, **options):
+    """Verwendet einen Shortcut im Watch-Modus, bis Strg+C gedrückt wird."""
+    paths, filter_options = get_shortcut(name)
+    skip_binary = options.get("skip_binary", False)
+
+    def on_build(report, changed):
+        if changed is not None:
+            print(f"\n{len(changed)} Änderungen erkannt ({time.strftime('%H:%M:%S')}).")
+        print_report(report, output_file, incremental=True, skip_binary=skip_binary)
+        if stats:
+            print_stats(report)
+
+    print("Watch-Modus aktiv. Drücke Strg+C, um zu beenden.")
+    try:
+        watch_paths(paths, output_file, filter_options, on_build=on_build, **options)
+    except KeyboardInterrupt:
+        print("\nWatch-Modus beendet.")
+
+def use_shortcut(name, output_file, include_tree=False, jobs=1, incremental=False,
+                 tree_depth=None, tree_max_entries=None, max_file_size=None, skip_binary=False,
+                 token_budget=None, exact_tokens=False, compression=None, dedupe=False, stats=False,
+                 shard_size=None, shard_tokens=None, reduce=None, reduce_jobs=None, since=None,
+                 output_format="text"):
+    """Verwendet einen Shortcut, um Dateien zu kombinieren.
+
+    Die Ausgabe wird mit iter_bundle erzeugt (dort sind die Optionen
+    beschrieben) und mit write_bundle geschrieben (ggf. komprimiert).
+    Mit shard_size oder shard_tokens wird sie mit write_shards in
+    nummerierte Teildateien aufgeteilt (nicht inkrementell).
+    Mit output_format="pack" entsteht eine Pack-Datei (siehe write_pack).
+    Mit stats=True werden zusätzlich Phasen und Zähler ausgegeben.
+    Gibt das Protokoll des Builds zurück (siehe new_report)."""
+    paths, filter_options = get_shortcut(name)
+    report = new_report()
+    options = dict(include_tree=include_tree, jobs=jobs,
+                   tree_depth=tree_depth, tree_max_entries=tree_max_entries,
+                   max_file_size=max_file_size, skip_binary=skip_binary,
+                   token_budget=token_budget, exact_tokens=exact_tokens, compression=compression,
+                   dedupe=dedupe, reduce=reduce, reduce_jobs=reduce_jobs, since=since)
+    if shard_size or shard_tokens:
+        if incremental:
+            raise ValueError("Eine aufgeteilte Ausgabe kann nicht inkrementell erstellt werden.")
+        if output_format != "text":
+            raise ValueError("Eine aufgeteilte Ausgabe ist nur im Textformat möglich.")
+        write_shards(paths, output_file, filter_options, shard_size, shard_tokens, report=report, **options)
+    else:
+        write_bundle(paths, output_file, filter_options, incremental, report=report,
+                     output_format=output_format, **options)
+    print_report(report, output_file, incremental, skip_binary)
+    if stats:
+        print_stats(report)
+    return report
+
+def batch_output_file(output_dir, name, compression=None, output_format="text"):
+    """Gibt den Pfad der Ausgabedatei eines Shortcuts im Batch-Modus zurück (<Name>.txt bzw. <Name>.pack)."""
+    safe_name = re.sub(r'[^\w.-]', '_', name)
+    if output_format == "pack":
+        return os.path.join(output_dir, f"{safe_name}.pack")
+    extension = {"gzip": ".gz", "xz": ".xz"}.get(compression, "")
+    return os.path.join(output_dir, f"{safe_name}.txt{extension}")
+
+def use_shortcuts(names, output_dir, jobs=1, incremental=False, stats=False, **options):
+    """Verwendet mehrere Shortcuts in einem gemeinsamen Batch-Build (siehe write_bundles).
+
+    Jede Ausgabe wird als <Name>.txt (bzw. .txt.gz/.txt.xz/.pack) in output_dir
+    gespeichert; mit jobs werden so viele Ausgaben parallel geschrieben.
+    Gibt die Protokolle der Builds zurück."""
+    builds = []
+    for name in names:
+        paths, filter_options = get_shortcut(name)
+        builds.append((paths, batch_output_file(output_dir, name, options.get("compression"),
+                                                options.get("output_format", "text")), filter_options))
+    os.makedirs(output_dir, exist_ok=True)
+    reports = write_bundles(builds, jobs, incremental, **options)
+    for (_, output_file, _), report in zip(builds, reports):
+        print_report(report, output_file, incremental, options.get("skip_binary", False))
+        if stats:
+            print_stats(report)
+    return reports
+
+def read_file_content(file_path, report=None):
+    """Liest den Inhalt einer Datei und gibt ihn als String zurück.
+
+    Lesefehler werden im Protokoll report (siehe new_report) gezählt."""
+    source = sources.source_for(file_path)
+    try:
+        if source is not None:
+            return decode_file_bytes(file_path, source.read(file_path), report).decode('utf-8')
         with open(file_path, 'r', encoding='utf-8') as file:
             return file.read()
     except Exception as e:
+        add_stats(report, read_errors=1)
         return f"Fehler beim Lesen der Datei {file_path}: {str(e)}"
 
-def get_files_from_paths(paths):
-    """Verarbeitet eine Liste von Pfaden (Dateien oder Verzeichnisse) und gibt eine Liste von Tupeln zurück:
-    (relativer Pfad, Dateiinhalt)."""
-    file_contents = []
+def read_file_bytes(file_path, report=None):
+    """Liest den Inhalt einer Datei als UTF-8-Bytes, identisch zu read_file_content(...).encode().
+
+    Gültige UTF-8-Dateien ohne Wagenrücklauf werden unverändert übernommen,
+    ohne sie in einen String umzuwandeln und wieder zu kodieren. Nur Dateien
+    mit \r (Zeilenenden werden im Textmodus umgewandelt) oder ungültiger
+    Kodierung gehen den Umweg über read_file_content; diese Umwege und ihre
+    Dauer werden in report gezählt."""
+    source = sources.source_for(file_path)
+    try:
+        if source is not None:
+            data = source.read(file_path)
+        else:
+            with open(file_path, 'rb') as file:
+                data = file.read()
+    except OSError:
+        return read_file_content(file_path, report).encode('utf-8')
+    return decode_file_bytes(file_path, data, report)
+
+def decode_file_bytes(file_path, data, report=None):
+    """Wandelt gelesene Bytes wie read_file_bytes in UTF-8 mit umgewandelten Zeilenenden um.
+
+    Dateien auf der Festplatte werden für den Umweg erneut im Textmodus
+    gelesen, Einträge von Archiven (siehe sources) aus data umgewandelt."""
+    if b"\r" not in data:
+        if data.isascii():
+            return data
+        try:
+            data.decode('utf-8')
+            return data
+        except UnicodeDecodeError:
+            pass
+    start = time.perf_counter()
+    if sources.source_for(file_path) is None:
+        content = read_file_content(file_path, report).encode('utf-8')
+    else:
+        try:
+            text = data.decode('utf-8').replace("\r\n", "\n").replace("\r", "\n")
+        except UnicodeDecodeError as e:
+            add_stats(report, read_errors=1)
+            text = f"Fehler beim Lesen der Datei {file_path}: {str(e)}"
+        content = text.encode('utf-8')
+    add_stats(report, decode_fallbacks=1)
+    add_timing(report, "decode", time.perf_counter() - start)
+    return content
+
+class FileSection:
+    """Verweis auf einen Dateiausschnitt, der unverändert in die Ausgabe kopiert wird.
+
+    iter_bundle liefert mit zero_copy=True für große Dateien (und übernommene
+    Abschnitte der vorherigen Ausgabe) solche Verweise statt Bytes;
+    write_bundle kopiert sie mit copy_file_range/sendfile (siehe copy_file_section)."""
+    __slots__ = ("path", "offset", "length", "sha256")
+
+    def __init__(self, path, offset, length, sha256):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.sha256 = sha256
+
+    def __len__(self):
+        return self.length
+
+def scan_file_section(file_path, with_hash=True, file=None):
+    """Prüft eine Datei blockweise auf gültiges UTF-8 ohne Wagenrücklauf.
+
+    Gibt eine FileSection mit Länge und (mit with_hash) SHA-256 zurück oder
+    None, wenn die Datei nicht unverändert übernommen werden kann. Der
+    Speicherbedarf ist unabhängig von der Dateigröße. Ist file angegeben
+    (die bereits geöffnete Datei), wird sie nicht erneut geöffnet."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    digest = hashlib.sha256() if with_hash else None
+    buffer = bytearray(COPY_BLOCK_SIZE)
+    length = 0
+    try:
+        if file is not None:
+            file.seek(0)
+        with open(file_path, 'rb', buffering=0) if file is None else nullcontext(file) as file:
+            while True:
+                count = file.readinto(buffer)
+                if not count:
+                    break
+                block = buffer if count == len(buffer) else buffer[:count]
+                if block.find(b"\r") != -1:
+                    return None
+                if not block.isascii():
+                    decoder.decode(block)
+                if digest is not None:
+                    digest.update(block)
+                length += count
+        decoder.decode(b"", final=True)
+    except (OSError, UnicodeDecodeError):
+        return None
+    return FileSection(file_path, 0, length, digest.hexdigest() if digest is not None else None)
+
+def copy_file_section(section, output):
+    """Kopiert eine FileSection an das Ende der geöffneten Ausgabedatei.
+
+    Bevorzugt copy_file_range bzw. sendfile, sodass die Daten den Kernel nicht
+    verlassen; wo beides nicht verfügbar ist (z. B. anderes Dateisystem, kein
+    Linux), wird blockweise kopiert."""
+    output.flush()
+    out_fd = output.fileno()
+    copied = 0
+    with open(section.path, 'rb') as source:
+        in_fd = source.fileno()
+        for method in ("copy_file_range", "sendfile"):
+            if not hasattr(os, method):
+                continue
+            try:
+                while copied < section.length:
+                    count = section.length - copied
+                    if method == "copy_file_range":
+                        sent = os.copy_file_range(in_fd, out_fd, count, section.offset + copied)
+                    else:
+                        sent = os.sendfile(out_fd, in_fd, section.offset + copied, count)
+                    if not sent:
+                        break
+                    copied += sent
+                break
+            except OSError:
+                continue
+        # Position des Puffers mit der Dateiposition abgleichen
+        output.seek(0, os.SEEK_END)
+        source.seek(section.offset + copied)
+        while copied < section.length:
+            block = source.read(min(COPY_BLOCK_SIZE, section.length - copied))
+            if not block:
+                break
+            output.write(block)
+            copied += len(block)
+    if copied != section.length:
+        raise OSError(f"Die Datei {section.path} wurde während des Kopierens verändert.")
+
+def iter_file_paths(paths, exclude_files=None, scanned=None, filter_options=None, walk=None):
+    """Durchläuft eine Liste von Pfaden (Dateien oder Verzeichnisse) und liefert Tupel
+    (relativer Pfad, absoluter Pfad) in der Reihenfolge des Durchlaufs.
+
+    Dateien, deren absoluter Pfad in exclude_files enthalten ist (z. B. die
+    Ausgabedatei selbst), werden übersprungen. Verzeichnisse, die bereits mit
+    scan_directory eingelesen wurden (scanned), werden nicht erneut durchlaufen.
+    filter_options enthält die include-/exclude-Muster des Shortcuts; durch sie
+    oder .gitignore ausgeschlossene Verzeichnisse werden nicht betreten.
+    walk ersetzt os.walk (z. B. SharedCache.walk; ohne Angabe default_walk).
+
+    Archive und Git-Revisionen (siehe sources) werden wie Verzeichnisse
+    behandelt, ohne sie auszupacken (siehe iter_source_files)."""
+    exclude_files = exclude_files or set()
+    scanned = scanned or {}
+    walk = walk or default_walk()
     for path in paths:
-        if os.path.isfile(path):
-            # Wenn es eine Datei ist, lies den Inhalt
+        try:
+            source = sources.open_source(path)
+        except ValueError as e:
+            print(f"Warnung: {e}")
+            continue
+        if source is not None:
+            yield from iter_source_files(path, source, filter_options)
+        elif os.path.isfile(path):
+            # Wenn es eine Datei ist, übernimm sie direkt
+            if os.path.abspath(path) in exclude_files:
+                continue
             relative_path = os.path.basename(path)
-            content = read_file_content(path)
-            file_contents.append((relative_path, content))
+            yield relative_path, path
+        elif path in scanned or (uses_git(filter_options) and os.path.isdir(path)):
+            # Verzeichnis wurde bereits für die Verzeichnisstruktur eingelesen
+            # oder wird aus dem Git-Index gelesen
+            entries = scanned[path] if path in scanned else scan_git_directory(path, filter_options)
+            start = os.path.dirname(path)
+            for relative_path, full_path in iter_scanned_files(entries, start):
+                if os.path.abspath(full_path) not in exclude_files:
+                    yield relative_path, full_path
         elif os.path.isdir(path):
             # Wenn es ein Verzeichnis ist, durchsuche es rekursiv
-            for dirpath, dirnames, filenames in os.walk(path):
-                # Kopiere Dirnames, damit wir sie ändern können
-                dirnames_copy = dirnames.copy()
-                # Entferne ignorierte Verzeichnisse
-                for ignored_dir in IGNORED_DIRS:
-                    if ignored_dir in dirnames_copy:
-                        dirnames.remove(ignored_dir)  # Ändert dirnames in-place
+            path_filter = make_path_filter(path, filter_options)
+            for dirpath, dirnames, filenames in walk(path):
+                path_filter.enter_directory(dirpath, filenames)
+                # Entferne ignorierte und ausgeschlossene Verzeichnisse,
+                # bevor os.walk sie betritt (ändert dirnames in-place)
+                dirnames[:] = [d for d in dirnames
+                               if d not in IGNORED_DIRS
+                               and not path_filter.is_excluded(os.path.join(dirpath, d), True)]
                 
                 for filename in filenames:
                     # Ignoriere versteckte Dateien
@@ -142,65 +2190,329 @@ def get_files_from_paths(paths):
                         continue
                     
                     full_path = os.path.join(dirpath, filename)
+                    if path_filter.is_excluded(full_path, False):
+                        continue
+                    if exclude_files and os.path.abspath(full_path) in exclude_files:
+                        continue
                     relative_path = os.path.relpath(full_path, start=os.path.dirname(path))
-                    content = read_file_content(full_path)
-                    file_contents.append((relative_path, content))
+                    yield relative_path, full_path
         else:
             print(f"Warnung: {path} ist weder eine Datei noch ein Verzeichnis und wird ignoriert.")
-    return file_contents
+
+def iter_source_files(path, source, filter_options=None):
+    """Liefert wie iter_file_paths die Dateien eines Archivs oder einer Git-Revision.
+
+    Es gelten dieselben Regeln wie beim Durchlaufen eines Verzeichnisses
+    (ignorierte Verzeichnisse, versteckte Dateien, include-/exclude-Muster,
+    .gitignore). Die Dateien werden in der Reihenfolge der Quelle geliefert,
+    damit komprimierte Archive in einem Durchgang gelesen werden können."""
+    root = os.path.normpath(path)
+    start = os.path.dirname(root)
+    path_filter = make_path_filter(root, filter_options, source.read_text)
+    included = {}
+
+    def enter(dirpath):
+        # Verzeichnisse werden wie bei os.walk von oben nach unten betreten
+        if dirpath not in included:
+            included[dirpath] = dirpath == root or (
+                enter(os.path.dirname(dirpath))
+                and os.path.basename(dirpath) not in IGNORED_DIRS
+                and not path_filter.is_excluded(dirpath, True))
+            if included[dirpath]:
+                path_filter.enter_directory(dirpath, source.filenames(dirpath))
+        return included[dirpath]
+
+    for full_path in source.iter_files(root):
+        dirpath, filename = os.path.split(full_path)
+        if filename.startswith('.') or not enter(dirpath):
+            continue
+        if path_filter.is_excluded(full_path, False):
+            continue
+        yield os.path.relpath(full_path, start=start), full_path
+
+@sources.keeps_sources_open
+def iter_file_contents(paths, jobs=1, exclude_files=None, read_file=None, scanned=None,
+                       filter_options=None, file_paths=None):
+    """Liefert Tupel (relativer Pfad, Dateiinhalt) für alle Dateien der Pfade.
+
+    Die Dateien werden erst gelesen, wenn sie angefordert werden. Mit jobs > 1
+    werden höchstens jobs * READ_AHEAD_PER_JOB Dateien im Voraus in einem
+    Thread-Pool gelesen; die Reihenfolge des Durchlaufs bleibt erhalten.
+    Über read_file kann eine andere Lesefunktion als read_file_content
+    angegeben werden. Ist file_paths angegeben (Tupel aus relativem und
+    absolutem Pfad), werden genau diese Dateien gelesen, ohne paths zu durchlaufen."""
+    read_file = read_file or read_file_content
+    if file_paths is None:
+        file_paths = iter_file_paths(paths, exclude_files=exclude_files, scanned=scanned,
+                                     filter_options=filter_options)
+    if jobs <= 1:
+        for relative_path, full_path in file_paths:
+            yield relative_path, read_file(full_path)
+        return
+
+    max_pending = jobs * READ_AHEAD_PER_JOB
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for relative_path, full_path in file_paths:
+            pending.append((relative_path, executor.submit(read_file, full_path)))
+            if len(pending) >= max_pending:
+                relative_path, future = pending.popleft()
+                yield relative_path, future.result()
+        while pending:
+            relative_path, future = pending.popleft()
+            yield relative_path, future.result()
+
+def get_files_from_paths(paths, jobs=1, filter_options=None):
+    """Verarbeitet eine Liste von Pfaden (Dateien oder Verzeichnisse) und gibt eine Liste von Tupeln zurück:
+    (relativer Pfad, Dateiinhalt).
+
+    Für große Verzeichnisse sollte iter_file_contents verwendet werden, da
+    diese Funktion alle Inhalte gleichzeitig im Speicher hält."""
+    return list(iter_file_contents(paths, jobs=jobs, filter_options=filter_options))
+
+def parse_int_option(args, option, default=None, minimum=1):
+    """Liest den ganzzahligen Wert einer Option (z. B. --jobs 4) aus einer Argumentliste."""
+    if option not in args:
+        return default
+    index = args.index(option)
+    try:
+        value = int(args[index + 1])
+    except (IndexError, ValueError):
+        value = None
+    if value is None or value < minimum:
+        print(f"Fehler: {option} erwartet eine ganze Zahl größer oder gleich {minimum}.")
+        sys.exit(1)
+    return value
+
+def parse_size(value):
+    """Wandelt eine Größenangabe wie '512', '64K', '10M' oder '1G' in Bytes um."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    value = value.strip().upper().rstrip("B")
+    factor = 1
+    if value and value[-1] in units:
+        factor = units[value[-1]]
+        value = value[:-1]
+    return int(float(value) * factor)
+
+def parse_build_options(args):
+    """Liest die Optionen für den Inhalt der Ausgabe (--tree, --budget, ...) aus einer Argumentliste."""
+    max_file_size = None
+    if "--max-file-size" in args:
+        index = args.index("--max-file-size")
+        try:
+            max_file_size = parse_size(args[index + 1])
+        except (IndexError, ValueError):
+            print("Fehler: --max-file-size erwartet eine Größe wie 512, 64K oder 10M.")
+            sys.exit(1)
+    reduce = None
+    if "--reduce" in args:
+        index = args.index("--reduce")
+        try:
+            reduce = reducers.parse_reducers(args[index + 1])
+        except (IndexError, ValueError):
+            print(f"Fehler: --reduce erwartet eine Liste aus {', '.join(reducers.REDUCERS)} oder 'all'.")
+            sys.exit(1)
+    since = None
+    if "--since" in args:
+        index = args.index("--since")
+        since = args[index + 1] if index + 1 < len(args) else None
+        if not since or since.startswith("-"):
+            print("Fehler: --since erwartet eine Git-Revision (z. B. main oder HEAD~3).")
+            sys.exit(1)
+    compression = None
+    if "--compress" in args:
+        index = args.index("--compress")
+        compression = args[index + 1] if index + 1 < len(args) else None
+        if compression not in COMPRESSION_METHODS:
+            print(f"Fehler: --compress erwartet eines von: {', '.join(COMPRESSION_METHODS)}.")
+            sys.exit(1)
+    output_format = "text"
+    if "--format" in args:
+        index = args.index("--format")
+        output_format = args[index + 1] if index + 1 < len(args) else None
+        if output_format not in OUTPUT_FORMATS:
+            print(f"Fehler: --format erwartet eines von: {', '.join(OUTPUT_FORMATS)}.")
+            sys.exit(1)
+    return {
+        "include_tree": "--tree" in args,
+        "tree_depth": parse_int_option(args, "--tree-depth"),
+        "tree_max_entries": parse_int_option(args, "--tree-max-entries"),
+        "max_file_size": max_file_size,
+        "skip_binary": "--skip-binary" in args,
+        "token_budget": parse_int_option(args, "--budget"),
+        "exact_tokens": "--exact-tokens" in args,
+        "compression": compression,
+        "dedupe": "--dedupe" in args,
+        "reduce": reduce,
+        "reduce_jobs": parse_int_option(args, "--reduce-jobs"),
+        "since": since,
+        "output_format": output_format,
+    }
+
+def parse_shard_options(args):
+    """Liest die Optionen für eine aufgeteilte Ausgabe (--shard-size, --shard-tokens) aus einer Argumentliste."""
+    shard_size = None
+    if "--shard-size" in args:
+        index = args.index("--shard-size")
+        try:
+            shard_size = parse_size(args[index + 1])
+            if shard_size < 1:
+                raise ValueError(shard_size)
+        except (IndexError, ValueError):
+            print("Fehler: --shard-size erwartet eine Größe wie 512K, 10M oder 1G.")
+            sys.exit(1)
+    return {"shard_size": shard_size, "shard_tokens": parse_int_option(args, "--shard-tokens")}
+
+def parse_jobs(args):
+    """Liest den Wert der Option --jobs aus einer Argumentliste (Standard: 1)."""
+    return parse_int_option(args, "--jobs", default=1)
 
 def show_help():
     """Zeigt die Hilfe für das CLI-Tool an."""
     print("Verwendung: python combine_files.py <befehl> [argumente]")
     print("\nBefehle:")
     print("  --add <n> <pfad1> <pfad2> ...  Fügt einen neuen Shortcut hinzu.")
+    print("                                    Pfade können auch Archive (.zip, .tar.gz, ...) oder Git-Revisionen (repo@ref:verzeichnis) sein.")
+    print("  --include <muster>                Nimmt bei --add nur passende Dateien bzw. Dateien passender Verzeichnisse auf (mehrfach möglich).")
+    print("  --exclude <muster>                Schließt bei --add passende Dateien/Verzeichnisse aus (mehrfach möglich).")
+    print("  --no-gitignore                    Ignoriert bei --add die .gitignore-Dateien.")
+    print("  --git                             Liest Verzeichnisse des Shortcuts aus dem Git-Index (git ls-files) statt sie zu durchlaufen.")
     print("  --remove <n>                   Entfernt einen Shortcut.")
     print("  --list                            Listet alle Shortcuts auf.")
     print("  --use <n> <output_file>        Verwendet einen Shortcut um eine Textdatei zu erstellen.")
+    print("  --use-all <verzeichnis>           Erstellt für alle Shortcuts <Name>.txt in einem gemeinsamen Durchlauf.")
+    print("  --use-batch <verzeichnis> <n1> <n2> ...  Wie --use-all, aber nur für die angegebenen Shortcuts.")
     print("  --tree                            Fügt die Verzeichnisstruktur in die Ausgabedatei ein.")
+    print("  --jobs <n>                        Liest die Dateien bei --use mit n Threads parallel (bei --use-all: n Ausgaben parallel).")
+    print("  --tree-depth <n>                  Begrenzt die Verzeichnisstruktur auf n Ebenen.")
+    print("  --tree-max-entries <n>            Zeigt höchstens n Einträge pro Verzeichnis in der Struktur.")
+    print("  --max-file-size <größe>           Ersetzt Dateien über dieser Größe (z. B. 10M) durch einen Platzhalter.")
+    print("  --skip-binary                     Lässt Binär-, Lock- und zu große Dateien ganz aus.")
+    print("  --budget <tokens>                 Liest nur so viele Dateien, wie in das Token-Budget passen.")
+    print("  --exact-tokens                    Zählt die Tokens für --budget mit tiktoken (falls installiert).")
+    print("  --watch                           Hält die Ausgabedatei bei --use aktuell, bis Strg+C gedrückt wird.")
+    print("  --dedupe                          Gibt identische Dateien nur einmal aus, danach als Verweis.")
+    print("  --reduce <liste>                  Verkleinert Inhalte: license, comments (mit Docstrings), json, whitespace oder all.")
+    print("  --reduce-jobs <n>                 Anzahl der Prozesse für --reduce (Standard: Anzahl der CPUs).")
+    print("  --since <ref>                     Nimmt aus Verzeichnissen nur die seit der Git-Revision geänderten Dateien auf.")
+    print("  --compress <gzip|xz>              Komprimiert die Ausgabe (automatisch bei Endung .gz/.xz).")
+    print("  --format <text|pack>              Ausgabeformat; pack speichert die Dateien mit Offset-Tabelle für")
+    print("                                    den direkten Zugriff auf einzelne Dateien (siehe bundle_pack.py).")
+    print("  --incremental                     Liest bei --use nur geänderte Dateien neu (Manifest neben der Ausgabe).")
+    print("  --shard-size <größe>              Teilt die Ausgabe bei --use in Teildateien (ausgabe.001.txt, ...) dieser Größe auf.")
+    print("  --shard-tokens <n>                Teilt die Ausgabe bei --use in Teildateien mit höchstens n geschätzten Tokens auf.")
+    print("  --stats                           Zeigt Dauer der Phasen, gelesene Dateien, Bytes und Fehler an.")
     print("  --help                            Zeigt diese Hilfe an.")
     print("\nBeispiele:")
     print("  python combine_files.py --add my_project /pfad/zum/verzeichnis /pfad/zur/datei.txt")
+    print("  python combine_files.py --add my_project /pfad/zum/verzeichnis --exclude build/ --include '*.py'")
+    print("  python combine_files.py --add release release-1.0.tar.gz /pfad/zum/repo@v1.0:src")
     print("  python combine_files.py --use my_project output.txt --tree")
+    print("  python combine_files.py --use my_project output.txt --jobs 8")
+    print("  python combine_files.py --use my_project review.txt --since main")
+    print("  python combine_files.py --use my_project output.txt.gz")
+    print("  python combine_files.py --use my_project output.txt --shard-size 100M --jobs 4")
+    print("  python combine_files.py --use my_project output.pack --format pack")
+    print("  python combine_files.py --use-all ausgaben/ --jobs 4 --incremental")
     print("  python combine_files.py --list")
     print("\nWeb-Interface:")
     print("  Starte die Webanwendung mit: python app.py")
     print("  Die Anwendung ist dann unter http://localhost:5000 erreichbar.")
 
-def main():
-    """Hauptfunktion für die CLI-Verarbeitung."""
-    if len(sys.argv) < 2 or sys.argv[1] == "--help":
+def main(args=None):
+    """Hauptfunktion für die CLI-Verarbeitung.
+
+    args ersetzt sys.argv[1:], damit andere Module (cli.py, der Daemon)
+    Befehle im selben Prozess ausführen können."""
+    argv = sys.argv if args is None else [sys.argv[0]] + list(args)
+    if len(argv) < 2 or argv[1] == "--help":
         show_help()
         sys.exit(0)
 
-    command = sys.argv[1]
+    command = argv[1]
 
     if command == "--add":
-        if len(sys.argv) < 4:
+        if len(argv) < 4:
             print("Fehler: Ungültige Anzahl von Argumenten für --add.")
             print("Verwendung: python combine_files.py --add <n> <pfad1> <pfad2> ...")
             sys.exit(1)
-        name = sys.argv[2]
-        paths = sys.argv[3:]
-        add_shortcut(name, paths)
+        name = argv[2]
+        paths, include, exclude = [], [], []
+        args = iter(argv[3:])
+        for arg in args:
+            if arg in ("--include", "--exclude"):
+                pattern = next(args, None)
+                if pattern is None:
+                    print(f"Fehler: {arg} erwartet ein Muster.")
+                    sys.exit(1)
+                (include if arg == "--include" else exclude).append(pattern)
+            elif arg not in ("--no-gitignore", "--git"):
+                paths.append(arg)
+        if not paths:
+            print("Fehler: Es wurde kein Pfad angegeben.")
+            sys.exit(1)
+        add_shortcut(name, paths, include, exclude, "--no-gitignore" not in argv, "--git" in argv)
     elif command == "--remove":
-        if len(sys.argv) != 3:
+        if len(argv) != 3:
             print("Fehler: Ungültige Anzahl von Argumenten für --remove.")
             print("Verwendung: python combine_files.py --remove <n>")
             sys.exit(1)
-        name = sys.argv[2]
+        name = argv[2]
         remove_shortcut(name)
     elif command == "--list":
         list_shortcuts()
     elif command == "--use":
-        if len(sys.argv) < 4:
+        if len(argv) < 4:
             print("Fehler: Ungültige Anzahl von Argumenten für --use.")
-            print("Verwendung: python combine_files.py --use <n> <output_file> [--tree]")
+            print("Verwendung: python combine_files.py --use <n> <output_file> [--tree] [--jobs <n>] [--incremental]")
+            print("       [--tree-depth <n>] [--tree-max-entries <n>] [--max-file-size <größe>] [--skip-binary]")
+            print("       [--budget <tokens>] [--exact-tokens] [--watch] [--compress gzip|xz] [--dedupe] [--stats]")
+            print("       [--shard-size <größe>] [--shard-tokens <n>] [--reduce <liste>] [--reduce-jobs <n>]")
+            print("       [--since <ref>] [--format text|pack]")
+            sys.exit(1)
+        name = argv[2]
+        output_file = argv[3]
+        jobs = parse_jobs(argv)
+        incremental = "--incremental" in argv
+        options = parse_build_options(argv)
+        stats = "--stats" in argv
+        shard_options = parse_shard_options(argv)
+        if any(shard_options.values()) and (incremental or "--watch" in argv):
+            print("Fehler: --shard-size und --shard-tokens können nicht mit --incremental oder --watch kombiniert werden.")
+            sys.exit(1)
+        if options["output_format"] == "pack" and (incremental or "--watch" in argv or any(shard_options.values())
+                                                   or options["compression"]):
+            print("Fehler: --format pack kann nicht mit --incremental, --watch, --compress oder Teildateien kombiniert werden.")
+            sys.exit(1)
+        if "--watch" in argv:
+            watch_shortcut(name, output_file, stats=stats, jobs=jobs, **options)
+            return
+        use_shortcut(name, output_file, jobs=jobs, incremental=incremental, stats=stats,
+                     **shard_options, **options)
+    elif command in ("--use-all", "--use-batch"):
+        if len(argv) < (3 if command == "--use-all" else 4) or argv[2].startswith("--"):
+            print(f"Fehler: Ungültige Anzahl von Argumenten für {command}.")
+            print("Verwendung: python combine_files.py --use-all <ausgabeverzeichnis> [optionen wie bei --use]")
+            print("       python combine_files.py --use-batch <ausgabeverzeichnis> <n1> <n2> ... [optionen wie bei --use]")
+            sys.exit(1)
+        output_dir = argv[2]
+        if command == "--use-all":
+            names = list(load_shortcuts())
+        else:
+            names = []
+            for arg in argv[3:]:
+                if arg.startswith("--"):
+                    break
+                names.append(arg)
+        if not names:
+            print("Fehler: Es wurden keine Shortcuts gefunden.")
+            sys.exit(1)
+        options = parse_build_options(argv)
+        if options["output_format"] == "pack" and ("--incremental" in argv or options["compression"]):
+            print("Fehler: --format pack kann nicht mit --incremental oder --compress kombiniert werden.")
             sys.exit(1)
-        name = sys.argv[2]
-        output_file = sys.argv[3]
-        include_tree = "--tree" in sys.argv
-        use_shortcut(name, output_file, include_tree)
+        use_shortcuts(names, output_dir, jobs=parse_jobs(argv), incremental="--incremental" in argv,
+                      stats="--stats" in argv, **options)
     else:
         print(f"Fehler: Unbekannter Befehl '{command}'.")
         show_help()
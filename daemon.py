@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""
+CofifoAIWO - Daemon
+
+Ein langlebiger Prozess, der CLI-Befehle über einen lokalen Unix-Socket
+entgegennimmt und sie mit combine_files im selben Prozess ausführt. Dadurch
+entfallen der Interpreterstart und das Laden der Module pro Befehl, und der
+Shortcut-Speicher, die Manifeste sowie die Einträge der durchlaufenen
+Verzeichnisse (combine_files.DirectoryCache, geprüft über die
+Änderungszeit) bleiben zwischen den Aufrufen im Speicher.
+
+Starten:  python cli.py --daemon
+Beenden:  python cli.py --daemon-stop
+
+Solange der Daemon läuft, leitet cli.py Befehle automatisch an ihn weiter.
+"""
+
+import io
+import os
+import sys
+import json
+import socket
+import getpass
+import tempfile
+import threading
+import socketserver
+from contextlib import redirect_stdout, redirect_stderr
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+# Unix-Sockets sind nicht auf allen Plattformen verfügbar (z. B. ältere Windows-Versionen)
+AVAILABLE = hasattr(socket, 'AF_UNIX')
+
+# Befehl, mit dem ein Client den Daemon beendet
+STOP_COMMAND = "--daemon-stop"
+
+# Befehle, die dauerhaft laufen und deshalb nicht im Daemon ausgeführt werden
+BLOCKING_OPTIONS = ("--watch",)
+
+def socket_path():
+    """Gibt den Pfad des Sockets zurück (überschreibbar mit COFIFO_SOCKET)."""
+    return os.environ.get('COFIFO_SOCKET') or os.path.join(
+        tempfile.gettempdir(), f"cofifo-{getpass.getuser()}.sock")
+
+def run_command(args, cwd=None, output=None):
+    """Führt einen Befehl von combine_files im aktuellen Prozess aus.
+
+    Gibt den Exit-Code zurück. Mit output wird die Ausgabe statt auf die
+    Konsole in dieses Dateiobjekt geschrieben."""
+    # Erst hier importieren, damit Clients, die nur an den Daemon
+    # weiterleiten, combine_files nicht laden müssen
+    import combine_files
+
+    previous_cwd = os.getcwd()
+    try:
+        if cwd:
+            os.chdir(cwd)
+        if output is None:
+            combine_files.main(args)
+        else:
+            with redirect_stdout(output), redirect_stderr(output):
+                combine_files.main(args)
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=output or sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Fehler: {e}", file=output or sys.stderr)
+        return 1
+    finally:
+        os.chdir(previous_cwd)
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """Verarbeitet eine Anfrage: eine JSON-Zeile mit args und cwd."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # Verbindungstest ohne Befehl
+            return
+        try:
+            request = json.loads(line)
+            args = request["args"]
+        except (ValueError, KeyError, TypeError):
+            self.send_response(1, "Fehler: Ungültige Anfrage.\n")
+            return
+
+        if args == [STOP_COMMAND]:
+            self.send_response(0, "Daemon wird beendet.\n")
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        # Befehle werden nacheinander ausgeführt, da Arbeitsverzeichnis und
+        # Ausgabeumleitung für den ganzen Prozess gelten
+        output = io.StringIO()
+        exit_code = run_command(args, request.get("cwd"), output)
+        self.send_response(exit_code, output.getvalue())
+
+    def send_response(self, exit_code, output):
+        response = {"exit_code": exit_code, "output": output}
+        self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+
+def serve(path=None):
+    """Startet den Daemon und blockiert, bis er beendet wird."""
+    if not AVAILABLE:
+        print("Fehler: Unix-Sockets werden auf dieser Plattform nicht unterstützt.")
+        return False
+    path = path or socket_path()
+    if is_running(path):
+        print(f"Der Daemon läuft bereits ({path}).")
+        return False
+    if os.path.exists(path):
+        # Übrig gebliebener Socket eines abgestürzten Daemons
+        os.remove(path)
+
+    import combine_files
+    # Unveränderte Verzeichnisse werden bei weiteren Befehlen nicht erneut eingelesen
+    combine_files.enable_directory_cache()
+
+    old_umask = os.umask(0o077)
+    try:
+        server = socketserver.UnixStreamServer(path, CommandHandler)
+    finally:
+        os.umask(old_umask)
+    print(f"CofifoAIWO-Daemon läuft auf {path}")
+    print("Drücke Strg+C oder verwende --daemon-stop, um ihn zu beenden.")
+    try:
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    print("Daemon beendet.")
+    return True
+
+def is_running(path=None):
+    """Prüft, ob ein Daemon auf dem Socket erreichbar ist."""
+    if not AVAILABLE:
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path or socket_path())
+    except OSError:
+        return False
+    return True
+
+def send_command(args, path=None):
+    """Sendet einen Befehl an den Daemon.
+
+    Gibt die Antwort ({"exit_code", "output"}) zurück oder None, wenn kein
+    Daemon erreichbar ist."""
+    if not AVAILABLE:
+        return None
+    path = path or socket_path()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            request = {"args": list(args), "cwd": os.getcwd()}
+            client.sendall(json.dumps(request).encode('utf-8') + b"\n")
+            with client.makefile('rb') as response:
+                line = response.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    return json.loads(line)
+
+def forward_command(args):
+    """Führt einen Befehl über den Daemon aus, falls er läuft.
+
+    Gibt den Exit-Code zurück oder None, wenn der Befehl lokal ausgeführt
+    werden muss."""
+    if any(option in args for option in BLOCKING_OPTIONS):
+        return None
+    response = send_command(args)
+    if response is None:
+        return None
+    sys.stdout.write(response["output"])
+    sys.stdout.flush()
+    return response["exit_code"]
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+"""
+CofifoAIWO - Reduzierer
+
+Optionale Umformungen, die den Inhalt von Dateien vor der Ausgabe
+verkleinern, um Tokens zu sparen: Kommentare und Docstrings entfernen,
+Leerraum zusammenfassen, Lizenz-Kopfzeilen weglassen und JSON verkleinern.
+Die Umformungen sind verlustbehaftet und nur für das Lesen durch KI-Modelle
+gedacht; Dateien, die nicht fehlerfrei verarbeitet werden können, bleiben
+unverändert.
+
+Jeder Reduzierer ist eine Funktion (Text, Sprache) -> Text und wird in
+REDUCERS registriert. Weitere Reduzierer können beim Import eines Moduls
+mit register_reducer hinzugefügt werden. apply_reducers wird von
+combine_files in einem Prozess-Pool ausgeführt.
+"""
+
+import io
+import os
+import re
+import ast
+import json
+import time
+import tokenize
+
+# Sprache (Kommentar-Stil) nach Dateiendung
+LANGUAGES = {
+    ".py": "python", ".pyw": "python", ".pyi": "python",
+    ".js": "c", ".jsx": "c", ".mjs": "c", ".cjs": "c", ".ts": "c", ".tsx": "c",
+    ".java": "c", ".kt": "c", ".kts": "c", ".scala": "c", ".swift": "c", ".dart": "c",
+    ".c": "c", ".h": "c", ".cc": "c", ".cpp": "c", ".cxx": "c", ".hpp": "c", ".hh": "c",
+    ".cs": "c", ".go": "c", ".php": "c", ".groovy": "c", ".gradle": "c",
+    ".rs": "rust",
+    ".css": "css", ".scss": "scss", ".less": "scss",
+    ".sh": "hash", ".bash": "hash", ".zsh": "hash", ".rb": "hash", ".pl": "hash", ".r": "hash",
+    ".yml": "hash", ".yaml": "hash", ".toml": "hash", ".cfg": "hash", ".ini": "hash",
+    ".dockerfile": "hash", ".mk": "hash", ".cmake": "hash", ".ps1": "hash",
+    ".html": "html", ".htm": "html", ".xml": "html", ".svg": "html", ".vue": "html", ".md": "html",
+    ".sql": "sql",
+    ".json": "json",
+}
+
+# Sprache für Dateien ohne aussagekräftige Endung
+LANGUAGES_BY_NAME = {
+    "dockerfile": "hash", "makefile": "hash", "gemfile": "hash", "rakefile": "hash",
+    "cmakelists.txt": "hash", ".gitignore": "hash", ".dockerignore": "hash",
+}
+
+# Schlüsselwörter, an denen ein Lizenz-Kopf erkannt wird
+LICENSE_PATTERN = re.compile(r"copyright|licen[cs]e|spdx-license-identifier|all rights reserved", re.I)
+
+# Markiert entfernte Kommentare, damit danach leere Zeilen gelöscht werden können
+REMOVED = "\x00"
+
+# Zeichenketten und Kommentare für Sprachen mit C-artiger Syntax
+C_STRINGS = r'"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`'
+C_CHARS = r"|'(?:\\.|[^'\\\n])*'"
+C_LINE_COMMENT = r"|//[^\n]*"
+C_BLOCK_COMMENT = r"|/\*.*?\*/"
+COMMENT_PATTERNS = {
+    "c": re.compile(C_STRINGS + C_CHARS + C_LINE_COMMENT + C_BLOCK_COMMENT, re.S),
+    # In Rust sind ' auch Lebensdauern ('a) und keine Zeichenketten
+    "rust": re.compile(C_STRINGS + C_LINE_COMMENT + C_BLOCK_COMMENT, re.S),
+    # In CSS gibt es keine //-Kommentare (z. B. url(//cdn.example.com))
+    "css": re.compile(C_STRINGS + C_CHARS + C_BLOCK_COMMENT, re.S),
+    "scss": re.compile(C_STRINGS + C_CHARS + C_LINE_COMMENT + C_BLOCK_COMMENT, re.S),
+    "html": re.compile(r"<!--.*?-->", re.S),
+}
+
+# Zeichen, mit denen ganze Kommentarzeilen beginnen
+LINE_COMMENT_PREFIXES = {"python": "#", "hash": "#", "sql": "--"}
+
+def language_for(file_path):
+    """Bestimmt die Sprache einer Datei anhand ihres Namens (oder None)."""
+    name = os.path.basename(file_path).lower()
+    if name in LANGUAGES_BY_NAME:
+        return LANGUAGES_BY_NAME[name]
+    return LANGUAGES.get(os.path.splitext(name)[1])
+
+def drop_marked_lines(text):
+    """Entfernt Zeilen, die nach dem Entfernen von Kommentaren leer sind, und die Markierungen."""
+    lines = []
+    for line in text.splitlines(keepends=True):
+        if REMOVED in line:
+            stripped = line.replace(REMOVED, "")
+            if not stripped.strip():
+                continue
+            line = stripped.rstrip() + ("\n" if stripped.endswith("\n") else "")
+        lines.append(line)
+    return "".join(lines)
+
+def strip_python_comments(text):
+    """Entfernt Kommentare und Docstrings aus Python-Code (Shebang bleibt erhalten)."""
+    try:
+        tree = ast.parse(text)
+        tokens = list(tokenize.generate_tokens(io.StringIO(text).readline))
+    except (SyntaxError, ValueError, tokenize.TokenError):
+        return text
+    lines = text.splitlines(keepends=True)
+    removed_lines = set()
+
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        # Ein Docstring ohne weitere Anweisungen bleibt stehen, damit der Code gültig bleibt
+        if len(node.body) < 2:
+            continue
+        first = node.body[0]
+        if not (isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant)
+                and isinstance(first.value.value, str)):
+            continue
+        # Nur entfernen, wenn der Docstring eigene Zeilen belegt (Spalten in Bytes)
+        before = lines[first.lineno - 1].encode('utf-8')[:first.col_offset]
+        after = lines[first.end_lineno - 1].encode('utf-8')[first.end_col_offset:].strip()
+        if before.strip() or (after and not after.startswith(b"#")):
+            continue
+        removed_lines.update(range(first.lineno, first.end_lineno + 1))
+
+    for token in tokens:
+        if token.type != tokenize.COMMENT:
+            continue
+        row, column = token.start
+        if row == 1 and token.string.startswith("#!"):
+            continue
+        line = lines[row - 1]
+        code = line[:column].rstrip()
+        if code:
+            lines[row - 1] = code + "\n"
+        else:
+            removed_lines.add(row)
+    return "".join(line for number, line in enumerate(lines, 1) if number not in removed_lines)
+
+def strip_comments(text, language):
+    """Entfernt Kommentare (und in Python Docstrings) abhängig von der Sprache."""
+    if language == "python":
+        return strip_python_comments(text)
+    if REMOVED in text:
+        return text
+    if language in COMMENT_PATTERNS:
+        pattern = COMMENT_PATTERNS[language]
+
+        def replace(match):
+            comment = match.group(0)
+            return REMOVED if comment.startswith(("//", "/*", "<!--")) else comment
+        return drop_marked_lines(pattern.sub(replace, text))
+    prefix = LINE_COMMENT_PREFIXES.get(language)
+    if prefix is None:
+        return text
+    lines = text.splitlines(keepends=True)
+    return "".join(line for number, line in enumerate(lines, 1)
+                   if not line.lstrip().startswith(prefix)
+                   or (number == 1 and line.startswith("#!")))
+
+def leading_comment_end(lines, language):
+    """Gibt die Anzahl der Zeilen des Kommentarblocks am Anfang von lines zurück (0, wenn keiner)."""
+    if not lines:
+        return 0
+    first = lines[0].lstrip()
+    block_start, block_end = {"html": ("<!--", "-->")}.get(language, ("/*", "*/"))
+    if language in ("c", "rust", "css", "scss", "sql", "html") and first.startswith(block_start):
+        for index, line in enumerate(lines):
+            if block_end in line:
+                return index + 1
+        return 0
+    prefix = LINE_COMMENT_PREFIXES.get(language, "//")
+    count = 0
+    while count < len(lines) and lines[count].lstrip().startswith(prefix):
+        count += 1
+    return count
+
+def strip_license_header(text, language):
+    """Entfernt einen Lizenz- oder Copyright-Kommentar am Anfang der Datei."""
+    if language is None or language == "json":
+        return text
+    lines = text.splitlines(keepends=True)
+    start = 0
+    # Shebang und Kodierungszeile bleiben erhalten
+    while start < len(lines) and start < 2 and (lines[start].startswith("#!")
+                                                 or re.match(r"#.*coding[:=]", lines[start])):
+        start += 1
+    end = start
+    while end < len(lines) and not lines[end].strip():
+        end += 1
+    count = leading_comment_end(lines[end:], language)
+    if not count or not LICENSE_PATTERN.search("".join(lines[end:end + count])):
+        return text
+    end += count
+    while end < len(lines) and not lines[end].strip():
+        end += 1
+    return "".join(lines[:start] + lines[end:])
+
+def collapse_whitespace(text, language):
+    """Entfernt Leerzeichen am Zeilenende und fasst mehrere Leerzeilen zu einer zusammen."""
+    lines = []
+    blank = False
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line:
+            if blank or not lines:
+                continue
+            blank = True
+        else:
+            blank = False
+        lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    if not lines:
+        return ""
+    return "\n".join(lines) + ("\n" if text.endswith("\n") else "")
+
+def minify_json(text, language):
+    """Entfernt den Leerraum außerhalb von Zeichenketten aus gültigem JSON.
+
+    Zahlen und Zeichenketten bleiben genau so geschrieben wie im Original."""
+    if language != "json":
+        return text
+    try:
+        json.loads(text)
+    except ValueError:
+        return text
+    return re.sub(r'("(?:\\.|[^"\\])*")|\s+', lambda match: match.group(1) or "", text)
+
+# Registrierte Reduzierer in der Reihenfolge, in der sie angewendet werden
+REDUCERS = {
+    "license": strip_license_header,
+    "comments": strip_comments,
+    "json": minify_json,
+    "whitespace": collapse_whitespace,
+}
+
+def register_reducer(name, function):
+    """Registriert einen weiteren Reduzierer (Funktion (Text, Sprache) -> Text).
+
+    Damit er auch im Prozess-Pool verfügbar ist, muss die Registrierung beim
+    Import eines Moduls erfolgen."""
+    REDUCERS[name] = function
+
+def parse_reducers(value):
+    """Wandelt eine Liste wie 'comments,whitespace' oder 'all' in Reduzierer-Namen um."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if names == ["all"]:
+        return list(REDUCERS)
+    unknown = [name for name in names if name not in REDUCERS]
+    if unknown or not names:
+        raise ValueError(f"Unbekannte Reduzierer: {', '.join(unknown) or value}")
+    return names
+
+def apply_reducers(file_path, data, names):
+    """Wendet die Reduzierer names in der Reihenfolge von REDUCERS auf UTF-8-Bytes an.
+
+    Gibt (Bytes, eingesparte Bytes pro Reduzierer, Dauer in Sekunden) zurück.
+    Läuft im Prozess-Pool von combine_files und ist deshalb eine Funktion auf
+    Modulebene."""
+    start = time.perf_counter()
+    savings = {}
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data, savings, time.perf_counter() - start
+    language = language_for(file_path)
+    size = len(data)
+    for name, reducer in REDUCERS.items():
+        if name not in names:
+            continue
+        text = reducer(text, language)
+        reduced_size = len(text.encode('utf-8'))
+        savings[name] = size - reduced_size
+        size = reduced_size
+    return text.encode('utf-8'), savings, time.perf_counter() - start
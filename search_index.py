@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""
+CofifoAIWO - Suchindex
+
+Invertierter Index über die Dateien eines Shortcuts für die Volltextsuche
+im Web-Backend (/api/search). Der Index ordnet jedem Wort (Buchstaben,
+Ziffern und '_', klein geschrieben) die Dateien zu, in denen es vorkommt.
+Eine Suche bestimmt damit die Kandidaten und liest nur diese Dateien, um
+die passenden Zeilen als Ausschnitte zu liefern.
+
+Der Index wird mit refresh aufgebaut und aktualisiert: Dateien, deren
+Änderungszeit, Größe und Inode unverändert sind, werden nicht erneut
+gelesen. Geänderte und gelöschte Dateien werden zunächst nur als gelöscht
+markiert und bei Bedarf aus den Listen entfernt (compact). Welche Dateien
+zu einem Shortcut gehören und wie sie gelesen werden, übergibt der
+Aufrufer (z. B. combine_files.iter_file_paths), sodass dieselben Filter
+gelten wie beim Erstellen der Ausgabe.
+"""
+
+import re
+import time
+import threading
+from array import array
+from bisect import bisect_right
+
+# Wörter, die in den Index aufgenommen werden (längere Folgen sind meist Daten)
+TOKEN_PATTERN = re.compile(r"\w{2,64}")
+
+# Maximale Größe einer Datei, deren Inhalt indiziert wird
+MAX_INDEXED_FILE_SIZE = 2 * 1024 * 1024
+
+# Ausschnitte pro Datei und maximale Länge eines Ausschnitts in Zeichen
+MAX_SNIPPETS = 3
+SNIPPET_LENGTH = 200
+
+# Anteil gelöschter Einträge, ab dem die Listen bereinigt werden
+COMPACT_RATIO = 0.5
+
+def tokenize(text):
+    """Gibt die Menge der Wörter eines Textes (klein geschrieben) zurück."""
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+def make_snippet(line, position, length):
+    """Kürzt eine Zeile auf SNIPPET_LENGTH Zeichen um den Treffer an position herum."""
+    line = line.strip("\r\n")
+    if len(line) <= SNIPPET_LENGTH:
+        return line.strip()
+    start = max(0, min(position - (SNIPPET_LENGTH - length) // 2, len(line) - SNIPPET_LENGTH))
+    snippet = line[start:start + SNIPPET_LENGTH]
+    return ("…" if start else "") + snippet.strip() + ("…" if start + SNIPPET_LENGTH < len(line) else "")
+
+def find_snippets(text, needle, limit=MAX_SNIPPETS):
+    """Gibt die Zeilen von text zurück, die needle enthalten (ohne Beachtung der Groß-/Kleinschreibung).
+
+    Liefert eine Liste von Dictionaries mit Zeilennummer und Ausschnitt sowie
+    die Gesamtzahl der passenden Zeilen."""
+    snippets = []
+    count = 0
+    for number, line in enumerate(text.splitlines(), 1):
+        position = line.lower().find(needle)
+        if position == -1:
+            continue
+        count += 1
+        if len(snippets) < limit:
+            snippets.append({'line': number, 'text': make_snippet(line, position, len(needle))})
+    return snippets, count
+
+class SearchIndex:
+    """Invertierter Index über die Dateien eines Shortcuts.
+
+    refresh und search dürfen gleichzeitig aus verschiedenen Threads
+    aufgerufen werden; eine Suche während des ersten Aufbaus findet die
+    bereits indizierten Dateien."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Datei-ID -> (vollständiger Pfad, relativer Pfad) oder None, wenn gelöscht
+        self._documents = []
+        # vollständiger Pfad -> (Datei-ID, (mtime_ns, Größe, Inode))
+        self._files = {}
+        # Wort -> aufsteigende Datei-IDs
+        self._postings = {}
+        self._deleted = 0
+        # Alle Wörter, durch '\n' getrennt, für die Suche nach Teilwörtern
+        self._vocabulary = None
+        self.refreshing = False
+        self.refreshed_at = None
+        self.refresh_seconds = None
+
+    @property
+    def file_count(self):
+        return len(self._files)
+
+    def refresh(self, file_paths, stat_file, read_file):
+        """Bringt den Index auf den Stand der Dateien in file_paths.
+
+        file_paths liefert Tupel (relativer Pfad, vollständiger Pfad),
+        stat_file(Pfad) ein Objekt wie os.stat und read_file(Pfad, stat) den
+        Inhalt als Text oder None für Dateien, deren Inhalt nicht indiziert
+        wird (z. B. Binärdateien). Nur neue und geänderte Dateien werden gelesen."""
+        start = time.perf_counter()
+        seen = set()
+        try:
+            for relative_path, full_path in file_paths:
+                seen.add(full_path)
+                try:
+                    stat = stat_file(full_path)
+                except OSError:
+                    continue
+                key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+                current = self._files.get(full_path)
+                if current is not None and current[1] == key:
+                    continue
+                text = read_file(full_path, stat) if stat.st_size <= MAX_INDEXED_FILE_SIZE else None
+                tokens = tokenize(text) if text else ()
+                with self._lock:
+                    if current is not None:
+                        self._remove(current[0])
+                    document_id = len(self._documents)
+                    self._documents.append((full_path, relative_path))
+                    self._files[full_path] = (document_id, key)
+                    for token in tokens:
+                        postings = self._postings.get(token)
+                        if postings is None:
+                            postings = self._postings[token] = array('I')
+                            self._vocabulary = None
+                        postings.append(document_id)
+
+            with self._lock:
+                for full_path in [path for path in self._files if path not in seen]:
+                    self._remove(self._files.pop(full_path)[0])
+                if self._deleted > COMPACT_RATIO * len(self._documents):
+                    self._compact()
+        finally:
+            self.refreshed_at = time.time()
+            self.refresh_seconds = time.perf_counter() - start
+
+    def _remove(self, document_id):
+        self._documents[document_id] = None
+        self._deleted += 1
+
+    def _compact(self):
+        """Entfernt gelöschte Dateien aus allen Listen und vergibt die IDs neu."""
+        new_ids = {}
+        documents = []
+        for document_id, document in enumerate(self._documents):
+            if document is not None:
+                new_ids[document_id] = len(documents)
+                documents.append(document)
+        postings = {}
+        for token, ids in self._postings.items():
+            kept = array('I', (new_ids[document_id] for document_id in ids if document_id in new_ids))
+            if kept:
+                postings[token] = kept
+        self._documents = documents
+        self._postings = postings
+        self._files = {path: (new_ids[document_id], key) for path, (document_id, key) in self._files.items()}
+        self._deleted = 0
+        self._vocabulary = None
+
+    def _matching_tokens(self, word):
+        """Gibt alle Wörter des Index zurück, die word enthalten (Suche in einer Zeichenkette)."""
+        if self._vocabulary is None:
+            tokens = list(self._postings)
+            starts = []
+            position = 1
+            for token in tokens:
+                starts.append(position)
+                position += len(token) + 1
+            self._vocabulary = ("\n" + "\n".join(tokens) + "\n", starts, tokens)
+        text, starts, tokens = self._vocabulary
+        matches = []
+        position = text.find(word)
+        while position != -1:
+            index = bisect_right(starts, position) - 1
+            matches.append(tokens[index])
+            # Weiter mit dem nächsten Wort
+            next_start = starts[index + 1] if index + 1 < len(starts) else len(text)
+            position = text.find(word, next_start)
+        return matches
+
+    def candidates(self, query):
+        """Gibt die Dateien (vollständiger Pfad, relativer Pfad) zurück, die query enthalten könnten.
+
+        Enthält query kein Wort aus mindestens zwei Zeichen (z. B. 'x(' oder
+        'a b'), kann der Index die Dateien nicht eingrenzen; statt alle
+        Dateien zu lesen, wird dann eine leere Liste zurückgegeben."""
+        words = TOKEN_PATTERN.findall(query.lower())
+        if not words:
+            return []
+        with self._lock:
+            result = None
+            for word in sorted(words, key=len, reverse=True):
+                ids = set()
+                for token in self._matching_tokens(word):
+                    ids.update(self._postings[token])
+                result = ids if result is None else result & ids
+                if not result:
+                    return []
+            return [self._documents[document_id] for document_id in sorted(result)
+                    if self._documents[document_id] is not None]
+
+    def search(self, query, read_file, limit=50):
+        """Sucht query (ohne Beachtung der Groß-/Kleinschreibung) in Inhalten und Pfaden.
+
+        Die Kandidaten aus dem Index werden mit read_file(Pfad) (Text) gelesen,
+        um die passenden Zeilen zu bestimmen; ohne Wort aus mindestens zwei
+        Zeichen werden nur die Pfade durchsucht (siehe candidates). Gibt die
+        Treffer (höchstens limit) und ob weitere Treffer ausgelassen wurden zurück."""
+        needle = query.lower()
+        results = []
+        for full_path, relative_path in sorted(self.candidates(query), key=lambda document: document[1]):
+            if len(results) >= limit:
+                return results, True
+            try:
+                text = read_file(full_path)
+            except OSError:
+                continue
+            snippets, count = find_snippets(text, needle) if text else ([], 0)
+            if count:
+                results.append({'path': full_path, 'relative_path': relative_path,
+                                'matches': count, 'snippets': snippets})
+
+        # Dateien, deren Pfad den Suchbegriff enthält
+        found = {result['path'] for result in results}
+        with self._lock:
+            documents = [document for document in self._documents if document is not None]
+        for full_path, relative_path in sorted(documents, key=lambda document: document[1]):
+            if needle in relative_path.lower() and full_path not in found:
+                if len(results) >= limit:
+                    return results, True
+                results.append({'path': full_path, 'relative_path': relative_path,
+                                'matches': 0, 'snippets': []})
+        return results, False
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+CofifoAIWO - Shortcut-Speicher
+
+Gemeinsamer Zugriff auf die Shortcut-Datei für CLI und Web-Backend.
+Gelesene Shortcuts werden im Speicher gehalten und nur neu geladen, wenn
+sich die Datei geändert hat. Schreibzugriffe sind durch eine Sperrdatei
+geschützt und ersetzen die Datei atomar, sodass parallele Anfragen keine
+Änderungen verlieren und nie eine halb geschriebene Datei lesen.
+"""
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Unter Windows gibt es kein fcntl
+    fcntl = None
+    import msvcrt
+
+# Endung der Sperrdatei neben der Shortcut-Datei
+LOCK_SUFFIX = ".lock"
+
+# Zwischenspeicher je Shortcut-Datei: Pfad -> (Dateikennung, Shortcuts)
+_cache = {}
+_cache_lock = threading.Lock()
+
+# Sperren innerhalb des Prozesses, da Dateisperren nur zwischen Prozessen wirken
+_write_locks = {}
+
+def _file_signature(path):
+    """Gibt eine Kennung zurück, die sich bei jeder Änderung der Datei ändert (oder None)."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+def _read_file(path):
+    """Liest die Shortcut-Datei von der Festplatte."""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+@contextmanager
+def _locked(path):
+    """Sperrt die Shortcut-Datei für einen Lese-Änderungs-Schreib-Vorgang."""
+    path = os.path.abspath(path)
+    with _cache_lock:
+        thread_lock = _write_locks.setdefault(path, threading.Lock())
+    with thread_lock:
+        with open(path + LOCK_SUFFIX, 'a+b') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _write_file(path, shortcuts):
+    """Schreibt die Shortcuts in eine temporäre Datei und ersetzt die Shortcut-Datei atomar."""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(shortcuts, file, indent=4)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+def load_shortcuts(path):
+    """Lädt die Shortcuts aus der Datei oder aus dem Zwischenspeicher.
+
+    Gibt eine Kopie zurück, damit Änderungen des Aufrufers den
+    Zwischenspeicher nicht verfälschen."""
+    key = os.path.abspath(path)
+    signature = _file_signature(key)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is None or cached[0] != signature:
+        shortcuts = _read_file(key)
+        with _cache_lock:
+            _cache[key] = (signature, shortcuts)
+    else:
+        shortcuts = cached[1]
+    return dict(shortcuts)
+
+def update_shortcuts(path, update):
+    """Ändert die Shortcuts unter einer Sperre.
+
+    update erhält die aktuellen Shortcuts von der Festplatte und ändert sie
+    direkt. Gibt update False zurück, wird nichts geschrieben; ansonsten wird
+    die Datei atomar ersetzt. Der Rückgabewert von update wird zurückgegeben."""
+    key = os.path.abspath(path)
+    with _locked(key):
+        shortcuts = _read_file(key)
+        result = update(shortcuts)
+        if result is not False:
+            _write_file(key, shortcuts)
+            with _cache_lock:
+                _cache[key] = (_file_signature(key), shortcuts)
+    return result
+
+def save_shortcuts(path, shortcuts):
+    """Ersetzt alle Shortcuts in der Datei."""
+    def replace(current):
+        current.clear()
+        current.update(shortcuts)
+    update_shortcuts(path, replace)
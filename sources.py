@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+"""
+CofifoAIWO - Archive und Git-Revisionen als Quellen
+
+Erlaubt Archive (.zip, .tar, .tar.gz, ...) und Git-Revisionen eines lokalen
+Repositorys (repo@ref oder repo@ref:unterverzeichnis) als Pfade eines
+Shortcuts, ohne sie vorher auszupacken oder auszuchecken. Einträge werden
+direkt aus dem Archiv bzw. über einen einzigen Prozess
+`git cat-file --batch` gelesen.
+
+Für Verzeichnisse in einem Git-Arbeitsverzeichnis liefert list_git_files
+die Dateien aus dem Git-Index (git ls-files) statt aus os.walk, optional nur
+die seit einer Revision geänderten Dateien.
+
+Eine Quelle verhält sich für combine_files wie ein Verzeichnis: Einträge
+haben den Pfad '<Quelle>/<Eintrag>' (z. B. release.tar.gz/src/app.py),
+stat liefert Größe, Änderungszeit und eine Kennung des Inhalts, read den
+Inhalt als Bytes. Welche Einträge ausgegeben werden, entscheidet
+combine_files mit denselben Regeln wie beim Durchlaufen eines Verzeichnisses.
+"""
+
+import os
+import abc
+import stat
+import functools
+import time
+import tarfile
+import zipfile
+import threading
+import subprocess
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+# Unterstützte Archivendungen
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+# Einträge, die beim Einlesen eines tar-Archivs vorab gelesen werden, da der
+# Filter sie vor den übrigen Einträgen ihres Verzeichnisses braucht
+PRELOADED_NAMES = {".gitignore"}
+
+# Größe des Fensters, in dem übersprungene Einträge komprimierter tar-Archive
+# aufgehoben werden, damit leicht vertauschte Lesezugriffe nicht zurückspulen
+TAR_WINDOW_SIZE = 64 * 1024 * 1024
+
+# Anzahl der offen gehaltenen Quellen, solange kein Build läuft (siehe keep_open)
+MAX_OPEN_SOURCES = 8
+
+# Wie os.stat_result, soweit combine_files es benötigt (st_ino kennzeichnet den Inhalt)
+EntryStat = namedtuple("EntryStat", ["st_size", "st_mtime_ns", "st_ino"])
+
+class Source(abc.ABC):
+    """Gemeinsame Grundlage für Archive und Git-Revisionen.
+
+    Einträge werden in der Reihenfolge des Archivs bzw. des Git-Baums
+    gespeichert; iter_files liefert sie in dieser Reihenfolge, sodass
+    komprimierte Archive in einem Durchgang gelesen werden können."""
+
+    def __init__(self, root, identity):
+        self.root = root
+        self.identity = identity
+        # Eintrag (relativer Pfad mit '/') -> (EntryStat, Verweis zum Lesen)
+        self.entries = {}
+        # Verzeichnis ('' für die Wurzel) -> Namen der Dateien bzw. Unterverzeichnisse
+        self.files = {"": []}
+        self.directories = {"": []}
+
+    def add(self, member, entry_stat, handle):
+        """Fügt einen Eintrag hinzu; ein späterer Eintrag mit demselben Pfad ersetzt den früheren."""
+        if self.entries.pop(member, None) is None:
+            directory, _, name = member.rpartition("/")
+            self._add_directory(directory)
+            self.files[directory].append(name)
+        self.entries[member] = (entry_stat, handle)
+
+    def _add_directory(self, directory):
+        if directory in self.files:
+            return
+        parent, _, name = directory.rpartition("/")
+        self._add_directory(parent)
+        self.directories[parent].append(name)
+        self.files[directory] = []
+        self.directories[directory] = []
+
+    def member(self, path):
+        """Gibt den Eintrag zu einem Pfad unterhalb der Quelle zurück ('' für die Quelle selbst)."""
+        path = os.path.abspath(path)
+        if path == self.root:
+            return ""
+        if not path.startswith(self.root + os.sep):
+            raise FileNotFoundError(f"{path} liegt nicht in {self.root}")
+        member = path[len(self.root) + 1:]
+        return member.replace(os.sep, "/") if os.sep != "/" else member
+
+    def iter_files(self, root):
+        """Liefert die vollständigen Pfade aller Einträge (unterhalb von root) in der Reihenfolge der Quelle."""
+        for member in self.entries:
+            yield os.path.join(root, member)
+
+    def filenames(self, path):
+        """Gibt die Namen der Dateien eines Verzeichnisses der Quelle zurück."""
+        return set(self.files.get(self.member(path), ()))
+
+    def list_directory(self, path):
+        """Wie combine_files.read_directory für ein Verzeichnis der Quelle (alphabetisch sortiert)."""
+        directory = self.member(path)
+        if directory not in self.files:
+            return None
+        listing = [(name, os.path.join(path, name), True, False) for name in self.directories[directory]]
+        listing += [(name, os.path.join(path, name), False, False) for name in self.files[directory]]
+        return sorted(listing)
+
+    def stat(self, path):
+        """Gibt Größe, Änderungszeit und Kennung eines Eintrags zurück (wie os.stat)."""
+        try:
+            return self.entries[self.member(path)][0]
+        except KeyError:
+            raise FileNotFoundError(f"{path} ist nicht in {self.root} enthalten") from None
+
+    def handle(self, path):
+        try:
+            return self.entries[self.member(path)][1]
+        except KeyError:
+            raise FileNotFoundError(f"{path} ist nicht in {self.root} enthalten") from None
+
+    @abc.abstractmethod
+    def read(self, path):
+        """Liest einen Eintrag vollständig und gibt die Bytes zurück (OSError bei Fehlern)."""
+
+    def read_text(self, path):
+        """Liest einen Eintrag als UTF-8-Text (z. B. .gitignore für PathFilter)."""
+        return self.read(path).decode('utf-8')
+
+    def close(self):
+        """Gibt geöffnete Dateien und Prozesse frei."""
+
+class ZipSource(Source):
+    """Ein zip-Archiv; Einträge werden über das Inhaltsverzeichnis einzeln gelesen."""
+
+    def __init__(self, root, identity):
+        super().__init__(root, identity)
+        self.archive = zipfile.ZipFile(root)
+        for info in self.archive.infolist():
+            if info.is_dir() or stat.S_ISLNK(info.external_attr >> 16):
+                continue
+            member = clean_member(info.filename)
+            if member:
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                self.add(member, EntryStat(info.file_size, int(mtime * 1e9), info.CRC), info)
+
+    def read(self, path):
+        try:
+            # ZipFile erlaubt gleichzeitiges Lesen mehrerer Einträge aus verschiedenen Threads
+            return self.archive.read(self.handle(path))
+        except OSError:
+            raise
+        except Exception as e:
+            raise OSError(f"Fehler beim Lesen von {path}: {e}") from e
+
+    def close(self):
+        self.archive.close()
+
+class TarSource(Source):
+    """Ein tar-Archiv, auch gzip-, bzip2- oder xz-komprimiert.
+
+    Komprimierte Archive können nur vorwärts effizient gelesen werden. Die
+    Einträge werden deshalb in Archivreihenfolge gelesen; dabei übersprungene
+    Einträge bleiben bis zu TAR_WINDOW_SIZE Bytes im Speicher, damit
+    parallele Lesezugriffe in leicht vertauschter Reihenfolge nicht
+    zurückspulen müssen."""
+
+    def __init__(self, root, identity):
+        super().__init__(root, identity)
+        self.sequential = not root.lower().endswith(".tar")
+        self.archive = tarfile.open(root, "r:*")
+        self.preloaded = {}
+        self._lock = threading.Lock()
+        self._window = OrderedDict()
+        self._window_size = 0
+        self._cursor = 0
+        for info in self.archive:
+            if not info.isreg():
+                continue
+            member = clean_member(info.name)
+            if not member:
+                continue
+            if member.rpartition("/")[2] in PRELOADED_NAMES:
+                self.preloaded[member] = self.archive.extractfile(info).read()
+            self.add(member, EntryStat(info.size, int(info.mtime * 1e9), info.offset_data), info)
+        self.order = list(self.entries)
+        self.index = {member: index for index, member in enumerate(self.order)}
+
+    def _extract(self, info):
+        return self.archive.extractfile(info).read()
+
+    def _remember(self, member, data):
+        self._window[member] = data
+        self._window_size += len(data)
+        while self._window_size > TAR_WINDOW_SIZE:
+            _, dropped = self._window.popitem(last=False)
+            self._window_size -= len(dropped)
+
+    def read(self, path):
+        member = self.member(path)
+        if member in self.preloaded:
+            return self.preloaded[member]
+        info = self.handle(path)
+        try:
+            with self._lock:
+                data = self._window.pop(member, None)
+                if data is not None:
+                    self._window_size -= len(data)
+                    return data
+                index = self.index[member]
+                if self.sequential:
+                    for skipped in self.order[self._cursor:index]:
+                        skipped_info = self.entries[skipped][1]
+                        if skipped_info.size <= TAR_WINDOW_SIZE:
+                            self._remember(skipped, self._extract(skipped_info))
+                self._cursor = index + 1
+                return self._extract(info)
+        except OSError:
+            raise
+        except Exception as e:
+            raise OSError(f"Fehler beim Lesen von {path}: {e}") from e
+
+    def close(self):
+        self.archive.close()
+
+class GitSource(Source):
+    """Eine Revision eines lokalen Git-Repositorys, optional auf ein Unterverzeichnis beschränkt.
+
+    Die Einträge stammen aus `git ls-tree`, gelesen wird über einen einzigen,
+    bei Bedarf gestarteten Prozess `git cat-file --batch`. Submodule und
+    symbolische Links werden übersprungen."""
+
+    def __init__(self, root, identity, repo, subdir):
+        super().__init__(root, identity)
+        self.repo = repo
+        self._process = None
+        self._lock = threading.Lock()
+        args = ["ls-tree", "-r", "-l", "-z", "--full-tree", identity]
+        if subdir:
+            args += ["--", subdir]
+        prefix = subdir + "/" if subdir else ""
+        for record in run_git(repo, *args).split(b"\0"):
+            if not record:
+                continue
+            info, _, name = record.partition(b"\t")
+            mode, kind, object_id, size = info.split()
+            name = name.decode('utf-8', errors='surrogateescape')
+            if kind != b"blob" or mode == b"120000" or not name.startswith(prefix):
+                continue
+            object_id = object_id.decode('ascii')
+            # Der Objektname kennzeichnet den Inhalt, eine Änderungszeit gibt es nicht
+            self.add(name[len(prefix):], EntryStat(int(size), 0, int(object_id[:15], 16)), object_id)
+
+    def read(self, path):
+        object_id = self.handle(path)
+        with self._lock:
+            try:
+                if self._process is None:
+                    self._process = subprocess.Popen(
+                        ["git", "-C", self.repo, "cat-file", "--batch"],
+                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                self._process.stdin.write(object_id.encode('ascii') + b"\n")
+                self._process.stdin.flush()
+                header = self._process.stdout.readline().split()
+                if len(header) != 3:
+                    raise OSError(f"Objekt {object_id} fehlt im Repository {self.repo}")
+                size = int(header[2])
+                data = self._process.stdout.read(size)
+                self._process.stdout.read(1)
+                if len(data) != size:
+                    raise OSError(f"git cat-file wurde unerwartet beendet ({self.repo})")
+                return data
+            except (OSError, ValueError) as e:
+                # Der Prozess wird beim nächsten Zugriff neu gestartet
+                self._stop()
+                raise OSError(f"Fehler beim Lesen von {path}: {e}") from e
+
+    def _stop(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+def clean_member(name):
+    """Normalisiert den Namen eines Archiveintrags; gibt None für unsichere Namen (..) zurück."""
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if ".." in parts:
+        return None
+    return "/".join(parts)
+
+def run_git(repo, *args):
+    """Führt einen Git-Befehl im Repository aus und gibt die Ausgabe als Bytes zurück."""
+    try:
+        result = subprocess.run(["git", "-C", repo, *args], capture_output=True)
+    except OSError as e:
+        raise ValueError(f"git konnte nicht gestartet werden: {e}") from e
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', errors='replace').strip()
+        raise ValueError(f"git {args[0]} in {repo} fehlgeschlagen: {message}")
+    return result.stdout
+
+def check_revision(ref):
+    """Löst ValueError aus, wenn ref als Option von git missverstanden werden könnte."""
+    if not ref or ref.startswith("-"):
+        raise ValueError(f"Ungültige Git-Revision: {ref!r}")
+
+def split_names(output):
+    """Zerlegt die mit -z erzeugte Ausgabe von git in Pfade."""
+    return [os.fsdecode(name) for name in output.split(b"\0") if name]
+
+def list_git_files(path, since=None):
+    """Listet die Dateien unterhalb von path aus dem Git-Index auf (git ls-files).
+
+    Ohne since sind das alle versionierten Dateien, die noch vorhanden sind,
+    sowie neue, nicht durch .gitignore ausgeschlossene Dateien. Mit since nur
+    die Dateien, die sich im Arbeitsverzeichnis gegenüber der Revision since
+    geändert haben oder neu sind; gelöschte Dateien entfallen. Submodule
+    werden übersprungen.
+
+    Gibt die Pfade relativ zu path (mit '/') sortiert zurück. Löst
+    ValueError aus, wenn path nicht in einem Git-Arbeitsverzeichnis liegt."""
+    names = split_names(run_git(path, "ls-files", "-z", "--others", "--exclude-standard"))
+    if since is None:
+        deleted = set(split_names(run_git(path, "ls-files", "-z", "--deleted")))
+        for record in run_git(path, "ls-files", "-z", "--stage").split(b"\0"):
+            info, _, name = record.partition(b"\t")
+            if name and not info.startswith(b"160000 "):
+                names.append(os.fsdecode(name))
+        names = [name for name in names if name not in deleted]
+    else:
+        check_revision(since)
+        output = run_git(path, "diff", "--raw", "-z", "--relative", "--no-renames",
+                         "--diff-filter=d", since, "--")
+        # Je Datei folgen aufeinander: ':alter Modus neuer Modus ... Status' und der Pfad
+        records = output.split(b"\0")
+        for info, name in zip(records[0::2], records[1::2]):
+            if name and info.split()[1] != b"160000":
+                names.append(os.fsdecode(name))
+    return sorted(set(names))
+
+def is_archive(path):
+    """Prüft anhand der Endung, ob path ein unterstütztes Archiv ist."""
+    return path.lower().endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path)
+
+def parse_git_revision(path):
+    """Zerlegt 'repo@ref' oder 'repo@ref:unterverzeichnis' in (repo, ref, unterverzeichnis).
+
+    Gibt None zurück, wenn path ein vorhandener Pfad ist oder vor keinem '@'
+    ein Verzeichnis steht."""
+    if os.path.exists(path):
+        return None
+    index = path.find("@")
+    while index != -1:
+        repo = path[:index] or "."
+        ref, _, subdir = path[index + 1:].partition(":")
+        if ref and not ref.startswith("-") and os.path.isdir(repo):
+            return repo, ref, subdir.strip("/")
+        index = path.find("@", index + 1)
+    return None
+
+_open_sources = OrderedDict()
+_open_sources_lock = threading.Lock()
+# Anzahl der laufenden Builds (keep_open) und ersetzte, noch nicht geschlossene Quellen
+_active_builds = 0
+_retired_sources = []
+
+def _close_unused():
+    """Schließt ersetzte Quellen und die ältesten über MAX_OPEN_SOURCES hinaus (mit _open_sources_lock)."""
+    if _active_builds:
+        return
+    while _retired_sources:
+        _retired_sources.pop().close()
+    while len(_open_sources) > MAX_OPEN_SOURCES:
+        _, evicted = _open_sources.popitem(last=False)
+        evicted.close()
+
+@contextmanager
+def keep_open():
+    """Hält alle Quellen offen, solange der Block läuft (z. B. für die Dauer eines Builds).
+
+    Ohne laufenden Build werden höchstens MAX_OPEN_SOURCES Quellen offen
+    gehalten. Während eines Builds wird keine Quelle geschlossen, da sie von
+    iter_bundle oder einem anderen Thread des Batch-Builds noch gelesen
+    werden könnte; überzählige Quellen werden nach dem letzten Build
+    geschlossen. Blöcke dürfen verschachtelt und in mehreren Threads laufen."""
+    global _active_builds
+    with _open_sources_lock:
+        _active_builds += 1
+    try:
+        yield
+    finally:
+        with _open_sources_lock:
+            _active_builds -= 1
+            _close_unused()
+
+def keeps_sources_open(function):
+    """Dekorator für Generatorfunktionen: hält die Quellen offen, bis der Generator beendet ist (siehe keep_open)."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with keep_open():
+            yield from function(*args, **kwargs)
+    return wrapper
+
+def open_source(path):
+    """Öffnet path als Archiv oder Git-Revision; gibt None zurück, wenn path keins von beiden ist.
+
+    Geöffnete Quellen werden wiederverwendet, solange sich das Archiv bzw.
+    der Commit der Revision nicht ändert (zum Schließen siehe keep_open).
+    Ungültige Archive und Revisionen lösen ValueError aus."""
+    revision = None if is_archive(path) else parse_git_revision(path)
+    if revision is None and not is_archive(path):
+        return None
+    root = os.path.abspath(path)
+    if revision is not None:
+        repo, ref, subdir = revision
+        try:
+            identity = run_git(repo, "rev-parse", "--verify", "--quiet", ref + "^{commit}").decode().strip()
+        except ValueError:
+            raise ValueError(f"{ref} ist keine gültige Revision im Git-Repository {repo}") from None
+    else:
+        archive_stat = os.stat(path)
+        identity = (archive_stat.st_mtime_ns, archive_stat.st_size, archive_stat.st_ino)
+
+    with _open_sources_lock:
+        source = _open_sources.get(root)
+        if source is not None and source.identity == identity:
+            _open_sources.move_to_end(root)
+            return source
+        try:
+            if revision is not None:
+                new_source = GitSource(root, identity, repo, subdir)
+            elif root.lower().endswith(".zip"):
+                new_source = ZipSource(root, identity)
+            else:
+                new_source = TarSource(root, identity)
+        except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+            raise ValueError(f"{path} kann nicht gelesen werden: {e}") from e
+        if source is not None:
+            _retired_sources.append(source)
+        _open_sources[root] = new_source
+        _close_unused()
+        return new_source
+
+def source_for(path):
+    """Gibt die geöffnete Quelle zurück, in der path liegt (oder None für gewöhnliche Dateien)."""
+    if not _open_sources:
+        return None
+    path = os.path.abspath(path)
+    for root, source in list(_open_sources.items()):
+        if path.startswith(root + os.sep):
+            return source
+    return None
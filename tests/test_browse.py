@@ -0,0 +1,66 @@
+"""Tests für den Verzeichnis-Zwischenspeicher von /api/browse."""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+# Der Shortcut-Speicher wird beim Import angelegt, nicht im Repository
+_shortcuts_dir = tempfile.mkdtemp()
+os.environ.setdefault('COFIFO_SHORTCUTS_FILE', os.path.join(_shortcuts_dir, "shortcuts.json"))
+
+import app
+
+
+class BrowseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def browse(self):
+        response = self.client.get('/api/browse', query_string={'path': self.path})
+        self.assertEqual(response.status_code, 200)
+        return sorted(entry['name'] for entry in response.get_json()['entries'])
+
+    def test_file_created_right_after_browse_appears(self):
+        with open(os.path.join(self.path, "a.txt"), 'w') as file:
+            file.write("a")
+        self.assertEqual(self.browse(), ["a.txt"])
+        with open(os.path.join(self.path, "b.txt"), 'w') as file:
+            file.write("b")
+        self.assertEqual(self.browse(), ["a.txt", "b.txt"])
+
+    def test_change_in_same_timestamp_tick_is_not_served_stale(self):
+        # Grobe Auflösung der Änderungszeit nachstellen: Das Verzeichnis behält
+        # dieselbe Änderungszeit, die nicht vor dem Einlesen liegt
+        tick_ns = time.time_ns() + 10 ** 9
+        os.utime(self.path, ns=(tick_ns, tick_ns))
+        self.assertEqual(self.browse(), [])
+        with open(os.path.join(self.path, "new.txt"), 'w') as file:
+            file.write("new")
+        os.utime(self.path, ns=(tick_ns, tick_ns))
+        self.assertEqual(self.browse(), ["new.txt"])
+
+    def test_unchanged_directory_is_served_from_cache(self):
+        with open(os.path.join(self.path, "a.txt"), 'w') as file:
+            file.write("a")
+        past_ns = time.time_ns() - 10 ** 9
+        os.utime(self.path, ns=(past_ns, past_ns))
+        self.browse()
+        cached = app.browse_cache[self.path]
+        self.browse()
+        self.assertIs(app.browse_cache[self.path], cached)
+
+
+if __name__ == '__main__':
+    unittest.main()